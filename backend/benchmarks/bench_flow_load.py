@@ -0,0 +1,190 @@
+"""
+Load-test the integration API end to end against the offline fake model.
+
+Drives POST /api/v1/integration/plan in-process at increasing concurrency,
+reports throughput, p50/p95/p99 latency, mean time per node and peak memory
+per run, and appends the results (tagged with the current git commit) to
+benchmarks/results/flow_load.jsonl. The previous commit's results are
+printed alongside for comparison. No network or MongoDB is needed.
+
+Usage (from backend/):
+    python -m benchmarks.bench_flow_load --levels 1 4 16 --runs 32 --latency-ms 50
+"""
+import argparse
+import asyncio
+import json
+import os
+import statistics
+import subprocess
+import time
+import tracemalloc
+from collections import defaultdict
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+os.environ.setdefault("GROQ_API_KEY", "offline")
+os.environ["LLM_PROVIDER"] = "fake"
+# Identical prompts would otherwise be answered from the response cache
+os.environ.setdefault("LLM_CACHE_ENABLED", "false")
+os.environ.setdefault("CHECKPOINTS_ENABLED", "false")
+# The numbered inputs are near-duplicates and would mostly reuse earlier plans
+os.environ.setdefault("PLAN_REUSE_ENABLED", "false")
+
+import httpx
+from fastapi import FastAPI
+
+from src.graphs.flows.flow_registry import init_flow_registry
+from src.routes import router
+from src.utils.fake_llm import FakeChatModel
+from src.utils.llm_client import llm_client
+from src.utils.llm_scheduler import llm_scheduler
+
+RESULTS_FILE = Path(__file__).parent / "results" / "flow_load.jsonl"
+
+def percentile(values: List[float], q: float) -> float:
+    ordered = sorted(values)
+    if not ordered:
+        return 0.0
+    index = min(len(ordered) - 1, max(0, round(q * (len(ordered) - 1))))
+    return ordered[index]
+
+def git_commit() -> str:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return "unknown"
+
+def make_app() -> FastAPI:
+    app = FastAPI()
+    app.include_router(router)
+    return app
+
+async def run_level(client: httpx.AsyncClient, concurrency: int, runs: int) -> Dict[str, Any]:
+    gate = asyncio.Semaphore(concurrency)
+    latencies: List[float] = []
+    node_seconds: Dict[str, List[float]] = defaultdict(list)
+    errors = 0
+
+    async def one(index: int) -> None:
+        nonlocal errors
+        async with gate:
+            started = time.perf_counter()
+            # Distinct inputs so requests are not coalesced onto one flow run
+            response = await client.post(
+                "/api/v1/integration/plan",
+                json={"user_input": f"Forward weather alerts to SMS subscribers #{concurrency}-{index}"}
+            )
+            latencies.append(time.perf_counter() - started)
+            if response.status_code != 200:
+                errors += 1
+                return
+            for record in response.json().get("node_metrics") or []:
+                node_seconds[record["node"]].append(record["wall_seconds"])
+
+    started = time.perf_counter()
+    await asyncio.gather(*(one(index) for index in range(runs)))
+    elapsed = time.perf_counter() - started
+
+    return {
+        "concurrency": concurrency,
+        "runs": runs,
+        "errors": errors,
+        "throughput_rps": round(runs / elapsed, 3),
+        "p50_seconds": round(percentile(latencies, 0.50), 4),
+        "p95_seconds": round(percentile(latencies, 0.95), 4),
+        "p99_seconds": round(percentile(latencies, 0.99), 4),
+        "node_mean_seconds": {
+            node: round(statistics.fmean(values), 4) for node, values in sorted(node_seconds.items())
+        }
+    }
+
+async def measure_memory(client: httpx.AsyncClient, concurrency: int) -> float:
+    """Peak traced allocation per run while ``concurrency`` runs are in flight (KiB)."""
+    tracemalloc.start()
+    try:
+        await run_level(client, concurrency, concurrency)
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    return round(peak / 1024 / concurrency, 1)
+
+def previous_result(commit: str) -> Optional[Dict[str, Any]]:
+    if not RESULTS_FILE.exists():
+        return None
+    previous = None
+    for line in RESULTS_FILE.read_text().splitlines():
+        entry = json.loads(line)
+        if entry["commit"] != commit:
+            previous = entry
+    return previous
+
+def print_level(level: Dict[str, Any], baseline: Optional[Dict[str, Any]]) -> None:
+    line = (
+        f"c={level['concurrency']:>3}: {level['throughput_rps']:7.2f} runs/s, "
+        f"p50 {level['p50_seconds']:.3f}s, p95 {level['p95_seconds']:.3f}s, p99 {level['p99_seconds']:.3f}s, "
+        f"{level['memory_kib_per_run']:8.1f} KiB/run, {level['errors']} errors"
+    )
+    if baseline is not None:
+        delta = (level["throughput_rps"] - baseline["throughput_rps"]) / baseline["throughput_rps"] * 100
+        line += f" ({delta:+.1f}% throughput vs {baseline['commit']})"
+    print(line)
+    slowest = sorted(level["node_mean_seconds"].items(), key=lambda item: item[1], reverse=True)
+    print("       " + ", ".join(f"{node} {seconds:.3f}s" for node, seconds in slowest))
+
+async def main(args: argparse.Namespace) -> None:
+    llm_client.use_fake_model(FakeChatModel(
+        latency_ms=args.latency_ms,
+        latency_jitter_ms=args.jitter_ms,
+        tokens_per_second=args.tokens_per_second,
+        failure_rate=args.failure_rate,
+        truncation_rate=args.truncation_rate,
+        acceptance_rate=args.acceptance_rate,
+        seed=args.seed
+    ))
+    # The benchmark measures the service, not the provider's rate limits
+    llm_scheduler.max_concurrency = max(args.levels) * 4
+    llm_scheduler.max_queue_depth = max(args.levels) * 8
+    llm_scheduler.requests_per_minute = llm_scheduler.tokens_per_minute = 10 ** 9
+    await init_flow_registry()
+
+    commit = git_commit()
+    previous = previous_result(commit)
+    baseline = {
+        level["concurrency"]: {**level, "commit": previous["commit"]}
+        for level in (previous["levels"] if previous else [])
+    }
+
+    levels = []
+    transport = httpx.ASGITransport(app=make_app())
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench", timeout=None) as client:
+        for concurrency in args.levels:
+            level = await run_level(client, concurrency, max(args.runs, concurrency))
+            level["memory_kib_per_run"] = await measure_memory(client, concurrency)
+            print_level(level, baseline.get(concurrency))
+            levels.append(level)
+
+    RESULTS_FILE.parent.mkdir(parents=True, exist_ok=True)
+    with RESULTS_FILE.open("a") as results:
+        results.write(json.dumps({
+            "commit": commit,
+            "recorded_at": datetime.now(timezone.utc).isoformat(),
+            "config": {key: value for key, value in vars(args).items()},
+            "levels": levels
+        }) + "\n")
+    print(f"Results appended to {RESULTS_FILE}")
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--levels", type=int, nargs="+", default=[1, 4, 16])
+    parser.add_argument("--runs", type=int, default=32)
+    parser.add_argument("--latency-ms", type=float, default=50.0)
+    parser.add_argument("--jitter-ms", type=float, default=10.0)
+    parser.add_argument("--tokens-per-second", type=float, default=2000.0)
+    parser.add_argument("--failure-rate", type=float, default=0.0)
+    parser.add_argument("--truncation-rate", type=float, default=0.0)
+    parser.add_argument("--acceptance-rate", type=float, default=1.0)
+    parser.add_argument("--seed", type=int, default=0)
+    asyncio.run(main(parser.parse_args()))
@@ -0,0 +1,70 @@
+"""
+Compare the shared pooled LLM transport with a fresh HTTP client per call.
+
+Usage (from backend/):
+    python -m benchmarks.bench_llm_pool --requests 200 --concurrency 20
+"""
+import argparse
+import asyncio
+import os
+import time
+import httpx
+
+os.environ.setdefault("GROQ_API_KEY", "stub")
+
+from src.utils.llm_client import PooledTransport
+from benchmarks.stub_provider import StubProvider
+
+CHAT_PATH = "/openai/v1/chat/completions"
+BODY = {"model": "stub", "messages": [{"role": "user", "content": "ping"}]}
+
+async def run_pooled(provider: StubProvider, requests: int, concurrency: int) -> dict:
+    transport = PooledTransport(
+        max_connections=concurrency,
+        max_keepalive=concurrency,
+        keepalive_expiry=30.0,
+        max_per_host=concurrency,
+        http2=False
+    )
+    gate = asyncio.Semaphore(concurrency)
+    async with httpx.AsyncClient(transport=transport, base_url=provider.url) as client:
+        async def call():
+            async with gate:
+                response = await client.post(CHAT_PATH, json=BODY)
+                response.raise_for_status()
+
+        started = time.perf_counter()
+        await asyncio.gather(*(call() for _ in range(requests)))
+        elapsed = time.perf_counter() - started
+        metrics = transport.metrics()
+    return {"elapsed": elapsed, "peak_in_use": metrics["peak_in_use"]}
+
+async def run_unpooled(provider: StubProvider, requests: int, concurrency: int) -> dict:
+    gate = asyncio.Semaphore(concurrency)
+
+    async def call():
+        async with gate:
+            async with httpx.AsyncClient(base_url=provider.url) as client:
+                response = await client.post(CHAT_PATH, json=BODY)
+                response.raise_for_status()
+
+    started = time.perf_counter()
+    await asyncio.gather(*(call() for _ in range(requests)))
+    return {"elapsed": time.perf_counter() - started}
+
+async def main(requests: int, concurrency: int, latency: float) -> None:
+    for name, runner in (("pooled", run_pooled), ("per-call client", run_unpooled)):
+        async with StubProvider(latency=latency) as provider:
+            result = await runner(provider, requests, concurrency)
+            print(
+                f"{name:>16}: {requests / result['elapsed']:8.1f} req/s, "
+                f"{provider.connections_accepted:4d} connections opened"
+            )
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--requests", type=int, default=200)
+    parser.add_argument("--concurrency", type=int, default=20)
+    parser.add_argument("--latency", type=float, default=0.005)
+    args = parser.parse_args()
+    asyncio.run(main(args.requests, args.concurrency, args.latency))
@@ -0,0 +1,91 @@
+import asyncio
+import json
+from typing import Callable, Optional
+
+def default_completion(request_body: dict) -> str:
+    return json.dumps({"status": "ok"})
+
+class StubProvider:
+    """
+    Minimal keep-alive HTTP/1.1 server that answers OpenAI-style chat completion calls.
+
+    Stands in for the Groq API so connection reuse can be measured locally.
+    """
+
+    def __init__(
+        self,
+        latency: float = 0.0,
+        completion: Callable[[dict], str] = default_completion,
+        host: str = "127.0.0.1"
+    ):
+        self.latency = latency
+        self.completion = completion
+        self.host = host
+        self.port: Optional[int] = None
+        self.connections_accepted = 0
+        self.requests_served = 0
+        self._server: Optional[asyncio.AbstractServer] = None
+
+    @property
+    def url(self) -> str:
+        return f"http://{self.host}:{self.port}"
+
+    async def start(self) -> "StubProvider":
+        self._server = await asyncio.start_server(self._handle, self.host, 0)
+        self.port = self._server.sockets[0].getsockname()[1]
+        return self
+
+    async def stop(self) -> None:
+        if self._server is not None:
+            self._server.close()
+            await self._server.wait_closed()
+
+    async def __aenter__(self) -> "StubProvider":
+        return await self.start()
+
+    async def __aexit__(self, *exc) -> None:
+        await self.stop()
+
+    async def _handle(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        self.connections_accepted += 1
+        try:
+            while True:
+                try:
+                    head = await reader.readuntil(b"\r\n\r\n")
+                except (asyncio.IncompleteReadError, ConnectionError):
+                    break
+
+                length = 0
+                for line in head.decode("latin-1").split("\r\n")[1:]:
+                    name, _, value = line.partition(":")
+                    if name.strip().lower() == "content-length":
+                        length = int(value.strip())
+                raw_body = await reader.readexactly(length) if length else b""
+                request_body = json.loads(raw_body) if raw_body else {}
+
+                if self.latency:
+                    await asyncio.sleep(self.latency)
+
+                payload = json.dumps({
+                    "id": f"stub-{self.requests_served}",
+                    "object": "chat.completion",
+                    "created": 0,
+                    "model": request_body.get("model", "stub"),
+                    "choices": [{
+                        "index": 0,
+                        "message": {"role": "assistant", "content": self.completion(request_body)},
+                        "finish_reason": "stop"
+                    }],
+                    "usage": {"prompt_tokens": 1, "completion_tokens": 1, "total_tokens": 2}
+                }).encode()
+                writer.write(
+                    b"HTTP/1.1 200 OK\r\n"
+                    b"Content-Type: application/json\r\n"
+                    b"Connection: keep-alive\r\n"
+                    + f"Content-Length: {len(payload)}\r\n\r\n".encode()
+                    + payload
+                )
+                await writer.drain()
+                self.requests_served += 1
+        finally:
+            writer.close()
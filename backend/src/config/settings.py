@@ -1,6 +1,15 @@
+import socket
 from pydantic_settings import BaseSettings
 from pydantic import validator
 
+# Groq models a node may be configured to use
+ALLOWED_MODELS = [
+    "mixtral-8x7b-32768",
+    "llama2-70b-4096",
+    "llama-3.1-8b-instant",
+    "llama-3.3-70b-versatile"
+]
+
 class Settings(BaseSettings):
     # Database settings
     MONGODB_URL: str = "mongodb://localhost:27017"
@@ -10,17 +19,193 @@ class Settings(BaseSettings):
     GROQ_API_KEY: str
     MODEL_NAME: str = "mixtral-8x7b-32768"  # Groq's Mixtral model
     MODEL_TEMPERATURE: float = 0.2
+    GROQ_API_BASE: str | None = None
+    # "groq" for the real provider, "fake" for the offline stand-in used in tests and benchmarks
+    LLM_PROVIDER: str = "groq"
+    
+    # Per-node model tiers, keyed by node class ("CoderNode") or node method
+    # ("SupervisorNode.review_evaluation"); unlisted nodes use MODEL_NAME
+    NODE_MODELS: dict[str, str] = {}
+    # Retry on ESCALATION_MODEL when a cheaper model's output fails validation
+    # or reports a confidence below ESCALATION_MIN_CONFIDENCE
+    ESCALATION_ENABLED: bool = False
+    ESCALATION_MODEL: str = "llama-3.3-70b-versatile"
+    ESCALATION_MIN_CONFIDENCE: float = 0.6
+    
+    # Offline fake model settings (only used when LLM_PROVIDER is "fake")
+    FAKE_LLM_LATENCY_MS: float = 200.0
+    FAKE_LLM_LATENCY_JITTER_MS: float = 50.0
+    FAKE_LLM_TOKENS_PER_SECOND: float = 500.0
+    FAKE_LLM_FAILURE_RATE: float = 0.0
+    FAKE_LLM_TRUNCATION_RATE: float = 0.0
+    FAKE_LLM_ACCEPTANCE_RATE: float = 1.0
+    FAKE_LLM_SEED: int = 0
+    
+    # LLM transport settings (shared by every node)
+    LLM_HTTP2: bool = True
+    LLM_POOL_MAX_CONNECTIONS: int = 20
+    LLM_POOL_MAX_KEEPALIVE: int = 10
+    LLM_POOL_MAX_PER_HOST: int = 10
+    LLM_POOL_KEEPALIVE_EXPIRY: float = 30.0
+    LLM_REQUEST_TIMEOUT: float = 60.0
+    LLM_MAX_RETRIES: int = 3
+    
+    # LLM scheduler settings (provider limits are per model)
+    LLM_REQUESTS_PER_MINUTE: int = 30
+    LLM_TOKENS_PER_MINUTE: int = 20000
+    LLM_MAX_CONCURRENT_CALLS: int = 8
+    LLM_COMPLETION_TOKEN_ESTIMATE: int = 1024
+    LLM_ADMISSION_MAX_QUEUE_DEPTH: int = 50
+    LLM_ADMISSION_MAX_WAIT_SECONDS: float = 30.0
+    # LLM calls an admitted run is expected to make, counted against admission until it finishes
+    LLM_CALLS_PER_RUN_ESTIMATE: int = 6
+    
+    # Blended USD price per million tokens, used for cost metrics
+    LLM_PRICE_PER_MILLION_TOKENS: dict[str, float] = {
+        "mixtral-8x7b-32768": 0.24,
+        "llama2-70b-4096": 0.70,
+        "llama-3.1-8b-instant": 0.065,
+        "llama-3.3-70b-versatile": 0.69
+    }
+    
+    # LLM response cache settings
+    LLM_CACHE_ENABLED: bool = True
+    LLM_CACHE_MAX_ENTRIES: int = 512
+    LLM_CACHE_TTL_SECONDS: int = 3600
+    LLM_CACHE_COLLECTION: str = "llm_cache"
+    LLM_CACHE_DISABLED_NODES: list[str] = []
+    
+    # Prompt size settings (approximate tokens of serialized node inputs)
+    PROMPT_TOKEN_BUDGET: int = 6000
+    PROMPT_TOKEN_BUDGETS: dict[str, int] = {"EvaluatorNode": 12000}
+    
+    # Background job settings
+    JOB_WORKER_CONCURRENCY: int = 4
+    JOB_QUEUE_MAX_DEPTH: int = 100
+    JOBS_COLLECTION: str = "integration_jobs"
+    # Finished jobs kept in memory, so a poll finds them without Mongo or after a failed save
+    JOB_FINISHED_CACHE_SIZE: int = 256
+    JOB_FINISHED_TTL_SECONDS: int = 3600
+    # Identifies this instance's jobs when it restarts; instances sharing a
+    # database need distinct ids that stay the same across restarts
+    JOB_RUNNER_ID: str = socket.gethostname()
+    
+    # Batch endpoint settings
+    BATCH_MAX_CONCURRENCY: int = 4
+    BATCH_MAX_ITEMS: int = 100
+    
+    # Sandbox settings for running generated code and tests locally; the
+    # sandbox only limits CPU, memory and wall time (no filesystem or network
+    # isolation), so enable it only where the service itself runs isolated
+    SANDBOX_ENABLED: bool = False
+    SANDBOX_WORKERS: int = 2
+    SANDBOX_TIMEOUT_SECONDS: float = 30.0
+    SANDBOX_CPU_SECONDS: int = 20
+    SANDBOX_MEMORY_MB: int = 512
+    SANDBOX_PYTHON: str | None = None
+    
+    # Reuse of plans from similar completed runs (MinHash/LSH over the user input)
+    PLAN_REUSE_ENABLED: bool = True
+    PLAN_REUSE_THRESHOLD: float = 0.8
+    PLAN_REUSE_SUPERVISOR_OUTPUT: bool = True
+    PLAN_INDEX_COLLECTION: str = "plan_index"
+    PLAN_INDEX_NUM_PERM: int = 64
+    PLAN_INDEX_BANDS: int = 8
+    PLAN_INDEX_PAYLOAD_CACHE_SIZE: int = 1000
+    
+    # Run history settings (write-behind to Mongo)
+    RUN_STORE_ENABLED: bool = True
+    RUNS_COLLECTION: str = "flow_runs"
+    RUN_STORE_BATCH_SIZE: int = 50
+    RUN_STORE_FLUSH_SECONDS: float = 1.0
+    RUN_STORE_MAX_BUFFER: int = 1000
+    RUN_HISTORY_PAGE_SIZE: int = 20
+    RUN_HISTORY_MAX_PAGE_SIZE: int = 100
+    
+    # Items collection settings
+    ITEMS_PAGE_SIZE: int = 100
+    ITEMS_MAX_PAGE_SIZE: int = 1000
+    ITEMS_BULK_MAX_ITEMS: int = 1000
+    ITEMS_STREAM_BATCH_SIZE: int = 500
+    
+    # Health probe settings
+    HEALTH_PROBE_INTERVAL_SECONDS: float = 10.0
+    HEALTH_PROBE_TIMEOUT_SECONDS: float = 2.0
+    # Fraction of the LLM pool (or scheduler queue) in use at which /ready reports not ready
+    READINESS_POOL_SATURATION: float = 0.9
+    
+    # Response encoding for flow results (compression is negotiated per request)
+    RESPONSE_COMPRESSION_ENABLED: bool = True
+    RESPONSE_COMPRESSION_MIN_BYTES: int = 1024
+    RESPONSE_GZIP_LEVEL: int = 6
+    RESPONSE_BROTLI_QUALITY: int = 4
+    
+    # Content-addressed store for generated files; "auto" uses GridFS while
+    # Mongo is connected and ARTIFACT_DIR otherwise
+    ARTIFACT_STORE_ENABLED: bool = True
+    ARTIFACT_STORE_BACKEND: str = "auto"
+    ARTIFACT_DIR: str = "artifacts"
+    ARTIFACT_GRIDFS_BUCKET: str = "artifacts"
+    ARTIFACT_CACHE_MAX_BYTES: int = 32 * 1024 * 1024
+    ARTIFACT_DIGEST_CACHE_SIZE: int = 100000
+    
+    # Checkpoint settings
+    CHECKPOINTS_ENABLED: bool = True
+    CHECKPOINTS_COLLECTION: str = "flow_checkpoints"
     
     # Application settings
     MAX_ITERATIONS: int = 3
     LOG_LEVEL: str = "INFO"
     
+    # Logging pipeline settings; records are written by a background thread
+    LOG_FORMAT: str = "json"
+    LOG_DIR: str = "logs"
+    LOG_ROTATION_WHEN: str = "midnight"
+    LOG_MAX_BYTES: int = 50 * 1024 * 1024
+    LOG_BACKUP_COUNT: int = 14
+    LOG_QUEUE_SIZE: int = 10000
+    # Fraction of INFO/DEBUG records kept per logger (and its children); warnings are never sampled
+    LOG_SAMPLING: dict[str, float] = {"httpx": 0.1}
+    
+    @validator("LOG_FORMAT")
+    def validate_log_format(cls, v):
+        allowed_formats = ["json", "text"]
+        if v not in allowed_formats:
+            raise ValueError(f"Log format must be one of {allowed_formats}")
+        return v
+    
+    @validator("ARTIFACT_STORE_BACKEND")
+    def validate_artifact_store_backend(cls, v):
+        allowed_backends = ["auto", "gridfs", "filesystem"]
+        if v not in allowed_backends:
+            raise ValueError(f"Artifact store backend must be one of {allowed_backends}")
+        return v
+    
+    @validator("LLM_PROVIDER")
+    def validate_llm_provider(cls, v):
+        allowed_providers = ["groq", "fake"]
+        if v not in allowed_providers:
+            raise ValueError(f"LLM provider must be one of {allowed_providers}")
+        return v
+    
     # Add validation
-    @validator("MODEL_NAME")
+    @validator("MODEL_NAME", "ESCALATION_MODEL")
     def validate_model_name(cls, v):
-        allowed_models = ["mixtral-8x7b-32768", "llama2-70b-4096"]
-        if v not in allowed_models:
-            raise ValueError(f"Model must be one of {allowed_models}")
+        if v not in ALLOWED_MODELS:
+            raise ValueError(f"Model must be one of {ALLOWED_MODELS}")
+        return v
+    
+    @validator("PLAN_REUSE_THRESHOLD")
+    def validate_plan_reuse_threshold(cls, v):
+        if not 0.0 < v <= 1.0:
+            raise ValueError("Plan reuse threshold must be in (0, 1]")
+        return v
+    
+    @validator("NODE_MODELS")
+    def validate_node_models(cls, v):
+        for node, model in v.items():
+            if model not in ALLOWED_MODELS:
+                raise ValueError(f"Model for {node} must be one of {ALLOWED_MODELS}")
         return v
     
     class Config:
@@ -1,126 +1,262 @@
-from langgraph.graph import Graph, END
+import time
+import uuid
+from langgraph.graph import StateGraph, END
+from langgraph.graph.state import CompiledStateGraph
 from ..nodes.planner_node import PlannerNode
 from ..nodes.supervisor_node import SupervisorNode
 from ..nodes.coder_node import CoderNode
 from ..nodes.tester_node import TesterNode
 from ..nodes.evaluator_node import EvaluatorNode
-from typing import Dict, Any, TypedDict, Annotated
-from ..utils.logging import logger
-
-class GraphState(TypedDict):
-    user_input: str
-    plan: Dict[str, Any]
-    supervisor_output: Dict[str, Any]
-    code_output: Dict[str, Any]
-    test_output: Dict[str, Any]
-    evaluation: Dict[str, Any]
-    supervisor_feedback: Dict[str, Any]
-    iteration_count: int
-    final_status: str
-    error: str
-
-async def create_planning_flow() -> Graph:
-    # Initialize nodes
-    planner = PlannerNode()
-    supervisor = SupervisorNode()
-    coder = CoderNode()
-    tester = TesterNode()
-    evaluator = EvaluatorNode()
+from ..nodes.base_node import BaseNode
+from typing import Dict, Any
+from .artifact_store import artifact_store
+from .checkpointer import checkpointer
+from .plan_index import plan_index
+# State helpers live in a module without graph dependencies; re-exported for existing callers
+from .state import (
+    BRANCHES, GraphState, create_initial_state, join_errors, merge_dicts,
+    resume_point, revision_targets_from_feedback, state_delta
+)
+from ...config.settings import settings
+from ...utils.logging import get_logger
+from ...utils.metrics import collect_node_calls, observe_node
+from ...utils.sandbox import sandbox
+from ...utils.run_context import get_run_context, node_scope
+
+logger = get_logger("flow")
+
+def _checkpointed(name: str, node_fn):
+    """Persist a node's update once it succeeds, unless the run already failed upstream or it changed nothing."""
+    async def run(state: GraphState) -> Dict[str, Any]:
+        update = await node_fn(state)
+        run_id = get_run_context().run_id
+        # A branch skipped on a partial revision returns {} and has nothing to restore
+        if run_id and update and not state.get("error") and "error" not in update:
+            await checkpointer.save(run_id, name, update)
+        return update
+    return run
+
+def _instrumented(name: str, node_fn):
+    """Time a node, collect the LLM calls it made and attach the summary to its update."""
+    async def run(state: GraphState) -> Dict[str, Any]:
+        started = time.perf_counter()
+        with node_scope(name), collect_node_calls() as calls:
+            update = await node_fn(state)
+        if not update and not calls:
+            # Branch skipped on a partial revision
+            return update
+        summary = observe_node(
+            name,
+            state.get("iteration_count", 0) + 1,
+            time.perf_counter() - started,
+            calls
+        )
+        return {**update, "node_metrics": [summary]}
+    return run
+
+def _unless_failed(node_fn):
+    """Skip a node once the run has failed upstream; check_completion then marks it failed."""
+    async def run(state: GraphState) -> Dict[str, Any]:
+        if state.get("error"):
+            return {}
+        return await node_fn(state)
+    return run
+
+def _to_dict(output: Any) -> Dict[str, Any]:
+    return output.dict() if hasattr(output, "dict") else dict(output)
+
+def create_nodes() -> Dict[str, BaseNode]:
+    return {
+        "planner": PlannerNode(),
+        "supervisor": SupervisorNode(),
+        "coder": CoderNode(),
+        "tester": TesterNode(),
+        "evaluator": EvaluatorNode()
+    }
+
+async def create_planning_flow(nodes: Dict[str, BaseNode] | None = None) -> CompiledStateGraph:
+    # Initialize nodes, reusing the shared instances when the caller provides them
+    nodes = nodes or create_nodes()
+    planner = nodes["planner"]
+    supervisor = nodes["supervisor"]
+    coder = nodes["coder"]
+    tester = nodes["tester"]
+    evaluator = nodes["evaluator"]
     
-    # Define the graph
-    workflow = Graph()
+    # Define the graph; each node returns only the keys it changed
+    workflow = StateGraph(GraphState)
 
-    # Add nodes
-    @workflow.node("planner")
-    async def planning_node(state: GraphState) -> GraphState:
+    async def planning_node(state: GraphState) -> Dict[str, Any]:
         try:
+            if not get_run_context().bypass_cache:
+                match = await plan_index.lookup(state["user_input"])
+                if match is not None:
+                    logger.info("Reusing plan of run %s (similarity %.2f)", match.run_id, match.similarity)
+                    update = {
+                        "plan": match.plan,
+                        "reused_from": {"run_id": match.run_id, "similarity": match.similarity}
+                    }
+                    if settings.PLAN_REUSE_SUPERVISOR_OUTPUT and match.supervisor_output:
+                        update["supervisor_output"] = match.supervisor_output
+                    return update
             plan = await planner.process(state["user_input"])
-            state["plan"] = plan.dict()
-            return state
+            return {"plan": _to_dict(plan)}
         except Exception as e:
             logger.error(f"Planning node error: {str(e)}")
-            state["error"] = str(e)
-            return state
-
-    @workflow.node("supervisor")
-    async def supervisor_node(state: GraphState) -> GraphState:
-        if "evaluation" not in state:
-            # Initial planning
-            supervisor_output = await supervisor.process(state["plan"])
-            state["supervisor_output"] = supervisor_output.dict()
-        else:
-            # Review evaluation
-            feedback = await supervisor.review_evaluation(
+            return {"error": str(e)}
+
+    async def supervisor_node(state: GraphState) -> Dict[str, Any]:
+        try:
+            if not state.get("evaluation"):
+                if state.get("reused_from") and state.get("supervisor_output"):
+                    # Tasks came with the reused plan
+                    return {"revision_targets": list(BRANCHES)}
+                # Initial planning
+                supervisor_output = await supervisor.process(state["plan"])
+                return {
+                    "supervisor_output": _to_dict(supervisor_output),
+                    "revision_targets": list(BRANCHES)
+                }
+            # Review evaluation and narrow the next pass to the branches it flags
+            feedback = _to_dict(await supervisor.review_evaluation(
                 state["evaluation"],
                 state["plan"]
-            )
-            state["supervisor_feedback"] = feedback.dict()
-        return state
+            ))
+            return {
+                "supervisor_feedback": feedback,
+                "revision_targets": revision_targets_from_feedback(feedback)
+            }
+        except Exception as e:
+            logger.error(f"Supervisor node error: {str(e)}")
+            return {"error": str(e)}
 
-    @workflow.node("coder")
-    async def coder_node(state: GraphState) -> GraphState:
+    async def coder_node(state: GraphState) -> Dict[str, Any]:
+        # Branches the feedback did not touch keep their previous output
+        if "coder" not in state.get("revision_targets", BRANCHES):
+            return {}
+        started = time.perf_counter()
         try:
-            code_output = await coder.process(state["supervisor_output"]["coding_task"])
-            state["code_output"] = code_output.dict()
-            return state
+            coding_task = state["supervisor_output"]["coding_task"]
+            if state.get("code_output") and state.get("supervisor_feedback"):
+                code_output = await coder.revise(
+                    coding_task,
+                    await artifact_store.load_field(state["code_output"], "implementation"),
+                    state["supervisor_feedback"]
+                )
+            else:
+                code_output = await coder.process(coding_task)
+            # State keeps references; files unchanged by a revision are not stored again
+            update = {"code_output": await artifact_store.store_field(_to_dict(code_output), "implementation")}
         except Exception as e:
             logger.error(f"Coder node error: {str(e)}")
-            state["error"] = str(e)
-            return state
+            update = {"error": str(e)}
+        update["branch_timings"] = {"coder": time.perf_counter() - started}
+        return update
 
-    @workflow.node("tester")
-    async def tester_node(state: GraphState) -> GraphState:
+    async def tester_node(state: GraphState) -> Dict[str, Any]:
+        if "tester" not in state.get("revision_targets", BRANCHES):
+            return {}
+        started = time.perf_counter()
         try:
             test_output = await tester.process(state["supervisor_output"]["testing_task"])
-            state["test_output"] = test_output.dict()
-            return state
+            update = {"test_output": await artifact_store.store_field(_to_dict(test_output), "test_implementation")}
         except Exception as e:
             logger.error(f"Tester node error: {str(e)}")
-            state["error"] = str(e)
-            return state
+            update = {"error": str(e)}
+        update["branch_timings"] = {"tester": time.perf_counter() - started}
+        return update
 
-    @workflow.node("evaluator")
-    async def evaluator_node(state: GraphState) -> GraphState:
+    async def evaluator_node(state: GraphState) -> Dict[str, Any]:
         try:
+            execution = None
+            # Sources are loaded for this node only and never written back to the state
+            code_output = await artifact_store.load_field(state["code_output"], "implementation")
+            test_output = await artifact_store.load_field(state["test_output"], "test_implementation")
+            if settings.SANDBOX_ENABLED:
+                implementation = code_output.get("implementation", {})
+                result = await sandbox.run(implementation, test_output.get("test_implementation", {}))
+                execution = result.to_dict()
+                if not result.compiled:
+                    # Nothing to judge; skip the LLM round trip for this iteration
+                    logger.info("Generated code does not compile, skipping LLM evaluation: %s", result.syntax_errors)
+                    evaluation = evaluator.reject_uncompiled(execution, list(implementation))
+                    return {"evaluation": _to_dict(evaluation), "execution": execution}
             evaluation = await evaluator.process(
-                state["code_output"],
-                state["test_output"],
-                state["plan"]
+                code_output,
+                test_output,
+                state["plan"],
+                execution
             )
-            state["evaluation"] = evaluation.dict()
-            return state
+            return {"evaluation": _to_dict(evaluation), "execution": execution or {}}
         except Exception as e:
             logger.error(f"Evaluator node error: {str(e)}")
-            state["error"] = str(e)
-            return state
+            return {"error": str(e)}
 
-    # Define conditional routing
-    @workflow.node("check_completion")
-    async def check_completion(state: GraphState) -> Annotated[str, {"supervisor", END}]:
-        state["iteration_count"] = state.get("iteration_count", 0) + 1
+    async def check_completion(state: GraphState) -> Dict[str, Any]:
+        iteration_count = state.get("iteration_count", 0) + 1
         
         # Add more detailed state validation
         if not all(key in state for key in ["evaluation", "code_output", "test_output"]):
             raise ValueError("Missing required state components")
         
-        if state["iteration_count"] > 3:  # Prevent infinite loops
-            state["final_status"] = "max_iterations_reached"
-            return END
-            
-        if state["evaluation"].get("is_acceptable", False):
-            state["final_status"] = "success"
-            return END
-        
-        state["final_status"] = "needs_revision"
-        return "supervisor"
+        if state.get("error"):
+            # Stop instead of looping on a broken state; the run can be resumed
+            final_status = "failed"
+        elif iteration_count > settings.MAX_ITERATIONS:  # Prevent infinite loops
+            final_status = "max_iterations_reached"
+        elif state["evaluation"].get("is_acceptable", False):
+            final_status = "success"
+        else:
+            final_status = "needs_revision"
+
+        if final_status == "success" and not state.get("reused_from"):
+            # Runs that started from a reused plan would only duplicate their source
+            await plan_index.add(
+                get_run_context().run_id or uuid.uuid4().hex,
+                state["user_input"],
+                state["plan"],
+                state.get("supervisor_output") or {}
+            )
+        return {"iteration_count": iteration_count, "final_status": final_status}
+
+    # Define conditional routing
+    def route_entry(state: GraphState) -> str | list[str]:
+        resume_from = state.get("resume_from") or "planner"
+        if resume_from == "branches":
+            return list(BRANCHES)
+        return resume_from
+
+    def route_after_check(state: GraphState) -> str:
+        if state["final_status"] == "needs_revision":
+            return "supervisor"
+        return END
+
+    workflow.add_node("planner", _checkpointed("planner", _instrumented("planner", planning_node)))
+    # After a failure the remaining nodes pass straight through, so no LLM budget
+    # is spent on a broken state; both branches still run, keeping the join intact
+    workflow.add_node("supervisor", _checkpointed("supervisor", _instrumented("supervisor", _unless_failed(supervisor_node))))
+    workflow.add_node("coder", _checkpointed("coder", _instrumented("coder", _unless_failed(coder_node))))
+    workflow.add_node("tester", _checkpointed("tester", _instrumented("tester", _unless_failed(tester_node))))
+    workflow.add_node("evaluator", _checkpointed("evaluator", _instrumented("evaluator", _unless_failed(evaluator_node))))
+    workflow.add_node("check_completion", _checkpointed("check_completion", _instrumented("check_completion", check_completion)))
 
-    # Define the edges
-    workflow.set_entry_point("planner")
+    # Define the edges: coder and tester fan out from the supervisor in the
+    # same step, and the evaluator waits for both before it runs once. A
+    # branch outside revision_targets passes straight through without an
+    # LLM call, which keeps the join intact on partial revisions
+    workflow.set_conditional_entry_point(
+        route_entry,
+        ["planner", "supervisor", "coder", "tester", "evaluator", "check_completion"]
+    )
     workflow.add_edge("planner", "supervisor")
     workflow.add_edge("supervisor", "coder")
     workflow.add_edge("supervisor", "tester")
-    workflow.add_edge("coder", "evaluator")
-    workflow.add_edge("tester", "evaluator")
+    workflow.add_edge(["coder", "tester"], "evaluator")
     workflow.add_edge("evaluator", "check_completion")
+    workflow.add_conditional_edges(
+        "check_completion",
+        route_after_check,
+        {"supervisor": "supervisor", END: END}
+    )
     
-    return workflow.compile() 
\ No newline at end of file
+    return workflow.compile()
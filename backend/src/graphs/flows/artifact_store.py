@@ -0,0 +1,230 @@
+import asyncio
+import hashlib
+import os
+import re
+import tempfile
+from collections import OrderedDict
+from typing import Any, Dict, Optional
+from gridfs.errors import FileExists, NoFile
+from motor.motor_asyncio import AsyncIOMotorGridFSBucket
+from ...config.database import Database, DATABASE_NAME
+from ...config.settings import settings
+from ...utils.llm_cache import LRUCache
+from ...utils.logging import logger
+from ...utils.single_flight import SingleFlight
+
+DIGEST_PATTERN = re.compile(r"^[0-9a-f]{64}$")
+
+def content_digest(data: bytes) -> str:
+    return hashlib.sha256(data).hexdigest()
+
+def is_ref(value: Any) -> bool:
+    """Whether a file entry is an artifact reference rather than inline content."""
+    return isinstance(value, dict) and "sha256" in value
+
+class FilesystemBlobs:
+    """Blobs as files named by digest under ``root``, fanned out by the first two hex digits."""
+
+    def __init__(self, root: str):
+        self.root = root
+
+    def _path(self, digest: str) -> str:
+        return os.path.join(self.root, digest[:2], digest)
+
+    def _write(self, digest: str, data: bytes) -> bool:
+        path = self._path(digest)
+        if os.path.exists(path):
+            return False
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        # Write then rename, so a reader never sees a partial blob
+        fd, temp_path = tempfile.mkstemp(dir=os.path.dirname(path), prefix=".tmp-")
+        try:
+            with os.fdopen(fd, "wb") as temp_file:
+                temp_file.write(data)
+            os.replace(temp_path, path)
+        except BaseException:
+            os.unlink(temp_path)
+            raise
+        return True
+
+    def _read(self, digest: str) -> Optional[bytes]:
+        try:
+            with open(self._path(digest), "rb") as blob:
+                return blob.read()
+        except FileNotFoundError:
+            return None
+
+    async def exists(self, digest: str) -> bool:
+        return await asyncio.to_thread(os.path.exists, self._path(digest))
+
+    async def put(self, digest: str, data: bytes) -> bool:
+        """Write a blob; False when it was already stored."""
+        return await asyncio.to_thread(self._write, digest, data)
+
+    async def get(self, digest: str) -> Optional[bytes]:
+        return await asyncio.to_thread(self._read, digest)
+
+class GridFSBlobs:
+    """Blobs in a GridFS bucket, with the digest as the file id."""
+
+    def __init__(self, bucket_name: str):
+        self.bucket_name = bucket_name
+
+    def _bucket(self) -> AsyncIOMotorGridFSBucket:
+        return AsyncIOMotorGridFSBucket(Database.client[DATABASE_NAME], bucket_name=self.bucket_name)
+
+    async def exists(self, digest: str) -> bool:
+        files = Database.client[DATABASE_NAME][f"{self.bucket_name}.files"]
+        return await files.find_one({"_id": digest}, {"_id": 1}) is not None
+
+    async def put(self, digest: str, data: bytes) -> bool:
+        """Write a blob; False when it was already stored."""
+        try:
+            await self._bucket().upload_from_stream_with_id(digest, digest, data)
+        except FileExists:
+            # Another worker stored the same content first
+            return False
+        return True
+
+    async def get(self, digest: str) -> Optional[bytes]:
+        try:
+            stream = await self._bucket().open_download_stream(digest)
+        except NoFile:
+            return None
+        return await stream.read()
+
+class ArtifactStore:
+    """
+    Content-addressed storage for generated files.
+
+    A file is stored once under the SHA-256 of its content; graph state,
+    checkpoints, run history and responses carry ``{"sha256", "size"}``
+    references instead of the source. A file that is unchanged across
+    revision iterations, or generated again by another run, hashes to a
+    blob that is already stored and is not written again. Blobs live in
+    GridFS while Mongo is connected and under ``ARTIFACT_DIR`` otherwise
+    (or when a GridFS write fails); reads try both. Recently used contents
+    are kept in a byte-bounded in-memory cache.
+    """
+
+    def __init__(self, root: str | None = None, cache_max_bytes: int | None = None):
+        self.filesystem = FilesystemBlobs(root or settings.ARTIFACT_DIR)
+        self.gridfs = GridFSBlobs(settings.ARTIFACT_GRIDFS_BUCKET)
+        self.cache_max_bytes = settings.ARTIFACT_CACHE_MAX_BYTES if cache_max_bytes is None else cache_max_bytes
+        self._contents: "OrderedDict[str, bytes]" = OrderedDict()
+        self._cached_bytes = 0
+        # Digests known to be stored, so repeated content skips the existence check too
+        self._stored = LRUCache(settings.ARTIFACT_DIGEST_CACHE_SIZE, float("inf"))
+        self._writes = SingleFlight()
+        self.counters = {
+            "stored": 0,
+            "deduplicated": 0,
+            "bytes_stored": 0,
+            "bytes_deduplicated": 0,
+            "cache_hits": 0,
+            "cache_misses": 0,
+            "gridfs_fallbacks": 0
+        }
+
+    def _backends(self):
+        use_gridfs = Database.client is not None and settings.ARTIFACT_STORE_BACKEND != "filesystem"
+        return (self.gridfs, self.filesystem) if use_gridfs else (self.filesystem,)
+
+    def _cache(self, digest: str, data: bytes) -> None:
+        if len(data) > self.cache_max_bytes:
+            return
+        if digest in self._contents:
+            self._contents.move_to_end(digest)
+            return
+        self._contents[digest] = data
+        self._cached_bytes += len(data)
+        while self._cached_bytes > self.cache_max_bytes:
+            _, evicted = self._contents.popitem(last=False)
+            self._cached_bytes -= len(evicted)
+
+    async def _write(self, digest: str, data: bytes) -> bool:
+        """Store a blob unless a backend already has it; True when it was written."""
+        primary = self._backends()[0]
+        try:
+            if await primary.exists(digest):
+                return False
+            written = await primary.put(digest, data)
+        except Exception as e:
+            if primary is self.filesystem:
+                raise
+            logger.error(f"GridFS write of artifact {digest} failed, storing it on disk: {str(e)}")
+            self.counters["gridfs_fallbacks"] += 1
+            written = await self.filesystem.put(digest, data)
+        if not written:
+            return False
+        self.counters["stored"] += 1
+        self.counters["bytes_stored"] += len(data)
+        return True
+
+    async def put(self, content: str) -> Dict[str, Any]:
+        data = content.encode("utf-8")
+        digest = content_digest(data)
+        self._cache(digest, data)
+        written = False
+        if self._stored.get(digest) is None:
+            # Concurrent puts of the same content share one write
+            written = await self._writes.do(digest, lambda: self._write(digest, data))
+            self._stored.set(digest, "")
+        if not written:
+            self.counters["deduplicated"] += 1
+            self.counters["bytes_deduplicated"] += len(data)
+        return {"sha256": digest, "size": len(data)}
+
+    async def get(self, digest: str) -> Optional[str]:
+        data = self._contents.get(digest)
+        if data is not None:
+            self._contents.move_to_end(digest)
+            self.counters["cache_hits"] += 1
+            return data.decode("utf-8")
+        self.counters["cache_misses"] += 1
+        for backend in self._backends():
+            try:
+                data = await backend.get(digest)
+            except Exception as e:
+                logger.error(f"Reading artifact {digest} failed: {str(e)}")
+                continue
+            if data is not None:
+                self._cache(digest, data)
+                return data.decode("utf-8")
+        return None
+
+    async def store_files(self, files: Dict[str, Any]) -> Dict[str, Any]:
+        """Replace each file's content with a reference to its stored blob."""
+        names = [name for name, value in files.items() if not is_ref(value)]
+        refs = await asyncio.gather(*(self.put(str(files[name])) for name in names))
+        return {**files, **dict(zip(names, refs))}
+
+    async def load_files(self, files: Dict[str, Any]) -> Dict[str, str]:
+        """
+        Resolve references back to file contents; inline contents pass through.
+
+        Raises:
+            LookupError: If a referenced blob is not stored anywhere
+        """
+        names = [name for name, value in files.items() if is_ref(value)]
+        contents = await asyncio.gather(*(self.get(files[name]["sha256"]) for name in names))
+        missing = [name for name, content in zip(names, contents) if content is None]
+        if missing:
+            raise LookupError(f"Artifacts missing for {', '.join(missing)}")
+        return {**files, **dict(zip(names, contents))}
+
+    async def store_field(self, output: Dict[str, Any], field: str) -> Dict[str, Any]:
+        """``output`` with the files under ``field`` stored; unchanged when the store is disabled."""
+        if not settings.ARTIFACT_STORE_ENABLED or not output.get(field):
+            return output
+        return {**output, field: await self.store_files(output[field])}
+
+    async def load_field(self, output: Dict[str, Any], field: str) -> Dict[str, Any]:
+        if not output.get(field):
+            return output
+        return {**output, field: await self.load_files(output[field])}
+
+    def stats(self) -> Dict[str, int]:
+        return {**self.counters, "cached_bytes": self._cached_bytes, "cached_blobs": len(self._contents)}
+
+artifact_store = ArtifactStore()
@@ -0,0 +1,70 @@
+import itertools
+from datetime import datetime
+from typing import Any, Dict, Iterator, List
+from pymongo import ASCENDING
+from ...config.database import Database, DATABASE_NAME
+from ...config.settings import settings
+from ...utils.logging import logger
+
+INPUT_NODE = "__input__"
+
+class MongoCheckpointer:
+    """
+    Persists each node's partial state update keyed by (run_id, step).
+
+    Only the keys a node returned are stored, so a checkpoint stays small
+    even when earlier nodes produced large outputs. Folding the updates of a
+    run in step order rebuilds its latest good GraphState.
+    """
+
+    def __init__(self):
+        self._steps: Dict[str, Iterator[int]] = {}
+
+    def _collection(self):
+        if not settings.CHECKPOINTS_ENABLED or Database.client is None:
+            return None
+        return Database.client[DATABASE_NAME][settings.CHECKPOINTS_COLLECTION]
+
+    async def ensure_indexes(self) -> None:
+        collection = self._collection()
+        if collection is not None:
+            await collection.create_index(
+                [("run_id", ASCENDING), ("step", ASCENDING)],
+                unique=True
+            )
+
+    def start_run(self, run_id: str, next_step: int = 0) -> None:
+        self._steps[run_id] = itertools.count(next_step)
+
+    def finish_run(self, run_id: str) -> None:
+        self._steps.pop(run_id, None)
+
+    async def save(self, run_id: str, node: str, update: Dict[str, Any]) -> None:
+        collection = self._collection()
+        if collection is None:
+            return
+        if run_id not in self._steps:
+            self.start_run(run_id)
+        step = next(self._steps[run_id])
+        try:
+            await collection.insert_one({
+                "run_id": run_id,
+                "step": step,
+                "node": node,
+                "update": update,
+                "created_at": datetime.utcnow()
+            })
+        except Exception as e:
+            logger.error(f"Checkpoint write failed for run {run_id} at {node}: {str(e)}")
+
+    async def load(self, run_id: str) -> List[Dict[str, Any]]:
+        collection = self._collection()
+        if collection is None:
+            return []
+        cursor = collection.find(
+            {"run_id": run_id},
+            {"_id": 0, "step": 1, "node": 1, "update": 1}
+        ).sort("step", ASCENDING)
+        return await cursor.to_list(None)
+
+checkpointer = MongoCheckpointer()
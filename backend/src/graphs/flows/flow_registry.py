@@ -0,0 +1,147 @@
+import asyncio
+import time
+from typing import TYPE_CHECKING, Any, Dict, Optional
+from .checkpointer import checkpointer, INPUT_NODE
+from .plan_index import plan_index
+from .run_store import run_store
+from ...utils.logging import logger
+from ...utils.run_context import get_run_context
+from ...utils.startup_profiler import startup_timer
+from .state import create_initial_state, resume_point, GraphState
+
+if TYPE_CHECKING:
+    from langgraph.graph.state import CompiledStateGraph
+
+class FlowRegistry:
+    """Application-scoped compiled flow and the node instances it was built from."""
+    flow: Optional["CompiledStateGraph"] = None
+    nodes: Dict[str, Any] = {}
+    startup_seconds: Optional[float] = None
+    warm_up_task: Optional[asyncio.Task] = None
+    _lock: Optional[asyncio.Lock] = None
+
+def _load_flow_module():
+    # Pulls in LangGraph, LangChain and the node modules; the first call takes most of a second
+    from . import api_integration_flow
+    return api_integration_flow
+
+async def init_flow_registry() -> "CompiledStateGraph":
+    """
+    Build the nodes, compile the integration graph and warm up prompt rendering.
+
+    LangGraph, LangChain and the chat model clients are first imported
+    here rather than when the application module loads, so the server can
+    answer health checks before they are ready.
+
+    Safe to call more than once; only the first call does any work.
+    """
+    if FlowRegistry._lock is None:
+        FlowRegistry._lock = asyncio.Lock()
+
+    async with FlowRegistry._lock:
+        if FlowRegistry.flow is not None:
+            return FlowRegistry.flow
+
+        started = time.perf_counter()
+        flow_module = _load_flow_module()
+        nodes = flow_module.create_nodes()
+        flow = await flow_module.create_planning_flow(nodes)
+
+        # Warm-up: render each prompt once so the first request pays no formatting cost
+        for node in nodes.values():
+            node.warm_up()
+
+        FlowRegistry.nodes = nodes
+        FlowRegistry.flow = flow
+        FlowRegistry.startup_seconds = time.perf_counter() - started
+        logger.info(f"Integration flow compiled in {FlowRegistry.startup_seconds * 1000:.1f} ms")
+        return flow
+
+async def _warm_up() -> None:
+    try:
+        # Import off the event loop so health checks keep being answered meanwhile;
+        # the plan index loads from Mongo while the import runs
+        await asyncio.gather(asyncio.to_thread(_load_flow_module), plan_index.load())
+        await init_flow_registry()
+        startup_timer.mark("flow_ready")
+    except Exception as e:
+        logger.error(f"Integration flow warm-up failed: {str(e)}")
+
+def start_warm_up() -> asyncio.Task:
+    """Build the flow in the background; requests that need it first wait for this."""
+    if FlowRegistry.warm_up_task is None:
+        FlowRegistry.warm_up_task = asyncio.create_task(_warm_up())
+    return FlowRegistry.warm_up_task
+
+async def get_flow() -> "CompiledStateGraph":
+    """Return the shared compiled flow, building it on first use if startup did not."""
+    if FlowRegistry.flow is None:
+        warm_up = FlowRegistry.warm_up_task
+        if warm_up is not None and not warm_up.done():
+            await asyncio.wait({warm_up})
+        if FlowRegistry.flow is None:
+            return await init_flow_registry()
+    return FlowRegistry.flow
+
+async def start_run(user_input: str) -> GraphState:
+    """Create the initial state and record the run's input so it can be resumed later."""
+    run_id = get_run_context().run_id
+    if run_id is not None:
+        checkpointer.start_run(run_id)
+        run_store.start_run(run_id, user_input)
+        await checkpointer.save(run_id, INPUT_NODE, {"user_input": user_input})
+    return create_initial_state(user_input)
+
+def finish_run(final_state: Optional[GraphState] = None) -> None:
+    """Release the run's checkpoint sequence and queue its record; ``final_state`` is None when it did not finish."""
+    run_id = get_run_context().run_id
+    if run_id is not None:
+        checkpointer.finish_run(run_id)
+        run_store.finish_run(run_id, final_state)
+
+async def run_integration_flow(user_input: str) -> GraphState:
+    """Run the shared flow for one request and return its final state."""
+    flow = await get_flow()
+    initial_state = await start_run(user_input)
+    final_state = None
+    try:
+        final_state = await flow.ainvoke(initial_state)
+        return final_state
+    finally:
+        finish_run(final_state)
+
+async def resume_integration_flow(run_id: str) -> GraphState:
+    """
+    Continue a run from its last good checkpoint.
+
+    The caller must have set ``run_id`` in the run context so new
+    checkpoints are appended to the same run.
+
+    Raises:
+        LookupError: If no checkpoints exist for the run
+    """
+    checkpoints = await checkpointer.load(run_id)
+    if not checkpoints:
+        raise LookupError(f"No checkpoints found for run {run_id}")
+
+    state, next_step = resume_point(checkpoints)
+    if not state["resume_from"]:
+        # Already finished; nothing to redo
+        return state
+
+    logger.info("Resuming run %s at %s", run_id, state["resume_from"])
+    flow = await get_flow()
+    checkpointer.start_run(run_id, next_step)
+    run_store.start_run(run_id, state["user_input"])
+    final_state = None
+    try:
+        final_state = await flow.ainvoke(state)
+        return final_state
+    finally:
+        finish_run(final_state)
+
+def reset_flow_registry() -> None:
+    FlowRegistry.flow = None
+    FlowRegistry.nodes = {}
+    FlowRegistry.startup_seconds = None
+    FlowRegistry.warm_up_task = None
@@ -0,0 +1,202 @@
+import asyncio
+from datetime import datetime
+from typing import Any, Dict, List, Optional
+from uuid import uuid4
+from .flow_registry import run_integration_flow
+from ...config.database import Database, DATABASE_NAME
+from ...config.settings import settings
+from ...models.job import IntegrationJob, JobStatus
+from ...utils.llm_cache import LRUCache
+from ...utils.logging import logger
+from ...utils.llm_scheduler import PRIORITY_BATCH
+from ...utils.run_context import RunContext, set_run_context, reset_run_context
+
+class JobQueueFull(Exception):
+    """Raised when a job is submitted while the queue is at its configured depth."""
+
+class JobRunner:
+    """
+    Bounded in-process worker pool for integration flow runs.
+
+    HTTP handlers only enqueue a job id; a fixed number of workers pull from
+    the queue, so the number of flows talking to the LLM at once is capped
+    regardless of how many requests arrive. Job state lives in Mongo so any
+    instance can answer a poll; recently finished jobs are also kept in
+    memory, so this instance can answer without Mongo.
+    """
+
+    def __init__(
+        self,
+        concurrency: int,
+        max_queue_depth: int,
+        finished_cache_size: int = 256,
+        finished_ttl_seconds: float = 3600.0
+    ):
+        self.concurrency = concurrency
+        self.max_queue_depth = max_queue_depth
+        self._queue: Optional[asyncio.Queue] = None
+        self._workers: List[asyncio.Task] = []
+        self._active: Dict[str, IntegrationJob] = {}
+        self._finished = LRUCache(finished_cache_size, finished_ttl_seconds)
+
+    async def start(self) -> None:
+        if self._workers:
+            return
+        self._queue = asyncio.Queue(maxsize=self.max_queue_depth)
+        self._workers = [
+            asyncio.create_task(self._worker(index)) for index in range(self.concurrency)
+        ]
+        logger.info(f"Started {self.concurrency} integration job workers")
+        await self._reconcile()
+
+    async def _reconcile(self) -> None:
+        """
+        Pick up this instance's jobs that were left unfinished by a restart.
+
+        Queued jobs are enqueued again. Jobs that were running are marked
+        failed; their run can be continued through the resume endpoint,
+        since a job's run id is its job id.
+        """
+        collection = self._collection()
+        if collection is None:
+            return
+        try:
+            documents = await collection.find({
+                "runner_id": settings.JOB_RUNNER_ID,
+                "status": {"$in": [JobStatus.QUEUED, JobStatus.RUNNING]}
+            }).to_list(None)
+        except Exception as e:
+            logger.error(f"Failed to load unfinished jobs: {str(e)}")
+            return
+
+        requeued = 0
+        for document in documents:
+            document["job_id"] = document.pop("_id")
+            job = IntegrationJob(**document)
+            if job.job_id in self._active:
+                continue
+            if job.status == JobStatus.QUEUED and not self._queue.full():
+                self._active[job.job_id] = job
+                self._queue.put_nowait(job.job_id)
+                requeued += 1
+                continue
+            job.error = (
+                "Interrupted by a restart" if job.status == JobStatus.RUNNING
+                else "Job queue was full after a restart"
+            )
+            job.status = JobStatus.FAILED
+            job.finished_at = datetime.utcnow()
+            await self._save(job)
+        if documents:
+            logger.info(f"Reconciled {len(documents)} unfinished jobs, {requeued} queued again")
+
+    async def stop(self) -> None:
+        for worker in self._workers:
+            worker.cancel()
+        await asyncio.gather(*self._workers, return_exceptions=True)
+        self._workers = []
+
+    async def submit(self, user_input: str, config: Dict[str, Any] | None = None) -> IntegrationJob:
+        if self._queue is None:
+            await self.start()
+
+        job = IntegrationJob(
+            job_id=uuid4().hex,
+            user_input=user_input,
+            config=config,
+            runner_id=settings.JOB_RUNNER_ID
+        )
+        self._active[job.job_id] = job
+        try:
+            self._queue.put_nowait(job.job_id)
+        except asyncio.QueueFull:
+            del self._active[job.job_id]
+            raise JobQueueFull(f"Job queue is full ({self.max_queue_depth} pending)")
+
+        await self._save(job)
+        return job
+
+    async def get(self, job_id: str) -> Optional[IntegrationJob]:
+        if job_id in self._active:
+            return self._active[job_id]
+        finished = self._finished.get(job_id)
+        if finished is not None:
+            return finished
+
+        collection = self._collection()
+        if collection is None:
+            return None
+        document = await collection.find_one({"_id": job_id})
+        if document is None:
+            return None
+        document["job_id"] = document.pop("_id")
+        return IntegrationJob(**document)
+
+    def stats(self) -> Dict[str, int]:
+        return {
+            "queued": self._queue.qsize() if self._queue is not None else 0,
+            "active": len(self._active),
+            "finished_cached": len(self._finished),
+            "workers": len(self._workers)
+        }
+
+    def _collection(self):
+        if Database.client is None:
+            return None
+        return Database.client[DATABASE_NAME][settings.JOBS_COLLECTION]
+
+    async def _save(self, job: IntegrationJob) -> None:
+        collection = self._collection()
+        if collection is None:
+            return
+        job.updated_at = datetime.utcnow()
+        document = job.dict(exclude={"id", "job_id"})
+        document["_id"] = job.job_id
+        try:
+            await collection.replace_one({"_id": job.job_id}, document, upsert=True)
+        except Exception as e:
+            logger.error(f"Failed to persist job {job.job_id}: {str(e)}")
+
+    async def _worker(self, index: int) -> None:
+        while True:
+            job_id = await self._queue.get()
+            job = self._active[job_id]
+            try:
+                job.status = JobStatus.RUNNING
+                job.started_at = datetime.utcnow()
+                await self._save(job)
+
+                context_token = set_run_context(RunContext(run_id=job.job_id, priority=PRIORITY_BATCH))
+                try:
+                    final_state = await run_integration_flow(job.user_input)
+                finally:
+                    reset_run_context(context_token)
+
+                job.result = dict(final_state)
+                if final_state.get("final_status") == "failed":
+                    job.status = JobStatus.FAILED
+                    job.error = final_state.get("error") or "Flow failed"
+                else:
+                    job.status = JobStatus.COMPLETED
+            except asyncio.CancelledError:
+                job.status = JobStatus.FAILED
+                job.error = "Job cancelled during shutdown"
+                raise
+            except Exception as e:
+                logger.error(f"Integration job {job_id} failed: {str(e)}")
+                job.status = JobStatus.FAILED
+                job.error = str(e)
+            finally:
+                job.finished_at = datetime.utcnow()
+                # Cached before the save, which only logs its errors
+                self._finished.set(job_id, job)
+                await self._save(job)
+                self._active.pop(job_id, None)
+                self._queue.task_done()
+
+job_runner = JobRunner(
+    concurrency=settings.JOB_WORKER_CONCURRENCY,
+    max_queue_depth=settings.JOB_QUEUE_MAX_DEPTH,
+    finished_cache_size=settings.JOB_FINISHED_CACHE_SIZE,
+    finished_ttl_seconds=settings.JOB_FINISHED_TTL_SECONDS
+)
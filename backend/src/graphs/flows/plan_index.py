@@ -0,0 +1,137 @@
+import asyncio
+import json
+from array import array
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Any, Dict, Optional, Set
+from ...config.database import Database, DATABASE_NAME
+from ...config.settings import settings
+from ...utils.llm_cache import LRUCache
+from ...utils.logging import logger
+from ...utils.minhash import MinHasher, MinHashLSH, shingles
+
+@dataclass
+class PlanMatch:
+    run_id: str
+    similarity: float
+    plan: Dict[str, Any]
+    supervisor_output: Dict[str, Any]
+
+class PlanIndex:
+    """
+    Finds completed runs whose input is similar to a new one, so their plan can be reused.
+
+    Inputs are normalized to word unigrams and bigrams and MinHashed; the
+    signatures of every indexed run live in an in-memory LSH index, which
+    keeps lookups well under a millisecond at 100k runs. Plans themselves
+    are stored in Mongo and only the most recently used ones are kept in
+    memory. Without Mongo the index lives for the lifetime of the process.
+    """
+
+    def __init__(self):
+        self.hasher = MinHasher(settings.PLAN_INDEX_NUM_PERM)
+        self.lsh = MinHashLSH(settings.PLAN_INDEX_NUM_PERM, settings.PLAN_INDEX_BANDS)
+        self.payloads = LRUCache(settings.PLAN_INDEX_PAYLOAD_CACHE_SIZE, float("inf"))
+        self._pending_writes: Set[asyncio.Task] = set()
+
+    def _collection(self):
+        if Database.client is None:
+            return None
+        return Database.client[DATABASE_NAME][settings.PLAN_INDEX_COLLECTION]
+
+    async def load(self) -> None:
+        """Rebuild the in-memory signatures from Mongo; plans are fetched on demand."""
+        collection = self._collection()
+        if collection is None or not settings.PLAN_REUSE_ENABLED:
+            return
+        try:
+            async for document in collection.find({}, {"signature": 1}):
+                if len(document["signature"]) == self.lsh.num_perm:
+                    self.lsh.add(document["_id"], array("Q", document["signature"]))
+        except Exception as e:
+            logger.error(f"Plan index load failed: {str(e)}")
+        logger.info(f"Plan index loaded {len(self.lsh)} runs")
+
+    async def _payload(self, run_id: str) -> Optional[Dict[str, Any]]:
+        """
+        Return a run's stored plan, or None when the run is no longer stored.
+
+        Raises:
+            Exception: Whatever Mongo raised; the run may still be stored
+        """
+        cached = self.payloads.get(run_id)
+        if cached is not None:
+            return json.loads(cached)
+        collection = self._collection()
+        if collection is None:
+            return None
+        document = await collection.find_one({"_id": run_id}, {"plan": 1, "supervisor_output": 1})
+        if document is None:
+            return None
+        payload = {"plan": document["plan"], "supervisor_output": document.get("supervisor_output") or {}}
+        self.payloads.set(run_id, json.dumps(payload))
+        return payload
+
+    async def lookup(self, user_input: str) -> Optional[PlanMatch]:
+        if not settings.PLAN_REUSE_ENABLED or not len(self.lsh):
+            return None
+        tokens = shingles(user_input)
+        if not tokens:
+            # Nothing but filler words or punctuation; every such input would look identical
+            return None
+        signature = self.hasher.signature(tokens)
+        for run_id, similarity in self.lsh.query(signature, settings.PLAN_REUSE_THRESHOLD, limit=3):
+            try:
+                payload = await self._payload(run_id)
+            except Exception as e:
+                # The entry may well be valid; plan afresh this time and keep it
+                logger.error(f"Plan index lookup failed: {str(e)}")
+                return None
+            if payload is None:
+                # Deleted from Mongo (or evicted with no Mongo behind it); stop matching it
+                self.lsh.remove(run_id)
+                continue
+            return PlanMatch(run_id, similarity, payload["plan"], payload["supervisor_output"])
+        return None
+
+    async def add(
+        self,
+        run_id: str,
+        user_input: str,
+        plan: Dict[str, Any],
+        supervisor_output: Dict[str, Any]
+    ) -> None:
+        if not settings.PLAN_REUSE_ENABLED or run_id in self.lsh:
+            return
+        tokens = shingles(user_input)
+        if not tokens:
+            return
+        signature = self.hasher.signature(tokens)
+        if self.lsh.query(signature, threshold=1.0):
+            # An indistinguishable input is already indexed
+            return
+        self.lsh.add(run_id, signature)
+        self.payloads.set(run_id, json.dumps({"plan": plan, "supervisor_output": supervisor_output}))
+
+        collection = self._collection()
+        if collection is None:
+            return
+        document = {
+            "_id": run_id,
+            "user_input": user_input,
+            "signature": list(signature),
+            "plan": plan,
+            "supervisor_output": supervisor_output,
+            "created_at": datetime.utcnow()
+        }
+        task = asyncio.create_task(self._write(collection, document))
+        self._pending_writes.add(task)
+        task.add_done_callback(self._pending_writes.discard)
+
+    async def _write(self, collection, document: Dict[str, Any]) -> None:
+        try:
+            await collection.replace_one({"_id": document["_id"]}, document, upsert=True)
+        except Exception as e:
+            logger.error(f"Plan index write failed for run {document['_id']}: {str(e)}")
+
+plan_index = PlanIndex()
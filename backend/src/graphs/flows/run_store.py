@@ -0,0 +1,213 @@
+import asyncio
+import base64
+import hashlib
+import json
+from collections import deque
+from datetime import datetime
+from typing import Any, Deque, Dict, List, Optional, Tuple
+from pymongo import DESCENDING, UpdateOne
+from ...config.database import Database, DATABASE_NAME
+from ...config.settings import settings
+from ...utils.logging import logger
+
+# State keys holding generated output; only fetched when a single run is requested
+OUTPUT_KEYS = [
+    "plan",
+    "supervisor_output",
+    "code_output",
+    "test_output",
+    "evaluation",
+    "execution",
+    "supervisor_feedback"
+]
+
+# Fields returned when listing runs
+SUMMARY_PROJECTION = {
+    "user_input": 1,
+    "status": 1,
+    "iteration_count": 1,
+    "reused_from": 1,
+    "error": 1,
+    "created_at": 1,
+    "finished_at": 1,
+    "duration_seconds": 1
+}
+
+# Status recorded for runs that ended without a final state (error or cancellation)
+ABORTED = "aborted"
+
+def input_hash(user_input: str) -> str:
+    normalized = " ".join(user_input.lower().split())
+    return hashlib.sha256(normalized.encode("utf-8")).hexdigest()
+
+def encode_cursor(created_at: datetime, run_id: str) -> str:
+    raw = json.dumps([created_at.isoformat(), run_id])
+    return base64.urlsafe_b64encode(raw.encode("utf-8")).decode("ascii")
+
+def decode_cursor(cursor: str) -> Tuple[datetime, str]:
+    """
+    Raises:
+        ValueError: If the cursor was not produced by ``encode_cursor``
+    """
+    try:
+        created_at, run_id = json.loads(base64.urlsafe_b64decode(cursor.encode("ascii")))
+        return datetime.fromisoformat(created_at), str(run_id)
+    except (ValueError, TypeError, UnicodeError) as e:
+        raise ValueError(f"Invalid cursor: {cursor}") from e
+
+class RunStore:
+    """
+    Persists every flow run with a write-behind buffer.
+
+    Finishing a run only appends an upsert to an in-memory buffer; a
+    background task flushes it to Mongo with one ``bulk_write`` per batch of
+    ``RUN_STORE_BATCH_SIZE`` runs, or every ``RUN_STORE_FLUSH_SECONDS``. When
+    Mongo falls behind the buffer is capped and the oldest writes are
+    dropped, so requests never wait on the database.
+    """
+
+    def __init__(self):
+        self._started: Dict[str, Tuple[str, datetime]] = {}
+        self._buffer: Deque[UpdateOne] = deque()
+        self._wakeup: Optional[asyncio.Event] = None
+        self._flusher: Optional[asyncio.Task] = None
+        self.written = 0
+        self.dropped = 0
+
+    def _collection(self):
+        if not settings.RUN_STORE_ENABLED or Database.client is None:
+            return None
+        return Database.client[DATABASE_NAME][settings.RUNS_COLLECTION]
+
+    async def ensure_indexes(self) -> None:
+        collection = self._collection()
+        if collection is not None:
+            # _id breaks ties between runs created in the same millisecond for keyset pagination
+            await collection.create_index([("created_at", DESCENDING), ("_id", DESCENDING)])
+            await collection.create_index([("status", 1), ("created_at", DESCENDING), ("_id", DESCENDING)])
+            await collection.create_index([("input_hash", 1), ("created_at", DESCENDING), ("_id", DESCENDING)])
+
+    def start(self) -> None:
+        if self._flusher is None or self._flusher.done():
+            self._wakeup = asyncio.Event()
+            self._flusher = asyncio.create_task(self._flush_loop())
+
+    async def stop(self) -> None:
+        if self._flusher is not None:
+            self._flusher.cancel()
+            await asyncio.gather(self._flusher, return_exceptions=True)
+            self._flusher = None
+        await self.flush()
+
+    def start_run(self, run_id: str, user_input: str) -> None:
+        self._started[run_id] = (user_input, datetime.utcnow())
+
+    def finish_run(self, run_id: str, final_state: Optional[Dict[str, Any]] = None) -> None:
+        """Queue the run's record for writing; never blocks on Mongo."""
+        user_input, started_at = self._started.pop(run_id, (None, None))
+        if user_input is None or self._collection() is None:
+            return
+        finished_at = datetime.utcnow()
+        state = final_state or {}
+        record = {
+            "user_input": user_input,
+            "input_hash": input_hash(user_input),
+            "status": state.get("final_status") or ABORTED,
+            "iteration_count": state.get("iteration_count", 0),
+            "reused_from": state.get("reused_from") or None,
+            "error": state.get("error") or None,
+            "node_metrics": state.get("node_metrics", []),
+            "outputs": {key: state.get(key) for key in OUTPUT_KEYS},
+            "finished_at": finished_at,
+            "duration_seconds": round((finished_at - started_at).total_seconds(), 3)
+        }
+        # A resumed run updates its record but keeps its original creation time
+        self._buffer.append(UpdateOne(
+            {"_id": run_id},
+            {"$set": record, "$setOnInsert": {"created_at": started_at}},
+            upsert=True
+        ))
+        while len(self._buffer) > settings.RUN_STORE_MAX_BUFFER:
+            self._buffer.popleft()
+            self.dropped += 1
+        self.start()
+        if len(self._buffer) >= settings.RUN_STORE_BATCH_SIZE:
+            self._wakeup.set()
+
+    async def _flush_loop(self) -> None:
+        while True:
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), timeout=settings.RUN_STORE_FLUSH_SECONDS)
+            except asyncio.TimeoutError:
+                pass
+            self._wakeup.clear()
+            await self.flush()
+
+    async def flush(self) -> None:
+        collection = self._collection()
+        while self._buffer:
+            batch = [
+                self._buffer.popleft()
+                for _ in range(min(settings.RUN_STORE_BATCH_SIZE, len(self._buffer)))
+            ]
+            if collection is None:
+                self.dropped += len(batch)
+                continue
+            try:
+                await collection.bulk_write(batch, ordered=False)
+                self.written += len(batch)
+            except Exception as e:
+                self.dropped += len(batch)
+                logger.error(f"Run store write of {len(batch)} runs failed: {str(e)}")
+
+    async def list_runs(
+        self,
+        limit: int,
+        cursor: Optional[str] = None,
+        status: Optional[str] = None,
+        user_input: Optional[str] = None
+    ) -> Tuple[List[Dict[str, Any]], Optional[str]]:
+        """
+        Return one page of run summaries, newest first, and the cursor of the next page.
+
+        Raises:
+            ValueError: If ``cursor`` is malformed
+        """
+        collection = self._collection()
+        if collection is None:
+            return [], None
+        query: Dict[str, Any] = {}
+        if status:
+            query["status"] = status
+        if user_input:
+            query["input_hash"] = input_hash(user_input)
+        if cursor:
+            created_at, run_id = decode_cursor(cursor)
+            query["$or"] = [
+                {"created_at": {"$lt": created_at}},
+                {"created_at": created_at, "_id": {"$lt": run_id}}
+            ]
+        documents = await collection.find(query, SUMMARY_PROJECTION).sort(
+            [("created_at", DESCENDING), ("_id", DESCENDING)]
+        ).limit(limit + 1).to_list(limit + 1)
+
+        next_cursor = None
+        if len(documents) > limit:
+            documents = documents[:limit]
+            next_cursor = encode_cursor(documents[-1]["created_at"], documents[-1]["_id"])
+        return documents, next_cursor
+
+    async def get_run(self, run_id: str) -> Optional[Dict[str, Any]]:
+        collection = self._collection()
+        if collection is None:
+            return None
+        return await collection.find_one({"_id": run_id})
+
+    def stats(self) -> Dict[str, int]:
+        return {
+            "buffered": len(self._buffer),
+            "written": self.written,
+            "dropped": self.dropped
+        }
+
+run_store = RunStore()
@@ -0,0 +1,116 @@
+import operator
+from typing import Annotated, Any, Dict, List, Tuple, TypedDict
+from .checkpointer import INPUT_NODE
+
+def merge_dicts(left: Dict[str, Any] | None, right: Dict[str, Any] | None) -> Dict[str, Any]:
+    return {**(left or {}), **(right or {})}
+
+def join_errors(left: str | None, right: str | None) -> str:
+    return "; ".join(error for error in (left, right) if error)
+
+class GraphState(TypedDict):
+    user_input: str
+    plan: Dict[str, Any]
+    supervisor_output: Dict[str, Any]
+    code_output: Dict[str, Any]
+    test_output: Dict[str, Any]
+    evaluation: Dict[str, Any]
+    # Result of importing the generated code and running its tests in the sandbox
+    execution: Dict[str, Any]
+    supervisor_feedback: Dict[str, Any]
+    iteration_count: int
+    final_status: str
+    # Completed run whose plan this run started from ({"run_id", "similarity"}); empty when planned afresh
+    reused_from: Dict[str, Any]
+    # Branches ("coder", "tester") that must regenerate their output this iteration
+    revision_targets: list[str]
+    # Entry node when resuming a run from its checkpoints; empty for a fresh run
+    resume_from: str
+    # Written by both parallel branches, so these keys are merged instead of overwritten
+    branch_timings: Annotated[Dict[str, float], merge_dicts]
+    # One timing/token/cost summary per node invocation, appended in completion order
+    node_metrics: Annotated[List[Dict[str, Any]], operator.add]
+    error: Annotated[str, join_errors]
+
+def create_initial_state(user_input: str) -> GraphState:
+    return {
+        "user_input": user_input,
+        "plan": {},
+        "supervisor_output": {},
+        "code_output": {},
+        "test_output": {},
+        "evaluation": {},
+        "execution": {},
+        "supervisor_feedback": {},
+        "iteration_count": 0,
+        "final_status": "",
+        "reused_from": {},
+        "resume_from": "",
+        "branch_timings": {},
+        "node_metrics": []
+    }
+
+def state_delta(previous: Dict[str, Any], current: Dict[str, Any]) -> Dict[str, Any]:
+    """Return only the keys a node added or changed, for streaming to clients."""
+    return {
+        key: value for key, value in current.items()
+        if key not in previous or previous[key] != value
+    }
+
+BRANCHES = ["coder", "tester"]
+
+def revision_targets_from_feedback(feedback: Dict[str, Any]) -> list[str]:
+    """Pick the branches the supervisor's feedback asks to rework; rework both when unclear."""
+    targets = [
+        branch for branch in BRANCHES
+        if branch in feedback.get("affected_components", [])
+    ]
+    return targets or list(BRANCHES)
+
+def resume_point(checkpoints: List[Dict[str, Any]]) -> Tuple[GraphState, int]:
+    """
+    Rebuild the state of a run from its checkpoints and mark where to continue.
+
+    Returns the state to restart from and the next checkpoint step. The
+    state's ``resume_from`` is empty when the run had already finished.
+    """
+    if not checkpoints or checkpoints[0]["node"] != INPUT_NODE:
+        raise ValueError("Run has no recorded input to resume from")
+
+    state: Dict[str, Any] = create_initial_state(checkpoints[0]["update"]["user_input"])
+    pending_branches: List[str] = []
+    last_node = INPUT_NODE
+
+    for checkpoint in checkpoints[1:]:
+        node, update = checkpoint["node"], checkpoint["update"]
+        for key, value in update.items():
+            if key == "branch_timings":
+                state[key] = merge_dicts(state.get(key), value)
+            elif key == "node_metrics":
+                state[key] = state.get(key, []) + value
+            else:
+                state[key] = value
+
+        if node == "supervisor":
+            pending_branches = list(state.get("revision_targets") or BRANCHES)
+        elif node in pending_branches:
+            pending_branches.remove(node)
+        last_node = node
+
+    if last_node == INPUT_NODE:
+        state["resume_from"] = "planner"
+    elif last_node == "planner":
+        state["resume_from"] = "supervisor"
+    elif last_node in ("supervisor", *BRANCHES):
+        if pending_branches:
+            # Both branches start so the evaluator join still fires; only the pending ones do work
+            state["revision_targets"] = pending_branches
+            state["resume_from"] = "branches"
+        else:
+            state["resume_from"] = "evaluator"
+    elif last_node == "evaluator":
+        state["resume_from"] = "check_completion"
+    elif state.get("final_status") == "needs_revision":
+        state["resume_from"] = "supervisor"
+
+    return state, checkpoints[-1]["step"] + 1
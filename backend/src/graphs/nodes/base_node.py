@@ -1,25 +1,260 @@
-from typing import Dict, Any
-from langchain.chat_models import ChatGroq
+import asyncio
+import time
+from typing import Dict, Any, Optional, Tuple, Type
+from langchain.prompts import PromptTemplate
 from langchain_core.output_parsers import JsonOutputParser
+from pydantic import BaseModel
 from ...config.settings import settings
-from ...utils.logging import logger
-from langchain.callbacks.manager import CallbackManager
-from langchain.callbacks import get_openai_callback
+from ...utils.logging import get_logger
+from ...utils.llm_client import llm_client
+from ...utils.llm_cache import llm_cache
+from ...utils.llm_scheduler import llm_scheduler
+from ...utils.metrics import record_llm_call
+from ...utils.run_context import get_run_context
+from ...utils.prompt_serializer import SerializedInputs, count_tokens, serialize_inputs
+from ...utils.streaming_json import SchemaDriftError, StreamingObjectParser
+
+logger = get_logger("nodes")
 
 class BaseNode:
+    # Subclasses whose output must never be reused can opt out of the response cache
+    cache_enabled: bool = True
+    # Forward completion tokens to the run's token sink when a streaming client asked for them
+    stream_tokens: bool = False
+    # Input fields to summarize first when a prompt is over budget, as "<input>.<field>" paths
+    elision_order: list[str] = []
+    # Top-level object fields whose entries are validated and reported one by one while streaming
+    stream_items: list[str] = []
+
     def __init__(self, temperature: float = None):
+        self.temperature = settings.MODEL_TEMPERATURE if temperature is None else temperature
         try:
-            self.model = ChatGroq(
-                groq_api_key=settings.GROQ_API_KEY,
-                temperature=temperature or settings.MODEL_TEMPERATURE,
-                model_name=settings.MODEL_NAME,
-                request_timeout=60,
-                max_retries=3
-            )
+            # Chat models and their HTTP connection pool are shared process-wide
+            self.model = llm_client.get_chat_model(self.temperature, self.model_for())
         except Exception as e:
             logger.error(f"Failed to initialize {self.__class__.__name__}: {str(e)}")
             raise
+
+    def model_for(self, task: Optional[str] = None) -> str:
+        """Model configured for this node, or for one of its methods when ``task`` is given."""
+        node_name = self.__class__.__name__
+        if task is not None and f"{node_name}.{task}" in settings.NODE_MODELS:
+            return settings.NODE_MODELS[f"{node_name}.{task}"]
+        return settings.NODE_MODELS.get(node_name, settings.MODEL_NAME)
+
+    def needs_escalation(self, result: BaseModel) -> bool:
+        """Whether a schema-valid result is still too weak to keep; nodes with a confidence signal override this."""
+        return False
+
+    def warm_up(self) -> None:
+        """Render every prompt template once so formatting is warm before the first request."""
+        for attr in vars(self).values():
+            if isinstance(attr, PromptTemplate):
+                attr.format(**{name: "" for name in attr.input_variables})
         
+    def serialize_inputs(self, **inputs: Any) -> SerializedInputs:
+        """Render prompt inputs as compact JSON within this node's token budget."""
+        budget = settings.PROMPT_TOKEN_BUDGETS.get(self.__class__.__name__, settings.PROMPT_TOKEN_BUDGET)
+        return serialize_inputs(inputs, budget, self.elision_order)
+
+    async def invoke_llm(
+        self,
+        prompt: str,
+        inputs: Optional[SerializedInputs] = None,
+        parser: Optional[StreamingObjectParser] = None,
+        model_name: Optional[str] = None,
+        escalated: bool = False,
+        cache_result: bool = True
+    ) -> str:
+        """
+        Send a rendered prompt through the shared LLM client and return the completion text.
+
+        With ``cache_result`` off the completion is not cached here; the
+        caller caches it with ``cache_completion`` once it has checked it.
+        """
+        node_name = self.__class__.__name__
+        call: Dict[str, Any] = {
+            "node": node_name,
+            "model": model_name or self.model_for(),
+            "prompt_tokens": count_tokens(prompt),
+            "cache_hit": False
+        }
+        if escalated:
+            call["escalated"] = True
+        if inputs is not None:
+            call.update(inputs.stats())
+
+        content = ""
+        try:
+            content = await self._complete(prompt, call, parser)
+            if cache_result and not call["cache_hit"]:
+                await self.cache_completion(prompt, call["model"], content)
+            return content
+        except Exception as e:
+            # Failed attempts are recorded too, so escalations can be traced to their cause
+            call["error"] = type(e).__name__
+            raise
+        finally:
+            call["completion_tokens"] = count_tokens(content)
+            if parser is not None:
+                call["parse_seconds"] = round(parser.parse_seconds, 4)
+            llm_calls = get_run_context().llm_calls
+            if llm_calls is not None:
+                llm_calls.append(call)
+            record_llm_call(call)
+
+    async def invoke_structured(
+        self,
+        prompt: str,
+        schema: Type[BaseModel],
+        inputs: Optional[SerializedInputs] = None,
+        task: Optional[str] = None
+    ) -> BaseModel:
+        """
+        Stream a completion and parse it into ``schema`` field by field.
+
+        The node's configured model is tried first. With escalation enabled,
+        output that fails validation, or that ``needs_escalation`` rejects,
+        is regenerated once on ``ESCALATION_MODEL``.
+
+        Raises:
+            SchemaDriftError: As soon as the stream stops matching the schema
+        """
+        node_name = self.__class__.__name__
+        model_name = self.model_for(task)
+        escalate_to = None
+        if settings.ESCALATION_ENABLED and model_name != settings.ESCALATION_MODEL:
+            escalate_to = settings.ESCALATION_MODEL
+
+        try:
+            result, content = await self._structured_attempt(prompt, schema, inputs, model_name)
+        except ValueError as e:
+            # SchemaDriftError, pydantic ValidationError and parser errors are all ValueErrors
+            if escalate_to is None:
+                raise
+            logger.warning(f"{node_name} output from {model_name} is invalid, escalating to {escalate_to}: {str(e)}")
+        else:
+            if escalate_to is None or not self.needs_escalation(result):
+                await self.cache_completion(prompt, model_name, content)
+                return result
+            logger.info("%s result from %s has low confidence, escalating to %s", node_name, model_name, escalate_to)
+
+        result, content = await self._structured_attempt(prompt, schema, inputs, escalate_to, escalated=True)
+        if not self.needs_escalation(result):
+            await self.cache_completion(prompt, escalate_to, content)
+        return result
+
+    async def _structured_attempt(
+        self,
+        prompt: str,
+        schema: Type[BaseModel],
+        inputs: Optional[SerializedInputs],
+        model_name: str,
+        escalated: bool = False
+    ) -> Tuple[BaseModel, str]:
+        """Parse one completion into ``schema``; returns the result and the completion it came from."""
+        parser = StreamingObjectParser(schema, self.stream_items)
+        content = await self.invoke_llm(prompt, inputs, parser, model_name, escalated, cache_result=False)
+        if not parser.done:
+            # A lenient parser would repair a truncated object into a valid-looking
+            # result, so an unfinished one is invalid output and is never cached
+            raise SchemaDriftError(f"Completion ended before the {schema.__name__} object was complete")
+        return parser.result(), content
+
+    def _cache_key(self, prompt: str, model_name: str) -> Optional[str]:
+        """Response cache key for this prompt, or None when this node's completions are not cached."""
+        node_name = self.__class__.__name__
+        if (
+            not settings.LLM_CACHE_ENABLED
+            or not self.cache_enabled
+            or node_name in settings.LLM_CACHE_DISABLED_NODES
+        ):
+            return None
+        return llm_cache.make_key(node_name, prompt, model_name, self.temperature)
+
+    async def cache_completion(self, prompt: str, model_name: str, content: str) -> None:
+        """Cache a completion that was accepted, so broken or rejected output is never replayed."""
+        cache_key = self._cache_key(prompt, model_name)
+        if cache_key is not None:
+            await llm_cache.set(cache_key, content, self.__class__.__name__)
+
+    async def _complete(
+        self,
+        prompt: str,
+        call: Dict[str, Any],
+        parser: Optional[StreamingObjectParser]
+    ) -> str:
+        model_name = call["model"]
+        cache_key = self._cache_key(prompt, model_name)
+
+        if cache_key is not None:
+            # A bypassed request still refreshes the cache with its fresh answer
+            if not get_run_context().bypass_cache:
+                cached = await llm_cache.get(cache_key)
+                if cached is not None:
+                    call["cache_hit"] = True
+                    if parser is not None:
+                        parser.feed(cached)
+                    return cached
+
+        context = get_run_context()
+        token_sink = context.token_sink
+        # Every provider call waits for its model's rate limits; cache hits never do
+        estimated_tokens = call["prompt_tokens"] + settings.LLM_COMPLETION_TOKEN_ESTIMATE
+        async with llm_scheduler.slot(model_name, estimated_tokens, context.priority) as queued:
+            call["queue_seconds"] = round(queued, 4)
+            started = time.perf_counter()
+            if parser is not None or (self.stream_tokens and token_sink is not None):
+                content = await self._stream_llm(prompt, model_name, token_sink, parser)
+            else:
+                response = await llm_client.ainvoke(prompt, self.temperature, model_name)
+                content = response.content
+            call["llm_seconds"] = round(time.perf_counter() - started, 4)
+        return content
+
+    async def _stream_llm(
+        self,
+        prompt: str,
+        model_name: str,
+        token_sink: Optional[asyncio.Queue],
+        parser: Optional[StreamingObjectParser]
+    ) -> str:
+        node_name = self.__class__.__name__
+        forward_tokens = self.stream_tokens and token_sink is not None
+        chunks = []
+        stream = llm_client.astream(prompt, self.temperature, model_name)
+        try:
+            async for chunk in stream:
+                if not chunk.content:
+                    continue
+                chunks.append(chunk.content)
+                if forward_tokens:
+                    await token_sink.put(("token", {"node": node_name, "content": chunk.content}))
+                if parser is None:
+                    continue
+
+                for event in parser.feed(chunk.content):
+                    if token_sink is not None:
+                        await token_sink.put(("field", self._field_event(event)))
+                if parser.done:
+                    # Anything after the closing brace (e.g. a code fence) is not needed
+                    break
+        finally:
+            # Closes the provider stream when parsing stops early or the schema drifts
+            await stream.aclose()
+        return "".join(chunks)
+
+    def _field_event(self, event: tuple) -> Dict[str, Any]:
+        node_name = self.__class__.__name__
+        if event[0] == "item":
+            _, field, key, value = event
+            return {"node": node_name, "field": field, "key": key, "value": value}
+        _, field, value = event
+        if field in self.stream_items:
+            # Entries were already sent one by one
+            return {"node": node_name, "field": field, "complete": True}
+        return {"node": node_name, "field": field, "value": value}
+
     async def safe_parse(self, parser: JsonOutputParser, content: str) -> Dict[str, Any]:
         try:
             return parser.parse(content)
@@ -16,6 +16,9 @@ class CodeOutput(BaseModel):
     )
 
 class CoderNode(BaseNode):
+    stream_tokens = True
+    stream_items = ["implementation"]
+
     def __init__(self):
         super().__init__(temperature=0.2)
         self.output_parser = JsonOutputParser(pydantic_object=CodeOutput)
@@ -41,7 +44,49 @@ class CoderNode(BaseNode):
             partial_variables={"format_instructions": self.output_parser.get_format_instructions()}
         )
 
+        self.revision_prompt = PromptTemplate(
+            template="""<task>
+            You are an expert programmer revising an existing API integration.
+            Apply the reviewer feedback to the previous implementation.
+
+            Task Details: {coding_task}
+
+            Previous Implementation: {previous_implementation}
+
+            Reviewer Feedback: {feedback}
+
+            Only return the files you change, each as its complete new content.
+            Files you leave out are kept as they are.
+            </task>
+
+            {format_instructions}
+            """,
+            input_variables=["coding_task", "previous_implementation", "feedback"],
+            partial_variables={"format_instructions": self.output_parser.get_format_instructions()}
+        )
+
     async def process(self, coding_task: Dict[str, Any]) -> CodeOutput:
-        formatted_prompt = self.prompt.format(coding_task=str(coding_task))
-        response = await self.model.ainvoke(formatted_prompt)
-        return self.output_parser.parse(response.content) 
\ No newline at end of file
+        inputs = self.serialize_inputs(coding_task=coding_task)
+        formatted_prompt = self.prompt.format(**inputs.fields)
+        return await self.invoke_structured(formatted_prompt, CodeOutput, inputs) 
+
+    async def revise(
+        self,
+        coding_task: Dict[str, Any],
+        previous_output: Dict[str, Any],
+        feedback: Dict[str, Any]
+    ) -> CodeOutput:
+        inputs = self.serialize_inputs(
+            coding_task=coding_task,
+            previous_implementation=previous_output.get("implementation", {}),
+            feedback=feedback
+        )
+        formatted_prompt = self.revision_prompt.format(**inputs.fields)
+        revised = await self.invoke_structured(formatted_prompt, CodeOutput, inputs)
+
+        # Merge the changed files over the previous implementation
+        return CodeOutput(
+            implementation={**previous_output.get("implementation", {}), **revised.implementation},
+            dependencies=revised.dependencies or previous_output.get("dependencies", []),
+            setup_instructions=revised.setup_instructions or previous_output.get("setup_instructions", [])
+        )
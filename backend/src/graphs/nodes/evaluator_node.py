@@ -1,8 +1,9 @@
-from typing import Dict, Any
+from typing import Dict, Any, Optional
 from langchain.prompts import PromptTemplate
 from langchain_core.output_parsers import JsonOutputParser
 from pydantic import BaseModel, Field
 from .base_node import BaseNode
+from ...config.settings import settings
 
 class EvaluationOutput(BaseModel):
     code_evaluation: Dict[str, Any] = Field(
@@ -20,8 +21,25 @@ class EvaluationOutput(BaseModel):
     is_acceptable: bool = Field(
         description="Whether the implementation meets requirements"
     )
+    confidence: float = Field(
+        default=1.0,
+        ge=0.0,
+        le=1.0,
+        description="Confidence in this evaluation, from 0 (guess) to 1 (certain)"
+    )
 
 class EvaluatorNode(BaseNode):
+    # Generated source dominates this prompt; drop the least useful parts first
+    elision_order = [
+        "code_output.setup_instructions",
+        "test_output.test_implementation",
+        "execution_results.output",
+        "code_output.dependencies",
+        "test_output.coverage_requirements",
+        "original_plan.expected_output",
+        "original_plan.validation_rules"
+    ]
+
     def __init__(self):
         super().__init__(temperature=0.2)
         self.output_parser = JsonOutputParser(pydantic_object=EvaluationOutput)
@@ -40,6 +58,9 @@ class EvaluatorNode(BaseNode):
             Original Requirements:
             {original_plan}
 
+            Execution Results (from actually importing the code and running the tests):
+            {execution_results}
+
             Evaluate:
             1. Code quality and correctness
             2. Test coverage and effectiveness
@@ -48,24 +69,55 @@ class EvaluatorNode(BaseNode):
             5. Performance considerations
 
             Provide a detailed evaluation and determine if the implementation is acceptable.
+            Base test_results on the execution results when they are available.
             </task>
 
             {format_instructions}
             """,
-            input_variables=["code_output", "test_output", "original_plan"],
+            input_variables=["code_output", "test_output", "original_plan", "execution_results"],
             partial_variables={"format_instructions": self.output_parser.get_format_instructions()}
         )
 
+    def needs_escalation(self, result: EvaluationOutput) -> bool:
+        return result.confidence < settings.ESCALATION_MIN_CONFIDENCE
+
     async def process(
         self, 
         code_output: Dict[str, Any], 
         test_output: Dict[str, Any],
-        original_plan: Dict[str, Any]
+        original_plan: Dict[str, Any],
+        execution: Optional[Dict[str, Any]] = None
     ) -> EvaluationOutput:
-        formatted_prompt = self.prompt.format(
-            code_output=str(code_output),
-            test_output=str(test_output),
-            original_plan=str(original_plan)
+        inputs = self.serialize_inputs(
+            code_output=code_output,
+            test_output=test_output,
+            original_plan=original_plan,
+            execution_results=execution if execution is not None else "Not executed"
+        )
+        formatted_prompt = self.prompt.format(**inputs.fields)
+        evaluation = await self.invoke_structured(formatted_prompt, EvaluationOutput, inputs)
+        if execution is not None:
+            # Real results win over what the model inferred from reading the tests
+            evaluation.test_results = execution
+            if execution.get("passed") is False:
+                evaluation.is_acceptable = False
+        return evaluation
+
+    def reject_uncompiled(self, execution: Dict[str, Any], implementation_files: list[str]) -> EvaluationOutput:
+        """Evaluation for code that does not compile, produced without asking the model."""
+        issues = [
+            {
+                "component": "implementation" if name in implementation_files else "tests",
+                "file": name,
+                "issue": f"Syntax error: {error}"
+            }
+            for name, error in execution["syntax_errors"].items()
+        ]
+        return EvaluationOutput(
+            code_evaluation={"compiles": False},
+            issues_found=issues,
+            test_results=execution,
+            recommendations=["Fix the syntax errors before anything else"],
+            is_acceptable=False,
+            confidence=1.0
         )
-        response = await self.model.ainvoke(formatted_prompt)
-        return self.output_parser.parse(response.content) 
\ No newline at end of file
@@ -50,6 +50,6 @@ class PlannerNode(BaseNode):
         )
 
     async def process(self, user_input: str) -> PlannerOutput:
-        formatted_prompt = self.prompt.format(user_input=user_input)
-        response = await self.model.ainvoke(formatted_prompt)
-        return self.output_parser.parse(response.content) 
\ No newline at end of file
+        inputs = self.serialize_inputs(user_input=user_input)
+        formatted_prompt = self.prompt.format(**inputs.fields)
+        return await self.invoke_structured(formatted_prompt, PlannerOutput, inputs) 
\ No newline at end of file
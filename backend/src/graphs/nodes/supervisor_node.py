@@ -25,11 +25,24 @@ class SupervisorFeedback(BaseModel):
     next_steps: list[str] = Field(
         description="Steps to take next"
     )
+    affected_components: list[str] = Field(
+        default_factory=lambda: ["coder", "tester"],
+        description="Which outputs must be reworked: any of \"coder\" (implementation) and \"tester\" (tests)"
+    )
 
 class SupervisorNode(BaseNode):
+    elision_order = [
+        "plan.validation_rules",
+        "plan.expected_output",
+        "original_plan.expected_output",
+        "original_plan.validation_rules",
+        "evaluation.test_results"
+    ]
+
     def __init__(self):
         super().__init__(temperature=0.3)
         self.output_parser = JsonOutputParser(pydantic_object=SupervisorOutput)
+        self.review_parser = JsonOutputParser(pydantic_object=SupervisorFeedback)
         
         self.prompt = PromptTemplate(
             template="""<task>
@@ -63,27 +76,28 @@ class SupervisorNode(BaseNode):
             1. If the implementation meets requirements
             2. What changes or improvements are needed
             3. Next steps for the team
+            4. Which outputs need rework: the implementation ("coder"), the tests ("tester"), or both.
+               Only list a component if the evaluation found problems in it.
             </task>
 
             {format_instructions}
             """,
             input_variables=["evaluation", "original_plan"],
-            partial_variables={"format_instructions": JsonOutputParser(pydantic_object=SupervisorFeedback).get_format_instructions()}
+            partial_variables={"format_instructions": self.review_parser.get_format_instructions()}
         )
 
     async def process(self, plan: Dict[str, Any]) -> SupervisorOutput:
-        formatted_prompt = self.prompt.format(plan=str(plan))
-        response = await self.model.ainvoke(formatted_prompt)
-        return self.output_parser.parse(response.content)
+        inputs = self.serialize_inputs(plan=plan)
+        formatted_prompt = self.prompt.format(**inputs.fields)
+        return await self.invoke_structured(formatted_prompt, SupervisorOutput, inputs)
 
     async def review_evaluation(
         self, 
         evaluation: Dict[str, Any],
         original_plan: Dict[str, Any]
     ) -> SupervisorFeedback:
-        formatted_prompt = self.review_prompt.format(
-            evaluation=str(evaluation),
-            original_plan=str(original_plan)
-        )
-        response = await self.model.ainvoke(formatted_prompt)
-        return self.output_parser.parse(response.content) 
\ No newline at end of file
+        inputs = self.serialize_inputs(evaluation=evaluation, original_plan=original_plan)
+        formatted_prompt = self.review_prompt.format(**inputs.fields)
+        return await self.invoke_structured(
+            formatted_prompt, SupervisorFeedback, inputs, task="review_evaluation"
+        ) 
\ No newline at end of file
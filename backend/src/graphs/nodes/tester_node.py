@@ -16,6 +16,8 @@ class TestOutput(BaseModel):
     )
 
 class TesterNode(BaseNode):
+    stream_items = ["test_implementation"]
+
     def __init__(self):
         super().__init__(temperature=0.2)
         self.output_parser = JsonOutputParser(pydantic_object=TestOutput)
@@ -39,6 +41,6 @@ class TesterNode(BaseNode):
         )
 
     async def process(self, testing_task: Dict[str, Any]) -> TestOutput:
-        formatted_prompt = self.prompt.format(testing_task=str(testing_task))
-        response = await self.model.ainvoke(formatted_prompt)
-        return self.output_parser.parse(response.content) 
\ No newline at end of file
+        inputs = self.serialize_inputs(testing_task=testing_task)
+        formatted_prompt = self.prompt.format(**inputs.fields)
+        return await self.invoke_structured(formatted_prompt, TestOutput, inputs) 
\ No newline at end of file
@@ -1,9 +1,19 @@
+from utils.startup_profiler import startup_timer
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 from config.database import connect_to_mongo, close_mongo_connection
+from graphs.flows.flow_registry import start_warm_up
+from graphs.flows.job_runner import job_runner
+from graphs.flows.checkpointer import checkpointer
+from graphs.flows.run_store import run_store
 from routes import router
+from utils.llm_client import llm_client
+from utils.llm_cache import llm_cache
+from utils.health_prober import health_prober
 from utils.logging import logger
 
+startup_timer.mark("imports")
+
 app = FastAPI(
     title="Hacklahoma API",
     description="API for Hacklahoma 2025 project",
@@ -23,10 +33,23 @@ app.add_middleware(
 async def startup_db_client():
     logger.info("Starting up application")
     await connect_to_mongo()
+    await llm_cache.ensure_indexes()
+    await checkpointer.ensure_indexes()
+    await run_store.ensure_indexes()
+    run_store.start()
+    # LangGraph, the nodes and the plan index load in the background; health checks are served meanwhile
+    start_warm_up()
+    await job_runner.start()
+    health_prober.start()
+    logger.info(f"Accepting requests {startup_timer.mark('ready'):.2f}s after start")
 
 @app.on_event("shutdown")
 async def shutdown_db_client():
     logger.info("Shutting down application")
+    await health_prober.stop()
+    await job_runner.stop()
+    await run_store.stop()
+    await llm_client.aclose()
     await close_mongo_connection()
 
 @app.get("/api/health")
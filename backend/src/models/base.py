@@ -1,5 +1,6 @@
 from datetime import datetime
 from typing import Optional
+from bson import ObjectId
 from pydantic import BaseModel, Field
 
 class PyObjectId(str):
@@ -8,7 +9,9 @@ class PyObjectId(str):
         yield cls.validate
 
     @classmethod
-    def validate(cls, v):
+    def validate(cls, v, *_):
+        if isinstance(v, ObjectId):
+            return str(v)
         if not isinstance(v, str):
             raise TypeError('ObjectId required')
         return str(v)
@@ -0,0 +1,22 @@
+from datetime import datetime
+from typing import Any, Dict, Optional
+from pydantic import Field
+from .base import DBModelBase
+
+class JobStatus:
+    QUEUED = "queued"
+    RUNNING = "running"
+    COMPLETED = "completed"
+    FAILED = "failed"
+
+class IntegrationJob(DBModelBase):
+    job_id: str
+    user_input: str
+    config: Optional[Dict[str, Any]] = None
+    status: str = JobStatus.QUEUED
+    result: Optional[Dict[str, Any]] = None
+    error: Optional[str] = None
+    # JOB_RUNNER_ID of the instance whose queue holds the job
+    runner_id: Optional[str] = None
+    started_at: Optional[datetime] = Field(default=None)
+    finished_at: Optional[datetime] = Field(default=None)
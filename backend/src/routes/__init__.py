@@ -1,10 +1,20 @@
 from fastapi import APIRouter
 from .api_v1 import router as api_v1_router
+from .artifacts import router as artifacts_router
+from .example import router as items_router
 from .health import router as health_router
+from .jobs import router as jobs_router
+from .metrics import router as metrics_router
+from .runs import router as runs_router
 
 # Main router that includes all sub-routers
 router = APIRouter()
 
 # Include all routers
 router.include_router(health_router)
-router.include_router(api_v1_router) 
\ No newline at end of file
+router.include_router(api_v1_router)
+router.include_router(jobs_router)
+router.include_router(metrics_router)
+router.include_router(runs_router)
+router.include_router(artifacts_router)
+router.include_router(items_router) 
\ No newline at end of file
@@ -1,11 +1,45 @@
-from fastapi import APIRouter, HTTPException, status
+import asyncio
+import json
+from fastapi import APIRouter, Header, HTTPException, Query, Request, Response, status
+from fastapi.responses import StreamingResponse
 from pydantic import BaseModel
-from typing import Dict, Any
-from ..graphs.flows.api_integration_flow import create_planning_flow, GraphState
-from ..utils.logging import logger
+from typing import AsyncIterator, Awaitable, Callable, Dict, Any, List, TypeVar
+from uuid import uuid4
+from ..graphs.flows.state import state_delta
+from ..graphs.flows.flow_registry import (
+    get_flow, start_run, finish_run, run_integration_flow, resume_integration_flow
+)
+from ..utils.llm_client import llm_client
+from ..config.settings import settings
+from ..utils.llm_scheduler import llm_scheduler, RunAdmission, PRIORITY_BATCH, PRIORITY_INTERACTIVE
+from ..utils.logging import get_logger
+from ..utils.response_encoding import JSON, Include, encode, encoded_response, parse_fields
+from ..utils.run_context import RunContext, set_run_context, reset_run_context
+from ..utils.single_flight import SingleFlight
 
 router = APIRouter(prefix="/api/v1")
 
+T = TypeVar("T")
+
+logger = get_logger("api")
+
+# In-flight /integration/plan runs keyed on the normalized request
+_plan_flights = SingleFlight()
+
+# In-flight resumes keyed on run id; two resumes of one run would append to the same checkpoint steps
+_resume_flights = SingleFlight()
+
+# How often a waiting request checks whether its client has gone away
+DISCONNECT_POLL_SECONDS = 0.5
+
+# Non-standard status used by proxies for "client closed request"
+CLIENT_CLOSED_REQUEST = 499
+
+FIELDS_DESCRIPTION = (
+    "Comma-separated response fields to return, e.g. final_status,evaluation; "
+    "code_output.files returns only that key of code_output"
+)
+
 class IntegrationRequest(BaseModel):
     user_input: str
     config: Dict[str, Any] | None = None
@@ -16,67 +50,398 @@ class IntegrationResponse(BaseModel):
     code_output: dict
     test_output: dict
     evaluation: dict
+    execution: dict | None = None
     supervisor_feedback: dict | None
     iteration_count: int
     final_status: str
+    reused_from: dict | None = None
+    run_id: str | None = None
+    llm_calls: list[dict] | None = None
+    node_metrics: list[dict] | None = None
+
+def _integration_response(
+    final_state: Dict[str, Any],
+    run_id: str | None,
+    llm_calls: list[dict] | None = None
+) -> IntegrationResponse:
+    return IntegrationResponse(
+        plan=final_state["plan"],
+        supervisor_output=final_state["supervisor_output"],
+        code_output=final_state["code_output"],
+        test_output=final_state["test_output"],
+        evaluation=final_state["evaluation"],
+        execution=final_state.get("execution"),
+        supervisor_feedback=final_state.get("supervisor_feedback"),
+        iteration_count=final_state["iteration_count"],
+        final_status=final_state["final_status"],
+        reused_from=final_state.get("reused_from") or None,
+        run_id=run_id,
+        llm_calls=llm_calls,
+        node_metrics=final_state.get("node_metrics")
+    )
 
 @router.post("/integration/plan", response_model=IntegrationResponse)
-async def create_integration_plan(request: IntegrationRequest):
+async def create_integration_plan(
+    request: IntegrationRequest,
+    http_request: Request,
+    cache_bypass: bool = Header(default=False, alias="X-Cache-Bypass"),
+    fields: str | None = Query(default=None, description=FIELDS_DESCRIPTION)
+):
     """
     Create an integration plan and execute the API integration flow.
     
+    Identical concurrent requests attach to the same running flow and share
+    its result. A client that disconnects detaches from the shared run, which
+    is only cancelled once no client is waiting for it.
+    
+    The result is encoded as JSON, or MessagePack when the client's
+    ``Accept`` prefers it, and compressed according to ``Accept-Encoding``.
+    
     Args:
         request: IntegrationRequest containing user input and optional configuration
+        http_request: The raw request, used to notice client disconnects and negotiate the encoding
+        cache_bypass: When set, skip cached LLM responses and query the model afresh
+        fields: Only return these response fields
     
     Returns:
-        IntegrationResponse with the complete flow results
+        IntegrationResponse with the complete flow results, or the requested fields
         
     Raises:
-        HTTPException: If flow execution fails or validation errors occur
+        HTTPException: 422 if ``fields`` names an unknown field, 429 if the LLM
+            scheduler is saturated, or if flow execution fails or validation errors occur
     """
+    include = _parse_fields(fields)
+    key = _request_key(request, cache_bypass)
+    if _plan_flights.in_flight(key):
+        logger.info("Attaching to in-flight integration flow for identical request")
+    # Only the request that starts the run is admitted; joining it adds no LLM load
+    waiter = asyncio.create_task(
+        _plan_flights.do(key, lambda: _admit_and_run(lambda: _run_plan(request, cache_bypass)))
+    )
     try:
-        logger.info(f"Starting integration flow for request: {request.user_input}")
+        while not waiter.done():
+            await asyncio.wait({waiter}, timeout=DISCONNECT_POLL_SECONDS)
+            if not waiter.done() and await http_request.is_disconnected():
+                waiter.cancel()
+                logger.info("Client disconnected; detached from integration flow")
+                return Response(status_code=CLIENT_CLOSED_REQUEST)
+        result = waiter.result()
+    except HTTPException:
+        raise
+    except ValueError as e:
+        logger.error(f"Validation error: {str(e)}")
+        raise HTTPException(
+            status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
+            detail=str(e)
+        )
+    except Exception as e:
+        logger.error(f"Flow execution error: {str(e)}")
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"Flow execution failed: {str(e)}"
+        )
+    finally:
+        if not waiter.done():
+            waiter.cancel()
+    return await encoded_response(http_request, result, include)
+
+def _parse_fields(fields: str | None) -> Include | None:
+    try:
+        return parse_fields(fields, IntegrationResponse)
+    except ValueError as e:
+        raise HTTPException(
+            status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
+            detail=str(e)
+        )
+
+def _check_admission(priority: int = PRIORITY_INTERACTIVE) -> None:
+    delay = llm_scheduler.admission_delay(priority)
+    if delay is not None:
+        logger.warning(f"Rejecting integration run; LLM queue needs ~{delay:.0f}s to drain")
+        raise HTTPException(
+            status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+            detail="Too many integration runs in progress, retry later",
+            headers={"Retry-After": llm_scheduler.retry_after(delay)}
+        )
+
+def _admit(priority: int = PRIORITY_INTERACTIVE) -> RunAdmission:
+    """Admit a run, counting it against later admissions until it is released."""
+    _check_admission(priority)
+    return llm_scheduler.start_run(priority)
+
+async def _admit_and_run(
+    run: Callable[[], Awaitable[T]],
+    priority: int = PRIORITY_INTERACTIVE,
+    wait: bool = False
+) -> T:
+    """
+    Admit a run, then start it, releasing the admission once it finishes.
+
+    Called by the single-flight leader, so requests that attach to a run
+    never take an admission of their own. With ``wait`` the run waits for
+    capacity (batch items); otherwise it is rejected with a 429.
+    """
+    if wait:
+        admission = await llm_scheduler.wait_for_run(priority, settings.LLM_ADMISSION_MAX_WAIT_SECONDS)
+    else:
+        admission = _admit(priority)
+    try:
+        return await run()
+    finally:
+        admission.release()
+
+async def _admitted(admission: RunAdmission, work: Awaitable[T]) -> T:
+    """Run ``work`` for an admitted run and release the admission once it finishes."""
+    admission.started = True
+    try:
+        return await work
+    finally:
+        admission.release()
+
+def _release_unstarted(admission: RunAdmission) -> None:
+    # The client left before its run began
+    if not admission.started:
+        admission.release()
+
+def _request_key(request: IntegrationRequest, cache_bypass: bool) -> str:
+    normalized_input = " ".join(request.user_input.lower().split())
+    config = json.dumps(request.config or {}, sort_keys=True, default=str)
+    return f"{normalized_input}|{config}|{cache_bypass}"
+
+async def _run_plan(
+    request: IntegrationRequest,
+    cache_bypass: bool,
+    priority: int = PRIORITY_INTERACTIVE
+) -> IntegrationResponse:
+    run_id = uuid4().hex
+    context = RunContext(run_id=run_id, bypass_cache=cache_bypass, llm_calls=[], priority=priority)
+    context_token = set_run_context(context)
+    try:
+        logger.info("Starting integration flow for request: %s", request.user_input)
         
-        # Initialize the flow
-        flow = await create_planning_flow()
+        # Execute the flow compiled at startup
+        final_state = await run_integration_flow(request.user_input)
         
-        # Create initial state
-        initial_state: GraphState = {
-            "user_input": request.user_input,
-            "plan": {},
-            "supervisor_output": {},
-            "code_output": {},
-            "test_output": {},
-            "evaluation": {},
-            "supervisor_feedback": {},
-            "iteration_count": 0,
-            "final_status": ""
-        }
+        logger.info("Flow completed with status: %s", final_state["final_status"])
         
-        # Execute the flow
-        final_state = await flow.ainvoke(initial_state)
+        return _integration_response(final_state, run_id, context.llm_calls)
+    finally:
+        reset_run_context(context_token)
+
+@router.post("/integration/batch")
+async def run_integration_batch(
+    requests: List[IntegrationRequest],
+    cache_bypass: bool = Header(default=False, alias="X-Cache-Bypass"),
+    fields: str | None = Query(default=None, description=FIELDS_DESCRIPTION)
+):
+    """
+    Run many integration requests on the shared flow and stream results as NDJSON.
+    
+    At most ``BATCH_MAX_CONCURRENCY`` items run at once, at batch priority so
+    interactive requests are served first. Each result is written as one JSON
+    line as soon as its run finishes, so lines arrive in completion order;
+    ``index`` refers to the item's position in the request. A failing item
+    produces an ``error`` line and does not affect the others.
+    
+    Args:
+        requests: List of IntegrationRequest items
+        cache_bypass: When set, skip cached LLM responses and query the model afresh
+        fields: Only return these fields of each result
+    
+    Returns:
+        StreamingResponse with an ``application/x-ndjson`` body
         
-        logger.info(f"Flow completed with status: {final_state['final_status']}")
+    Raises:
+        HTTPException: 422 if the batch is empty or too large or ``fields`` names
+            an unknown field, 429 if the LLM scheduler is saturated
+    """
+    include = _parse_fields(fields)
+    if not requests or len(requests) > settings.BATCH_MAX_ITEMS:
+        raise HTTPException(
+            status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
+            detail=f"A batch must contain between 1 and {settings.BATCH_MAX_ITEMS} items"
+        )
+    _check_admission(PRIORITY_BATCH)
+    logger.info("Starting integration batch of %d items", len(requests))
+
+    async def run_item(index: int, item: IntegrationRequest, limit: asyncio.Semaphore) -> Dict[str, Any]:
+        async with limit:
+            try:
+                # Identical items (or identical in-flight interactive runs) share one flow run;
+                # a run that starts waits for its own admission while earlier runs hold the capacity
+                result = await _plan_flights.do(
+                    _request_key(item, cache_bypass),
+                    lambda: _admit_and_run(
+                        lambda: _run_plan(item, cache_bypass, PRIORITY_BATCH),
+                        PRIORITY_BATCH,
+                        wait=True
+                    )
+                )
+                return {"index": index, "status": "ok", "result": result.model_dump(include=include)}
+            except Exception as e:
+                logger.error(f"Batch item {index} failed: {str(e)}")
+                return {"index": index, "status": "error", "error": str(e)}
+
+    async def result_lines() -> AsyncIterator[bytes]:
+        limit = asyncio.Semaphore(settings.BATCH_MAX_CONCURRENCY)
+        tasks = [asyncio.create_task(run_item(index, item, limit)) for index, item in enumerate(requests)]
+        try:
+            for finished in asyncio.as_completed(tasks):
+                yield encode(await finished, JSON) + b"\n"
+        finally:
+            # Stop outstanding runs as soon as the client goes away
+            for task in tasks:
+                task.cancel()
+
+    return StreamingResponse(result_lines(), media_type="application/x-ndjson")
+
+def _sse_event(event: str, data: Dict[str, Any]) -> str:
+    return f"event: {event}\ndata: {json.dumps(data, default=str)}\n\n"
+
+@router.post("/integration/plan/stream")
+async def stream_integration_plan(
+    request: IntegrationRequest,
+    cache_bypass: bool = Header(default=False, alias="X-Cache-Bypass")
+):
+    """
+    Execute the API integration flow and stream progress as server-sent events.
+    
+    Emits a ``node`` event with each node's state delta as soon as it finishes,
+    ``field`` events as each output field (or generated file) is validated,
+    ``token`` events while the coder is generating, and a final ``done`` or
+    ``error`` event.
+    
+    Args:
+        request: IntegrationRequest containing user input and optional configuration
+        cache_bypass: When set, skip cached LLM responses and query the model afresh
+    
+    Returns:
+        StreamingResponse with a ``text/event-stream`` body
         
-        return IntegrationResponse(
-            plan=final_state["plan"],
-            supervisor_output=final_state["supervisor_output"],
-            code_output=final_state["code_output"],
-            test_output=final_state["test_output"],
-            evaluation=final_state["evaluation"],
-            supervisor_feedback=final_state.get("supervisor_feedback"),
-            iteration_count=final_state["iteration_count"],
-            final_status=final_state["final_status"]
+    Raises:
+        HTTPException: 429 if the LLM scheduler is saturated
+    """
+    admission = _admit()
+    run_id = uuid4().hex
+    events: asyncio.Queue = asyncio.Queue()
+
+    async def run_flow() -> None:
+        context = RunContext(
+            run_id=run_id,
+            bypass_cache=cache_bypass,
+            token_sink=events,
+            llm_calls=[]
         )
-    except ValueError as e:
-        logger.error(f"Validation error: {str(e)}")
+        context_token = set_run_context(context)
+        final_state = None
+        try:
+            logger.info("Starting streamed integration flow for request: %s", request.user_input)
+            flow = await get_flow()
+            state: Dict[str, Any] = await start_run(request.user_input)
+
+            # "values" chunks carry the state after the graph's reducers have merged each step
+            async for mode, chunk in flow.astream(state, stream_mode=["updates", "values"]):
+                if mode == "values":
+                    state = chunk
+                    continue
+                for node_name, output in chunk.items():
+                    delta = state_delta(state, output)
+                    await events.put(("node", {"node": node_name, "delta": delta}))
+            final_state = state
+
+            await events.put(("done", {
+                "run_id": run_id,
+                "final_status": state.get("final_status", ""),
+                "iteration_count": state.get("iteration_count", 0),
+                "llm_calls": context.llm_calls
+            }))
+        except Exception as e:
+            logger.error(f"Streamed flow execution error: {str(e)}")
+            await events.put(("error", {"detail": f"Flow execution failed: {str(e)}"}))
+        finally:
+            finish_run(final_state)
+            reset_run_context(context_token)
+            await events.put(None)
+
+    async def event_stream() -> AsyncIterator[str]:
+        runner = asyncio.create_task(_admitted(admission, run_flow()))
+        try:
+            while True:
+                item = await events.get()
+                if item is None:
+                    break
+                event, data = item
+                yield _sse_event(event, data)
+        finally:
+            # Stop LLM work as soon as the client goes away
+            runner.cancel()
+            _release_unstarted(admission)
+
+    return StreamingResponse(
+        event_stream(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
+@router.post("/integration/runs/{run_id}/resume", response_model=IntegrationResponse)
+async def resume_integration_run(
+    run_id: str,
+    http_request: Request,
+    fields: str | None = Query(default=None, description=FIELDS_DESCRIPTION)
+):
+    """
+    Resume a run from its last good checkpoint instead of starting over.
+    
+    A resume requested while the same run is already being resumed attaches
+    to that resume and shares its result.
+    
+    Args:
+        run_id: Id returned by a previous integration request
+        http_request: The raw request, used to negotiate the response encoding
+        fields: Only return these response fields
+    
+    Returns:
+        IntegrationResponse with the results of the resumed run, or the requested fields
+        
+    Raises:
+        HTTPException: 404 if the run has no checkpoints, 422 if ``fields`` names
+            an unknown field, 500 if the flow fails again
+    """
+    include = _parse_fields(fields)
+    try:
+        result = await _resume_flights.do(run_id, lambda: _resume(run_id))
+    except LookupError as e:
         raise HTTPException(
-            status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
+            status_code=status.HTTP_404_NOT_FOUND,
             detail=str(e)
         )
     except Exception as e:
-        logger.error(f"Flow execution error: {str(e)}")
+        logger.error(f"Resume error for run {run_id}: {str(e)}")
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail=f"Flow execution failed: {str(e)}"
-        ) 
\ No newline at end of file
+        )
+    return await encoded_response(http_request, result, include)
+
+async def _resume(run_id: str) -> IntegrationResponse:
+    context = RunContext(run_id=run_id, llm_calls=[])
+    context_token = set_run_context(context)
+    try:
+        final_state = await resume_integration_flow(run_id)
+        logger.info("Resumed run %s finished with status: %s", run_id, final_state["final_status"])
+        return _integration_response(final_state, run_id, context.llm_calls)
+    finally:
+        reset_run_context(context_token)
+
+@router.get("/llm/metrics")
+async def get_llm_metrics():
+    """
+    Report LLM scheduler queue depth and wait times and connection pool usage.
+    
+    Returns:
+        Dict with ``scheduler`` and ``pool`` counters
+    """
+    return {
+        "scheduler": llm_scheduler.stats(),
+        "pool": llm_client.metrics()
+    }
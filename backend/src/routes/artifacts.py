@@ -0,0 +1,52 @@
+from fastapi import APIRouter, HTTPException, Request, Response, status
+from ..config.settings import settings
+from ..graphs.flows.artifact_store import DIGEST_PATTERN, artifact_store
+from ..utils.response_encoding import IDENTITY, compress, negotiate_encoding
+
+router = APIRouter(prefix="/api/v1")
+
+@router.get("/artifacts/{sha256}")
+async def get_artifact(sha256: str, request: Request):
+    """
+    Return the content of a generated file referenced by a flow result.
+
+    Artifacts never change, so responses carry the digest as their ETag and
+    may be cached indefinitely; a matching ``If-None-Match`` gets a 304.
+
+    Args:
+        sha256: The ``sha256`` of a file reference in ``code_output`` or ``test_output``
+        request: The raw request, used for conditional requests and to negotiate compression
+
+    Returns:
+        Response with the file as ``text/plain``
+
+    Raises:
+        HTTPException: 422 if ``sha256`` is not a SHA-256 hex digest, 404 if no such artifact is stored
+    """
+    if not DIGEST_PATTERN.match(sha256):
+        raise HTTPException(
+            status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
+            detail=f"Invalid artifact digest: {sha256}"
+        )
+    headers = {
+        "ETag": f'"{sha256}"',
+        "Cache-Control": "public, max-age=31536000, immutable",
+        "Vary": "Accept-Encoding"
+    }
+    if request.headers.get("if-none-match") == headers["ETag"]:
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers)
+
+    content = await artifact_store.get(sha256)
+    if content is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=f"Artifact {sha256} not found"
+        )
+    body = content.encode("utf-8")
+    encoding = IDENTITY
+    if settings.RESPONSE_COMPRESSION_ENABLED and len(body) >= settings.RESPONSE_COMPRESSION_MIN_BYTES:
+        encoding = negotiate_encoding(request.headers.get("accept-encoding"))
+    if encoding != IDENTITY:
+        body = compress(body, encoding)
+        headers["Content-Encoding"] = encoding
+    return Response(content=body, media_type="text/plain; charset=utf-8", headers=headers)
@@ -1,7 +1,14 @@
-from fastapi import APIRouter, HTTPException
-from config.database import Database
-from models.base import DBModelBase
-from typing import List
+import json
+from datetime import datetime
+from fastapi import APIRouter, HTTPException, Query, status
+from fastapi.responses import StreamingResponse
+from bson import ObjectId
+from pymongo import ASCENDING
+from pymongo.errors import BulkWriteError
+from ..config.database import Database, DATABASE_NAME
+from ..config.settings import settings
+from ..models.base import DBModelBase
+from typing import Any, AsyncIterator, Dict, List
 from pydantic import BaseModel
 
 router = APIRouter()
@@ -10,15 +17,140 @@ class Item(DBModelBase):
     name: str
     description: str
 
+class ItemPage(BaseModel):
+    items: List[Item]
+    next_cursor: str | None
+
+class BulkInsertResponse(BaseModel):
+    inserted_count: int
+    inserted_ids: List[str]
+    errors: List[Dict[str, Any]]
+
+# Only the fields an Item carries; anything else stored alongside stays in Mongo
+ITEM_PROJECTION = {"name": 1, "description": 1, "created_at": 1, "updated_at": 1}
+
+def _items():
+    if Database.client is None:
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="Database is not connected"
+        )
+    return Database.client[DATABASE_NAME].items
+
+def _after_query(after: str | None) -> Dict[str, Any]:
+    if after is None:
+        return {}
+    if not ObjectId.is_valid(after):
+        raise HTTPException(
+            status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
+            detail=f"Invalid cursor: {after}"
+        )
+    return {"_id": {"$gt": ObjectId(after)}}
+
+def _document(item: Item) -> Dict[str, Any]:
+    # Let Mongo assign the ObjectId instead of storing a null _id
+    return item.model_dump(by_alias=True, exclude={"id"})
+
+def _encode(document: Dict[str, Any]) -> str:
+    document["_id"] = str(document["_id"])
+    return json.dumps(
+        document,
+        default=lambda value: value.isoformat() if isinstance(value, datetime) else str(value)
+    )
+
 @router.post("/items/", response_model=Item)
 async def create_item(item: Item):
-    db = Database.client[DATABASE_NAME]
-    result = await db.items.insert_one(item.dict(by_alias=True))
-    created_item = await db.items.find_one({"_id": result.inserted_id})
-    return Item(**created_item)
-
-@router.get("/items/", response_model=List[Item])
-async def get_items():
-    db = Database.client[DATABASE_NAME]
-    items = await db.items.find().to_list(1000)
-    return [Item(**item) for item in items] 
\ No newline at end of file
+    result = await _items().insert_one(_document(item))
+    # The stored document is exactly what was sent, so there is nothing to read back
+    item.id = str(result.inserted_id)
+    return item
+
+@router.post("/items/bulk", response_model=BulkInsertResponse)
+async def create_items(items: List[Item]):
+    """
+    Insert many items with one unordered ``insert_many``.
+
+    A failing document (e.g. a duplicate key) does not stop the others;
+    its position and error are reported in ``errors``.
+
+    Raises:
+        HTTPException: 422 if the batch is empty or larger than ``ITEMS_BULK_MAX_ITEMS``
+    """
+    if not items or len(items) > settings.ITEMS_BULK_MAX_ITEMS:
+        raise HTTPException(
+            status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
+            detail=f"A bulk insert must contain between 1 and {settings.ITEMS_BULK_MAX_ITEMS} items"
+        )
+    documents = [_document(item) for item in items]
+    errors: List[Dict[str, Any]] = []
+    try:
+        await _items().insert_many(documents, ordered=False)
+    except BulkWriteError as e:
+        errors = [
+            {"index": error["index"], "error": error.get("errmsg", "")}
+            for error in e.details.get("writeErrors", [])
+        ]
+    failed = {error["index"] for error in errors}
+    # insert_many sets _id on each document before sending it
+    inserted_ids = [str(document["_id"]) for index, document in enumerate(documents) if index not in failed]
+    return BulkInsertResponse(
+        inserted_count=len(inserted_ids),
+        inserted_ids=inserted_ids,
+        errors=errors
+    )
+
+@router.get("/items/", response_model=ItemPage)
+async def get_items(
+    limit: int = Query(default=settings.ITEMS_PAGE_SIZE, ge=1, le=settings.ITEMS_MAX_PAGE_SIZE),
+    after: str | None = None
+):
+    """
+    List items in ``_id`` order, one page at a time.
+
+    Args:
+        limit: Page size
+        after: ``next_cursor`` of the previous page
+
+    Returns:
+        ItemPage with the items and the cursor of the next page, if any
+
+    Raises:
+        HTTPException: 422 if the cursor is not an item id
+    """
+    documents = await _items().find(_after_query(after), ITEM_PROJECTION).sort(
+        "_id", ASCENDING
+    ).limit(limit + 1).to_list(limit + 1)
+
+    next_cursor = None
+    if len(documents) > limit:
+        documents = documents[:limit]
+        next_cursor = str(documents[-1]["_id"])
+    return ItemPage(items=[Item(**document) for document in documents], next_cursor=next_cursor)
+
+@router.get("/items/stream")
+async def stream_items(after: str | None = None):
+    """
+    Stream every item (after ``after``) as NDJSON, in ``_id`` order.
+
+    Documents are fetched from the cursor ``ITEMS_STREAM_BATCH_SIZE`` at a
+    time and written out as they arrive, so memory stays flat however
+    large the collection is.
+
+    Returns:
+        StreamingResponse with an ``application/x-ndjson`` body
+
+    Raises:
+        HTTPException: 422 if ``after`` is not an item id
+    """
+    cursor = _items().find(_after_query(after), ITEM_PROJECTION).sort(
+        "_id", ASCENDING
+    ).batch_size(settings.ITEMS_STREAM_BATCH_SIZE)
+
+    async def lines() -> AsyncIterator[str]:
+        try:
+            async for document in cursor:
+                yield _encode(document) + "\n"
+        finally:
+            await cursor.close()
+
+    return StreamingResponse(lines(), media_type="application/x-ndjson")
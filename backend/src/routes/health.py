@@ -1,42 +1,93 @@
 from fastapi import APIRouter, Response, status
 from pydantic import BaseModel
-from typing import Dict
-from ..config.database import Database
-from ..utils.logging import logger
+from typing import Any, Dict
+from ..config.settings import settings
+from ..graphs.flows.flow_registry import FlowRegistry
+from ..utils.health_prober import health_prober, HEALTHY
+from ..utils.llm_client import llm_client
+from ..utils.llm_scheduler import llm_scheduler
 
 router = APIRouter()
 
 class HealthResponse(BaseModel):
     status: str
     details: Dict[str, str]
+    checks: Dict[str, Dict[str, Any]] = {}
+
+class ReadinessResponse(BaseModel):
+    ready: bool
+    reasons: list[str]
+    pool: Dict[str, float]
 
 @router.get("/health", response_model=HealthResponse)
 async def health_check():
     """
-    Check the health of the application and its dependencies.
-    
+    Report the health of the application and its dependencies.
+
+    Served from the background prober's latest results, so polling this
+    endpoint never reaches MongoDB or the LLM provider.
+
     Returns:
-        HealthResponse containing status and details of each component
+        HealthResponse containing status and details of each component,
+        with the latency and time of its last check
     """
-    health_details = {
-        "api": "healthy",
-        "database": "unknown"
-    }
-    
-    try:
-        # Check MongoDB connection
-        await Database.client.admin.command('ping')
-        health_details["database"] = "healthy"
-        
-        return HealthResponse(
-            status="healthy",
-            details=health_details
-        )
-    except Exception as e:
-        logger.error(f"Health check failed: {str(e)}")
-        health_details["database"] = "unhealthy"
-        
-        return HealthResponse(
-            status="degraded",
-            details=health_details
-        ) 
\ No newline at end of file
+    health_details = {"api": "healthy"}
+    checks = {}
+    for name, result in health_prober.results.items():
+        health_details[name] = result.status
+        checks[name] = result.to_dict()
+    if health_prober.is_stale():
+        health_details["prober"] = "stale"
+
+    healthy = all(value == HEALTHY for value in health_details.values())
+    return HealthResponse(
+        status="healthy" if healthy else "degraded",
+        details=health_details,
+        checks=checks
+    )
+
+@router.get("/ready", response_model=ReadinessResponse)
+async def readiness_check(response: Response):
+    """
+    Report whether this instance should receive more traffic.
+
+    Not ready while the integration flow is still being built in the
+    background, the database probe fails, the LLM connection pool is
+    nearly saturated or requests are already queueing for a connection, or
+    the LLM scheduler queue is nearly full.
+
+    Returns:
+        ReadinessResponse with the reasons for not being ready and pool usage;
+        the status code is 503 when not ready
+    """
+    reasons = []
+    if FlowRegistry.flow is None:
+        reasons.append("integration flow warming up")
+    database = health_prober.results.get("database")
+    if database is None or database.status != HEALTHY:
+        reasons.append("database unavailable")
+
+    pool = llm_client.metrics()
+    in_use = pool.get("in_use", 0)
+    utilization = in_use / settings.LLM_POOL_MAX_CONNECTIONS
+    if utilization >= settings.READINESS_POOL_SATURATION or pool.get("queued", 0) > 0:
+        reasons.append("LLM connection pool saturated")
+
+    scheduler = llm_scheduler.stats()
+    queued = scheduler["queue_depth_interactive"] + scheduler["queue_depth_batch"]
+    if queued >= llm_scheduler.max_queue_depth * settings.READINESS_POOL_SATURATION:
+        reasons.append("LLM scheduler queue nearly full")
+
+    if reasons:
+        response.status_code = status.HTTP_503_SERVICE_UNAVAILABLE
+    return ReadinessResponse(
+        ready=not reasons,
+        reasons=reasons,
+        pool={
+            "in_use": in_use,
+            "queued": pool.get("queued", 0),
+            "max_connections": settings.LLM_POOL_MAX_CONNECTIONS,
+            "utilization": round(utilization, 3),
+            "scheduler_queued": queued
+        }
+    )
@@ -0,0 +1,77 @@
+from fastapi import APIRouter, HTTPException, status
+from pydantic import BaseModel
+from typing import Dict, Any
+from datetime import datetime
+from .api_v1 import IntegrationRequest
+from ..graphs.flows.job_runner import job_runner, JobQueueFull
+from ..utils.logging import logger
+
+router = APIRouter(prefix="/api/v1")
+
+class JobCreatedResponse(BaseModel):
+    job_id: str
+    status: str
+
+class JobResponse(BaseModel):
+    job_id: str
+    status: str
+    result: Dict[str, Any] | None
+    error: str | None
+    created_at: datetime
+    started_at: datetime | None
+    finished_at: datetime | None
+
+@router.post(
+    "/integration/jobs",
+    response_model=JobCreatedResponse,
+    status_code=status.HTTP_202_ACCEPTED
+)
+async def create_integration_job(request: IntegrationRequest):
+    """
+    Queue an integration flow run and return immediately.
+
+    Args:
+        request: IntegrationRequest containing user input and optional configuration
+
+    Returns:
+        JobCreatedResponse with the id to poll
+
+    Raises:
+        HTTPException: 503 if the job queue is full
+    """
+    try:
+        job = await job_runner.submit(request.user_input, request.config)
+    except JobQueueFull as e:
+        logger.error(f"Rejected integration job: {str(e)}")
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail=str(e)
+        )
+    return JobCreatedResponse(job_id=job.job_id, status=job.status)
+
+@router.get("/integration/jobs/{job_id}", response_model=JobResponse)
+async def get_integration_job(job_id: str):
+    """
+    Poll the state of a queued integration job.
+
+    Returns:
+        JobResponse with the job status and, once finished, the final GraphState
+
+    Raises:
+        HTTPException: 404 if no job with this id exists
+    """
+    job = await job_runner.get(job_id)
+    if job is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=f"Job {job_id} not found"
+        )
+    return JobResponse(
+        job_id=job.job_id,
+        status=job.status,
+        result=job.result,
+        error=job.error,
+        created_at=job.created_at,
+        started_at=job.started_at,
+        finished_at=job.finished_at
+    )
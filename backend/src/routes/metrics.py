@@ -0,0 +1,37 @@
+from fastapi import APIRouter
+from fastapi.responses import PlainTextResponse
+from ..graphs.flows.artifact_store import artifact_store
+from ..graphs.flows.job_runner import job_runner
+from ..graphs.flows.run_store import run_store
+from ..utils.llm_cache import llm_cache
+from ..utils.llm_client import llm_client
+from ..utils.llm_scheduler import llm_scheduler
+from ..utils.logging import logging_stats
+from ..utils.metrics import registry, render_gauges
+from ..utils.startup_profiler import startup_timer
+
+router = APIRouter()
+
+PROMETHEUS_CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+@router.get("/metrics", response_class=PlainTextResponse)
+async def get_metrics():
+    """
+    Export per-node latency, token and cost histograms in Prometheus text format.
+    
+    Returns:
+        PlainTextResponse with node histograms plus scheduler, connection pool, response cache,
+        job queue, run store, artifact store, logging and startup gauges
+    """
+    body = (
+        registry.render()
+        + render_gauges("llm_scheduler", llm_scheduler.stats())
+        + render_gauges("llm_pool", llm_client.metrics())
+        + render_gauges("llm_cache", llm_cache.stats())
+        + render_gauges("jobs", job_runner.stats())
+        + render_gauges("run_store", run_store.stats())
+        + render_gauges("artifact_store", artifact_store.stats())
+        + render_gauges("logging", logging_stats())
+        + render_gauges("startup", startup_timer.stats())
+    )
+    return PlainTextResponse(body, media_type=PROMETHEUS_CONTENT_TYPE)
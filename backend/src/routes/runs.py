@@ -0,0 +1,84 @@
+from fastapi import APIRouter, HTTPException, Query, status
+from pydantic import BaseModel
+from typing import Any, Dict, List
+from datetime import datetime
+from ..config.settings import settings
+from ..graphs.flows.run_store import run_store
+
+router = APIRouter(prefix="/api/v1")
+
+class RunSummary(BaseModel):
+    run_id: str
+    user_input: str
+    status: str
+    iteration_count: int
+    reused_from: Dict[str, Any] | None = None
+    error: str | None = None
+    created_at: datetime
+    finished_at: datetime
+    duration_seconds: float
+
+class RunPage(BaseModel):
+    runs: List[RunSummary]
+    next_cursor: str | None
+
+class RunDetail(RunSummary):
+    node_metrics: List[Dict[str, Any]]
+    outputs: Dict[str, Any]
+
+def _with_run_id(document: Dict[str, Any]) -> Dict[str, Any]:
+    document["run_id"] = document.pop("_id")
+    return document
+
+@router.get("/integration/runs", response_model=RunPage)
+async def list_integration_runs(
+    limit: int = Query(default=settings.RUN_HISTORY_PAGE_SIZE, ge=1, le=settings.RUN_HISTORY_MAX_PAGE_SIZE),
+    cursor: str | None = None,
+    status_filter: str | None = Query(default=None, alias="status"),
+    user_input: str | None = None
+):
+    """
+    List past runs, newest first, without their generated outputs.
+
+    Pages are keyset-paginated: pass the returned ``next_cursor`` to get the
+    next page, which stays consistent while new runs are being recorded.
+
+    Args:
+        limit: Page size
+        cursor: ``next_cursor`` of the previous page
+        status_filter: Only runs with this final status (``success``, ``failed``, ``aborted``, ...)
+        user_input: Only runs whose input matches this one, ignoring case and whitespace
+
+    Returns:
+        RunPage with run summaries and the cursor of the next page, if any
+
+    Raises:
+        HTTPException: 422 if the cursor is malformed
+    """
+    try:
+        documents, next_cursor = await run_store.list_runs(limit, cursor, status_filter, user_input)
+    except ValueError as e:
+        raise HTTPException(
+            status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
+            detail=str(e)
+        )
+    return RunPage(
+        runs=[RunSummary(**_with_run_id(document)) for document in documents],
+        next_cursor=next_cursor
+    )
+
+@router.get("/integration/runs/{run_id}", response_model=RunDetail)
+async def get_integration_run(run_id: str):
+    """
+    Return one recorded run with its per-node metrics and generated outputs.
+
+    Raises:
+        HTTPException: 404 if no run with this id was recorded
+    """
+    document = await run_store.get_run(run_id)
+    if document is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=f"Run {run_id} not found"
+        )
+    return RunDetail(**_with_run_id(document))
@@ -0,0 +1,182 @@
+import asyncio
+import hashlib
+import json
+import random
+from typing import Any, AsyncIterator, Callable, Dict, List
+from langchain_core.messages import AIMessage, AIMessageChunk
+from ..config.settings import settings
+
+class FakeLLMError(RuntimeError):
+    """Injected provider failure (stands in for a 5xx or rate-limit response)."""
+
+def _plan(rng: random.Random) -> Dict[str, Any]:
+    steps = rng.randint(3, 6)
+    return {
+        "apis": {
+            "source": {"name": "Weather API", "auth": "api_key", "base_url": "https://api.weather.example"},
+            "target": {"name": "SMS API", "auth": "oauth2", "base_url": "https://api.sms.example"}
+        },
+        "integration_plan": {"steps": [f"Step {index + 1}: wire stage {index + 1}" for index in range(steps)]},
+        "requirements": ["python>=3.10", "httpx"],
+        "expected_output": {"status": "success"},
+        "validation_rules": ["Responses are 2xx", "Messages are under 160 characters"]
+    }
+
+def _supervisor_tasks(_: random.Random) -> Dict[str, Any]:
+    return {
+        "coding_task": {"task": "Implement the client and the forwarding job", "files": ["client.py", "job.py"]},
+        "testing_task": {"task": "Cover the client and the job with unit tests"},
+        "acceptance_criteria": ["All tests pass", "Errors are retried"]
+    }
+
+def _code_file(lines: int) -> str:
+    body = "\n".join(f"    value_{index} = payload.get('field_{index}')" for index in range(lines))
+    return f"def handle(payload):\n{body}\n    return payload\n"
+
+def _code(rng: random.Random) -> Dict[str, Any]:
+    return {
+        "implementation": {
+            # The fake tests import client.handle, so they pass when run in the sandbox
+            "client.py": _code_file(rng.randint(10, 40)),
+            **{
+                f"module_{index}.py": _code_file(rng.randint(10, 40))
+                for index in range(rng.randint(1, 3))
+            }
+        },
+        "dependencies": ["httpx"],
+        "setup_instructions": ["pip install httpx"]
+    }
+
+def _tests(rng: random.Random) -> Dict[str, Any]:
+    count = rng.randint(2, 5)
+    return {
+        "test_cases": {f"case_{index}": {"input": {"city": "Norman"}, "expect": "sent"} for index in range(count)},
+        "test_implementation": {
+            "test_integration.py": "from client import handle\n\n" + "\n".join(
+                f"def test_case_{index}():\n    assert handle({{}}) == {{}}\n" for index in range(count)
+            )
+        },
+        "coverage_requirements": ["client.py", "job.py"]
+    }
+
+class FakeChatModel:
+    """
+    Offline stand-in for the chat model that returns schema-valid JSON for each node.
+
+    The node is recognised from its prompt, and the answer is generated from a
+    seed and a hash of the prompt. Repeated calls with the same prompt and
+    seed therefore produce the same answers, in the same order, however calls
+    interleave. Latency is a normally distributed time to first token plus
+    streaming at ``tokens_per_second``. ``failure_rate`` raises
+    ``FakeLLMError`` before the first token. ``truncation_rate`` cuts the
+    completion off halfway.
+    """
+
+    def __init__(
+        self,
+        latency_ms: float = 0.0,
+        latency_jitter_ms: float = 0.0,
+        tokens_per_second: float = 0.0,
+        failure_rate: float = 0.0,
+        truncation_rate: float = 0.0,
+        acceptance_rate: float = 1.0,
+        seed: int = 0,
+        chunk_chars: int = 16
+    ):
+        self.latency_ms = latency_ms
+        self.latency_jitter_ms = latency_jitter_ms
+        self.tokens_per_second = tokens_per_second
+        self.failure_rate = failure_rate
+        self.truncation_rate = truncation_rate
+        self.acceptance_rate = acceptance_rate
+        self.seed = seed
+        self.chunk_chars = chunk_chars
+        self.calls = 0
+        self._attempts: Dict[str, int] = {}
+        # The earliest role line found in the prompt decides which node is asking
+        self._responders: List[tuple[str, Callable[[random.Random], Dict[str, Any]]]] = [
+            ("You are an expert system architect", _plan),
+            ("You are a technical lead supervising", _supervisor_tasks),
+            ("You are a technical lead reviewing", self._review),
+            ("You are an expert programmer", _code),
+            ("You are a QA engineer", _tests),
+            ("You are an expert system evaluator", self._evaluation)
+        ]
+
+    def _review(self, rng: random.Random) -> Dict[str, Any]:
+        component = rng.choice(["coder", "tester"])
+        return {
+            "requires_changes": True,
+            "feedback": {"module_0.py": "Retry failed sends"},
+            "next_steps": ["Add retries"],
+            "affected_components": [component]
+        }
+
+    def _evaluation(self, rng: random.Random) -> Dict[str, Any]:
+        acceptable = rng.random() < self.acceptance_rate
+        return {
+            "code_evaluation": {"quality": "good" if acceptable else "needs work"},
+            "issues_found": [] if acceptable else [{"component": "implementation", "issue": "no retries"}],
+            "test_results": {"passed": acceptable},
+            "recommendations": ["Add structured logging"],
+            "is_acceptable": acceptable,
+            "confidence": round(rng.uniform(0.5, 1.0), 2)
+        }
+
+    def _rng(self, prompt: str) -> random.Random:
+        digest = hashlib.sha256(prompt.encode("utf-8")).hexdigest()
+        attempt = self._attempts.get(digest, 0)
+        self._attempts[digest] = attempt + 1
+        return random.Random(f"{self.seed}:{digest}:{attempt}")
+
+    def _completion(self, prompt: str, rng: random.Random) -> str:
+        found = [(prompt.find(marker), responder) for marker, responder in self._responders if marker in prompt]
+        if not found:
+            return json.dumps({"response": "ok"})
+        _, responder = min(found, key=lambda item: item[0])
+        return json.dumps(responder(rng))
+
+    def _prepare(self, prompt: Any) -> tuple[str, float]:
+        prompt = prompt if isinstance(prompt, str) else str(prompt)
+        self.calls += 1
+        rng = self._rng(prompt)
+        text = self._completion(prompt, rng)
+        delay = max(0.0, rng.gauss(self.latency_ms, self.latency_jitter_ms)) / 1000
+        if rng.random() < self.failure_rate:
+            raise FakeLLMError("Injected provider failure")
+        if rng.random() < self.truncation_rate:
+            text = text[:len(text) // 2]
+        return text, delay
+
+    def _chunk_delay(self, chunk: str) -> float:
+        if self.tokens_per_second <= 0:
+            return 0.0
+        # Same ~4 characters per token as the prompt token estimate
+        return (len(chunk) / 4) / self.tokens_per_second
+
+    async def ainvoke(self, prompt: Any, *args: Any, **kwargs: Any) -> AIMessage:
+        text, delay = self._prepare(prompt)
+        await asyncio.sleep(delay + self._chunk_delay(text))
+        return AIMessage(content=text)
+
+    async def astream(self, prompt: Any, *args: Any, **kwargs: Any) -> AsyncIterator[AIMessageChunk]:
+        text, delay = self._prepare(prompt)
+        await asyncio.sleep(delay)
+        for start in range(0, len(text), self.chunk_chars):
+            chunk = text[start:start + self.chunk_chars]
+            pause = self._chunk_delay(chunk)
+            if pause:
+                await asyncio.sleep(pause)
+            yield AIMessageChunk(content=chunk)
+
+    @classmethod
+    def from_settings(cls) -> "FakeChatModel":
+        return cls(
+            latency_ms=settings.FAKE_LLM_LATENCY_MS,
+            latency_jitter_ms=settings.FAKE_LLM_LATENCY_JITTER_MS,
+            tokens_per_second=settings.FAKE_LLM_TOKENS_PER_SECOND,
+            failure_rate=settings.FAKE_LLM_FAILURE_RATE,
+            truncation_rate=settings.FAKE_LLM_TRUNCATION_RATE,
+            acceptance_rate=settings.FAKE_LLM_ACCEPTANCE_RATE,
+            seed=settings.FAKE_LLM_SEED
+        )
@@ -0,0 +1,101 @@
+import asyncio
+import time
+from dataclasses import asdict, dataclass
+from datetime import datetime
+from typing import Any, Awaitable, Callable, Dict, Optional
+from ..config.database import Database
+from ..config.settings import settings
+from .llm_client import llm_client
+from .logging import logger
+
+HEALTHY = "healthy"
+UNHEALTHY = "unhealthy"
+UNKNOWN = "unknown"
+
+@dataclass
+class ProbeResult:
+    status: str = UNKNOWN
+    latency_ms: Optional[float] = None
+    checked_at: Optional[datetime] = None
+    error: Optional[str] = None
+
+    def to_dict(self) -> Dict[str, Any]:
+        return asdict(self)
+
+async def ping_database() -> None:
+    if Database.client is None:
+        raise ConnectionError("Not connected")
+    await Database.client.admin.command("ping")
+
+async def ping_llm_provider() -> None:
+    await llm_client.ping(settings.HEALTH_PROBE_TIMEOUT_SECONDS)
+
+class HealthProber:
+    """
+    Checks dependencies in the background and keeps the latest results in memory.
+
+    Every ``interval_seconds`` each probe runs, concurrently and bounded by
+    ``timeout_seconds``. Health endpoints read ``results`` and never touch
+    a dependency themselves, however often they are polled.
+    """
+
+    def __init__(
+        self,
+        probes: Dict[str, Callable[[], Awaitable[None]]],
+        interval_seconds: float,
+        timeout_seconds: float
+    ):
+        self.probes = probes
+        self.interval_seconds = interval_seconds
+        self.timeout_seconds = timeout_seconds
+        self.results: Dict[str, ProbeResult] = {name: ProbeResult() for name in probes}
+        self.last_run: Optional[float] = None
+        self._task: Optional[asyncio.Task] = None
+
+    async def _probe(self, name: str, probe: Callable[[], Awaitable[None]]) -> None:
+        started = time.perf_counter()
+        try:
+            await asyncio.wait_for(probe(), timeout=self.timeout_seconds)
+            result = ProbeResult(status=HEALTHY)
+        except asyncio.TimeoutError:
+            result = ProbeResult(status=UNHEALTHY, error=f"Timed out after {self.timeout_seconds}s")
+        except Exception as e:
+            result = ProbeResult(status=UNHEALTHY, error=f"{type(e).__name__}: {e}")
+        result.latency_ms = round((time.perf_counter() - started) * 1000, 2)
+        result.checked_at = datetime.utcnow()
+        if result.status != self.results[name].status and result.status == UNHEALTHY:
+            logger.error(f"Health probe {name} failed: {result.error}")
+        self.results[name] = result
+
+    async def run_once(self) -> None:
+        await asyncio.gather(*(self._probe(name, probe) for name, probe in self.probes.items()))
+        self.last_run = time.monotonic()
+
+    async def _loop(self) -> None:
+        while True:
+            await self.run_once()
+            await asyncio.sleep(self.interval_seconds)
+
+    def start(self) -> None:
+        """Keep probing in the background; the first round starts right away without delaying startup."""
+        if self._task is not None:
+            return
+        self._task = asyncio.create_task(self._loop())
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+            self._task = None
+
+    def is_stale(self) -> bool:
+        """True when results are older than a few intervals (the prober is stuck or not running)."""
+        if self.last_run is None:
+            return True
+        return time.monotonic() - self.last_run > self.interval_seconds * 3 + self.timeout_seconds
+
+health_prober = HealthProber(
+    probes={"database": ping_database, "llm_provider": ping_llm_provider},
+    interval_seconds=settings.HEALTH_PROBE_INTERVAL_SECONDS,
+    timeout_seconds=settings.HEALTH_PROBE_TIMEOUT_SECONDS
+)
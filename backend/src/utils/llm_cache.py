@@ -0,0 +1,137 @@
+import asyncio
+import hashlib
+import time
+from collections import OrderedDict
+from datetime import datetime, timedelta
+from typing import Any, Dict, Optional, Set, Tuple
+from ..config.database import Database, DATABASE_NAME
+from ..config.settings import settings
+from .logging import logger
+
+class LRUCache:
+    """In-memory tier: least-recently-used eviction plus a fixed time-to-live."""
+
+    def __init__(self, max_size: int, ttl_seconds: float):
+        self.max_size = max_size
+        self.ttl_seconds = ttl_seconds
+        self._entries: "OrderedDict[str, Tuple[float, Any]]" = OrderedDict()
+
+    def get(self, key: str) -> Optional[Any]:
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        expires_at, value = entry
+        if expires_at <= time.monotonic():
+            del self._entries[key]
+            return None
+        self._entries.move_to_end(key)
+        return value
+
+    def set(self, key: str, value: Any) -> None:
+        self._entries[key] = (time.monotonic() + self.ttl_seconds, value)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_size:
+            self._entries.popitem(last=False)
+
+    def clear(self) -> None:
+        self._entries.clear()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+class LLMResponseCache:
+    """
+    Two-tier cache for node completions.
+
+    Lookups hit the in-process LRU first and fall back to a Mongo collection
+    shared by every worker. Mongo writes happen in the background so a miss
+    never waits on the database twice.
+    """
+
+    def __init__(self):
+        self.memory = LRUCache(settings.LLM_CACHE_MAX_ENTRIES, settings.LLM_CACHE_TTL_SECONDS)
+        self.memory_hits = 0
+        self.mongo_hits = 0
+        self.misses = 0
+        self._pending_writes: Set[asyncio.Task] = set()
+
+    @staticmethod
+    def make_key(node_name: str, prompt: str, model_name: str, temperature: float) -> str:
+        prompt_hash = hashlib.sha256(prompt.encode("utf-8")).hexdigest()
+        raw = f"{node_name}|{model_name}|{temperature}|{prompt_hash}"
+        return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+    def _collection(self):
+        if Database.client is None:
+            return None
+        return Database.client[DATABASE_NAME][settings.LLM_CACHE_COLLECTION]
+
+    async def get(self, key: str) -> Optional[str]:
+        value = self.memory.get(key)
+        if value is not None:
+            self.memory_hits += 1
+            return value
+
+        collection = self._collection()
+        if collection is not None:
+            try:
+                document = await collection.find_one(
+                    {"_id": key, "expires_at": {"$gt": datetime.utcnow()}},
+                    {"content": 1}
+                )
+            except Exception as e:
+                logger.error(f"LLM cache lookup failed: {str(e)}")
+                document = None
+            if document is not None:
+                self.mongo_hits += 1
+                self.memory.set(key, document["content"])
+                return document["content"]
+
+        self.misses += 1
+        return None
+
+    async def set(self, key: str, value: str, node_name: str) -> None:
+        if self.memory.get(key) == value:
+            # A replayed hit; the entry is already stored in both tiers
+            return
+        self.memory.set(key, value)
+
+        collection = self._collection()
+        if collection is None:
+            return
+        task = asyncio.create_task(self._write_through(collection, key, value, node_name))
+        self._pending_writes.add(task)
+        task.add_done_callback(self._pending_writes.discard)
+
+    async def _write_through(self, collection, key: str, value: str, node_name: str) -> None:
+        now = datetime.utcnow()
+        try:
+            await collection.replace_one(
+                {"_id": key},
+                {
+                    "_id": key,
+                    "node": node_name,
+                    "content": value,
+                    "created_at": now,
+                    "expires_at": now + timedelta(seconds=settings.LLM_CACHE_TTL_SECONDS)
+                },
+                upsert=True
+            )
+        except Exception as e:
+            logger.error(f"LLM cache write failed: {str(e)}")
+
+    async def ensure_indexes(self) -> None:
+        collection = self._collection()
+        if collection is not None:
+            # Let Mongo drop expired entries on its own
+            await collection.create_index("expires_at", expireAfterSeconds=0)
+
+    def stats(self) -> Dict[str, int]:
+        return {
+            "memory_hits": self.memory_hits,
+            "mongo_hits": self.mongo_hits,
+            "misses": self.misses,
+            "memory_entries": len(self.memory)
+        }
+
+llm_cache = LLMResponseCache()
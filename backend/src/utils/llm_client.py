@@ -0,0 +1,222 @@
+import asyncio
+from typing import TYPE_CHECKING, Any, AsyncIterator, Callable, Dict, Optional, Tuple
+import httpx
+from ..config.settings import settings
+from .logging import logger
+
+if TYPE_CHECKING:
+    # Imported on first use; both pull in large parts of LangChain
+    from langchain_groq import ChatGroq
+    from .fake_llm import FakeChatModel
+
+# Used by the health probe when GROQ_API_BASE is not set, matching the Groq SDK default
+DEFAULT_GROQ_API_BASE = "https://api.groq.com"
+
+class _ReleasingStream(httpx.AsyncByteStream):
+    """Response body wrapper that hands the connection slot back once the body is closed."""
+
+    def __init__(self, stream: httpx.AsyncByteStream, release: Callable[[], None]):
+        self._stream = stream
+        self._release = release
+        self._released = False
+
+    async def __aiter__(self) -> AsyncIterator[bytes]:
+        async for chunk in self._stream:
+            yield chunk
+
+    async def aclose(self) -> None:
+        try:
+            await self._stream.aclose()
+        finally:
+            if not self._released:
+                self._released = True
+                self._release()
+
+class PooledTransport(httpx.AsyncBaseTransport):
+    """
+    Keep-alive HTTP transport with a global and a per-host connection bound.
+
+    httpx already enforces the global pool size; the extra semaphores exist so
+    that callers waiting for a slot are visible as ``queued`` in the metrics.
+    """
+
+    def __init__(
+        self,
+        max_connections: int,
+        max_keepalive: int,
+        keepalive_expiry: float,
+        max_per_host: int,
+        http2: bool = True
+    ):
+        self._transport = httpx.AsyncHTTPTransport(
+            http2=http2,
+            limits=httpx.Limits(
+                max_connections=max_connections,
+                max_keepalive_connections=max_keepalive,
+                keepalive_expiry=keepalive_expiry
+            )
+        )
+        self._global_slots = asyncio.Semaphore(max_connections)
+        self._max_per_host = min(max_per_host, max_connections)
+        self._host_slots: Dict[str, asyncio.Semaphore] = {}
+        self.in_use = 0
+        self.queued = 0
+        self.peak_in_use = 0
+        self.requests_total = 0
+
+    def _host_semaphore(self, host: str) -> asyncio.Semaphore:
+        if host not in self._host_slots:
+            self._host_slots[host] = asyncio.Semaphore(self._max_per_host)
+        return self._host_slots[host]
+
+    async def handle_async_request(self, request: httpx.Request) -> httpx.Response:
+        host_slots = self._host_semaphore(request.url.host)
+
+        self.queued += 1
+        try:
+            await host_slots.acquire()
+            try:
+                await self._global_slots.acquire()
+            except BaseException:
+                host_slots.release()
+                raise
+        finally:
+            self.queued -= 1
+
+        self.in_use += 1
+        self.peak_in_use = max(self.peak_in_use, self.in_use)
+        self.requests_total += 1
+
+        def release() -> None:
+            self.in_use -= 1
+            self._global_slots.release()
+            host_slots.release()
+
+        try:
+            response = await self._transport.handle_async_request(request)
+        except BaseException:
+            release()
+            raise
+
+        return httpx.Response(
+            status_code=response.status_code,
+            headers=response.headers,
+            stream=_ReleasingStream(response.stream, release),
+            extensions=response.extensions
+        )
+
+    def metrics(self) -> Dict[str, int]:
+        connections = getattr(self._transport, "_pool").connections
+        idle = sum(1 for connection in connections if connection.is_idle())
+        return {
+            "in_use": self.in_use,
+            "queued": self.queued,
+            "peak_in_use": self.peak_in_use,
+            "requests_total": self.requests_total,
+            "connections_open": len(connections),
+            "connections_idle": idle
+        }
+
+    async def aclose(self) -> None:
+        await self._transport.aclose()
+
+class LLMClient:
+    """
+    Process-wide LLM access shared by every node.
+
+    One pooled HTTP client is shared by all chat models; a chat model is kept
+    per model and temperature so each node can use its own tier and setting. With
+    ``LLM_PROVIDER=fake`` (or after ``use_fake_model``) every node talks to
+    an offline ``FakeChatModel`` instead.
+    """
+
+    def __init__(self):
+        self._transport: Optional[PooledTransport] = None
+        self._http_client: Optional[httpx.AsyncClient] = None
+        self._models: Dict[Tuple[str, float], "ChatGroq"] = {}
+        self._fake_model: Optional["FakeChatModel"] = None
+
+    def _get_http_client(self) -> httpx.AsyncClient:
+        if self._http_client is None:
+            self._transport = PooledTransport(
+                max_connections=settings.LLM_POOL_MAX_CONNECTIONS,
+                max_keepalive=settings.LLM_POOL_MAX_KEEPALIVE,
+                keepalive_expiry=settings.LLM_POOL_KEEPALIVE_EXPIRY,
+                max_per_host=settings.LLM_POOL_MAX_PER_HOST,
+                http2=settings.LLM_HTTP2
+            )
+            self._http_client = httpx.AsyncClient(
+                transport=self._transport,
+                timeout=settings.LLM_REQUEST_TIMEOUT
+            )
+        return self._http_client
+
+    def use_fake_model(self, model: Optional["FakeChatModel"]) -> None:
+        """Route every call to ``model``; ``None`` goes back to the configured provider."""
+        self._fake_model = model
+
+    def get_chat_model(self, temperature: float, model_name: Optional[str] = None) -> "ChatGroq | FakeChatModel":
+        if self._fake_model is None and settings.LLM_PROVIDER == "fake":
+            from .fake_llm import FakeChatModel
+            self._fake_model = FakeChatModel.from_settings()
+        if self._fake_model is not None:
+            return self._fake_model
+        model_name = model_name or settings.MODEL_NAME
+        key = (model_name, temperature)
+        if key not in self._models:
+            from langchain_groq import ChatGroq
+            self._models[key] = ChatGroq(
+                groq_api_key=settings.GROQ_API_KEY,
+                groq_api_base=settings.GROQ_API_BASE,
+                temperature=temperature,
+                model_name=model_name,
+                request_timeout=settings.LLM_REQUEST_TIMEOUT,
+                max_retries=settings.LLM_MAX_RETRIES,
+                http_async_client=self._get_http_client()
+            )
+        return self._models[key]
+
+    async def ainvoke(self, prompt: str, temperature: float, model_name: Optional[str] = None) -> Any:
+        return await self.get_chat_model(temperature, model_name).ainvoke(prompt)
+
+    async def astream(self, prompt: str, temperature: float, model_name: Optional[str] = None) -> AsyncIterator[Any]:
+        stream = self.get_chat_model(temperature, model_name).astream(prompt)
+        try:
+            async for chunk in stream:
+                yield chunk
+        finally:
+            await stream.aclose()
+
+    async def ping(self, timeout: float) -> None:
+        """
+        Check that the provider answers, through the shared pool; the fake model always does.
+
+        Raises:
+            httpx.HTTPError: If the provider cannot be reached or returns a 5xx
+        """
+        if self._fake_model is not None or settings.LLM_PROVIDER == "fake":
+            return
+        base = (settings.GROQ_API_BASE or DEFAULT_GROQ_API_BASE).rstrip("/")
+        response = await self._get_http_client().get(
+            f"{base}/openai/v1/models",
+            headers={"Authorization": f"Bearer {settings.GROQ_API_KEY}"},
+            timeout=timeout
+        )
+        # A 4xx still proves the provider is reachable
+        if response.status_code >= 500:
+            response.raise_for_status()
+
+    def metrics(self) -> Dict[str, int]:
+        if self._transport is None:
+            return {}
+        return self._transport.metrics()
+
+    async def aclose(self) -> None:
+        if self._http_client is not None:
+            await self._http_client.aclose()
+            logger.info("Closed shared LLM HTTP client")
+        self._http_client = None
+        self._transport = None
+        self._models = {}
+
+llm_client = LLMClient()
@@ -0,0 +1,283 @@
+import asyncio
+import heapq
+import itertools
+import math
+import time
+from contextlib import asynccontextmanager
+from dataclasses import dataclass, field
+from typing import AsyncIterator, Dict, List, Optional
+from ..config.settings import settings
+
+# Lower values are served first
+PRIORITY_INTERACTIVE = 0
+PRIORITY_BATCH = 1
+
+class TokenBucket:
+    """Classic token bucket refilled continuously at ``per_minute / 60`` units per second."""
+
+    def __init__(self, per_minute: float):
+        self.capacity = float(per_minute)
+        self.rate = per_minute / 60.0
+        self.available = float(per_minute)
+        self._updated = time.monotonic()
+
+    def _refill(self, now: float) -> None:
+        self.available = min(self.capacity, self.available + (now - self._updated) * self.rate)
+        self._updated = now
+
+    def delay(self, amount: float, now: float) -> float:
+        """Seconds until ``amount`` units are available; 0 if they are available now."""
+        self._refill(now)
+        # A single call larger than the bucket is let through once the bucket is full
+        amount = min(amount, self.capacity)
+        if self.available >= amount:
+            return 0.0
+        return (amount - self.available) / self.rate
+
+    def take(self, amount: float) -> None:
+        self.available -= min(amount, self.capacity)
+
+@dataclass(order=True)
+class _Waiter:
+    priority: int
+    seq: int
+    tokens: int = field(compare=False)
+    enqueued_at: float = field(compare=False)
+    future: asyncio.Future = field(compare=False)
+
+class _ModelQueue:
+    def __init__(self, requests_per_minute: int, tokens_per_minute: int):
+        self.requests = TokenBucket(requests_per_minute)
+        self.tokens = TokenBucket(tokens_per_minute)
+        self.heap: List[_Waiter] = []
+        self.timer: Optional[asyncio.TimerHandle] = None
+
+class RunAdmission:
+    """A flow run counted against the scheduler from admission until it is released."""
+
+    def __init__(self, scheduler: "LLMScheduler", priority: int):
+        self._scheduler = scheduler
+        self.priority = priority
+        # Set once the run's work begins; an admission whose run never started is released by its caller
+        self.started = False
+        self.released = False
+
+    def release(self) -> None:
+        if not self.released:
+            self.released = True
+            self._scheduler._release_run(self.priority)
+
+class LLMScheduler:
+    """
+    Single gate that every node LLM call passes through.
+
+    Calls are admitted per model against a requests-per-minute and a
+    tokens-per-minute bucket and a cap on concurrent calls. While a model is
+    saturated, waiting calls are served by priority (interactive before
+    batch) across every model, then in arrival order. Routes consult ``admission_delay`` to
+    reject work up front instead of queueing without bound; runs they admit
+    count against later admissions until they finish, so a burst that
+    arrives before any of its calls are queued is still bounded.
+    """
+
+    def __init__(
+        self,
+        requests_per_minute: int,
+        tokens_per_minute: int,
+        max_concurrency: int,
+        max_queue_depth: int,
+        max_wait_seconds: float,
+        calls_per_run: int = 1
+    ):
+        self.requests_per_minute = requests_per_minute
+        self.tokens_per_minute = tokens_per_minute
+        self.max_concurrency = max_concurrency
+        self.max_queue_depth = max_queue_depth
+        self.max_wait_seconds = max_wait_seconds
+        self.calls_per_run = calls_per_run
+        self.active_runs: Dict[int, int] = {PRIORITY_INTERACTIVE: 0, PRIORITY_BATCH: 0}
+        self._run_waiters: List[asyncio.Future] = []
+        self._models: Dict[str, _ModelQueue] = {}
+        self._seq = itertools.count()
+        self.in_flight = 0
+        self.admitted = 0
+        self.rejected = 0
+        self.wait_seconds_total = 0.0
+        self.wait_seconds_max = 0.0
+
+    def _model(self, model: str) -> _ModelQueue:
+        if model not in self._models:
+            self._models[model] = _ModelQueue(self.requests_per_minute, self.tokens_per_minute)
+        return self._models[model]
+
+    @asynccontextmanager
+    async def slot(self, model: str, tokens: int, priority: int = PRIORITY_INTERACTIVE) -> AsyncIterator[float]:
+        """
+        Wait for capacity to send one call of about ``tokens`` tokens to ``model``.
+
+        Yields the number of seconds the call spent queued.
+        """
+        queue = self._model(model)
+        waiter = _Waiter(
+            priority=priority,
+            seq=next(self._seq),
+            tokens=tokens,
+            enqueued_at=time.monotonic(),
+            future=asyncio.get_running_loop().create_future()
+        )
+        heapq.heappush(queue.heap, waiter)
+        self._dispatch()
+        try:
+            await waiter.future
+        except asyncio.CancelledError:
+            if waiter.future.done() and not waiter.future.cancelled():
+                # Admitted just as we were cancelled; hand the slot back
+                self._release()
+            raise
+
+        try:
+            yield waiter.future.result()
+        finally:
+            self._release()
+
+    def _release(self) -> None:
+        self.in_flight -= 1
+        # The freed slot may unblock any model, not only the one that used it
+        self._dispatch()
+
+    def _ready_head(self, model: str, now: float) -> Optional[_Waiter]:
+        """The model's next call if its rate limits allow it now; otherwise arm a wake-up timer."""
+        queue = self._models[model]
+        while queue.heap and queue.heap[0].future.done():
+            heapq.heappop(queue.heap)
+        if not queue.heap:
+            return None
+        head = queue.heap[0]
+        delay = max(queue.requests.delay(1, now), queue.tokens.delay(head.tokens, now))
+        if delay > 0:
+            if queue.timer is None:
+                queue.timer = asyncio.get_running_loop().call_later(delay, self._wake, model)
+            return None
+        return head
+
+    def _dispatch(self) -> None:
+        # Concurrency is shared by every model, so each free slot goes to the
+        # highest-priority ready call of any model; rate-limited models are skipped
+        while self.in_flight < self.max_concurrency:
+            now = time.monotonic()
+            queue, head = None, None
+            for model in self._models:
+                candidate = self._ready_head(model, now)
+                if candidate is not None and (head is None or candidate < head):
+                    queue, head = self._models[model], candidate
+            if head is None:
+                # Woken again by _release or a model's timer
+                return
+
+            heapq.heappop(queue.heap)
+            queue.requests.take(1)
+            queue.tokens.take(head.tokens)
+            self.in_flight += 1
+            self.admitted += 1
+            waited = now - head.enqueued_at
+            self.wait_seconds_total += waited
+            self.wait_seconds_max = max(self.wait_seconds_max, waited)
+            head.future.set_result(waited)
+
+    def _wake(self, model: str) -> None:
+        self._models[model].timer = None
+        self._dispatch()
+
+    def queue_depth(self, priority: Optional[int] = None) -> int:
+        return sum(
+            1
+            for queue in self._models.values()
+            for waiter in queue.heap
+            if not waiter.future.done() and (priority is None or waiter.priority == priority)
+        )
+
+    def _delay(self, priority: int) -> Optional[float]:
+        # Only calls and runs that would be served before this one count against it
+        levels = [level for level in (PRIORITY_INTERACTIVE, PRIORITY_BATCH) if level <= priority]
+        queued = sum(self.queue_depth(level) for level in levels)
+        # Queued calls are a lower bound on the work ahead; admitted runs that
+        # have not queued their calls yet are estimated at calls_per_run each
+        ahead = max(queued, sum(self.active_runs[level] for level in levels) * self.calls_per_run)
+        drain_seconds = ahead * 60.0 / self.requests_per_minute
+        if ahead < self.max_queue_depth and drain_seconds <= self.max_wait_seconds:
+            return None
+        return max(1.0, drain_seconds)
+
+    def admission_delay(self, priority: int = PRIORITY_INTERACTIVE) -> Optional[float]:
+        """
+        Seconds a new run should back off for, or None if it can be admitted.
+
+        A run is rejected when the calls queued ahead of it, or the calls the
+        runs admitted ahead of it are expected to make, could not be drained
+        within ``max_wait_seconds`` at the configured request rate.
+        """
+        delay = self._delay(priority)
+        if delay is not None:
+            self.rejected += 1
+        return delay
+
+    def start_run(self, priority: int = PRIORITY_INTERACTIVE) -> RunAdmission:
+        """Count an admitted run until the returned admission is released."""
+        self.active_runs[priority] += 1
+        return RunAdmission(self, priority)
+
+    async def wait_for_run(self, priority: int, timeout: float) -> RunAdmission:
+        """
+        Wait until a run at ``priority`` can be admitted, then admit it.
+
+        Raises:
+            asyncio.TimeoutError: If no capacity frees up within ``timeout`` seconds
+        """
+        deadline = time.monotonic() + timeout
+        while self._delay(priority) is not None:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                self.rejected += 1
+                raise asyncio.TimeoutError(f"No LLM capacity for another run within {timeout:.0f}s")
+            future = asyncio.get_running_loop().create_future()
+            self._run_waiters.append(future)
+            try:
+                # Queued calls drain without a run finishing, so check again at least every second
+                await asyncio.wait({future}, timeout=min(remaining, 1.0))
+            finally:
+                if future in self._run_waiters:
+                    self._run_waiters.remove(future)
+        return self.start_run(priority)
+
+    def _release_run(self, priority: int) -> None:
+        self.active_runs[priority] -= 1
+        waiters, self._run_waiters = self._run_waiters, []
+        for future in waiters:
+            if not future.done():
+                future.set_result(None)
+
+    @staticmethod
+    def retry_after(delay: float) -> str:
+        return str(math.ceil(delay))
+
+    def stats(self) -> Dict[str, float]:
+        return {
+            "queue_depth_interactive": self.queue_depth(PRIORITY_INTERACTIVE),
+            "queue_depth_batch": self.queue_depth(PRIORITY_BATCH),
+            "in_flight": self.in_flight,
+            "active_runs_interactive": self.active_runs[PRIORITY_INTERACTIVE],
+            "active_runs_batch": self.active_runs[PRIORITY_BATCH],
+            "admitted": self.admitted,
+            "rejected": self.rejected,
+            "wait_seconds_avg": self.wait_seconds_total / self.admitted if self.admitted else 0.0,
+            "wait_seconds_max": self.wait_seconds_max
+        }
+
+llm_scheduler = LLMScheduler(
+    requests_per_minute=settings.LLM_REQUESTS_PER_MINUTE,
+    tokens_per_minute=settings.LLM_TOKENS_PER_MINUTE,
+    max_concurrency=settings.LLM_MAX_CONCURRENT_CALLS,
+    max_queue_depth=settings.LLM_ADMISSION_MAX_QUEUE_DEPTH,
+    max_wait_seconds=settings.LLM_ADMISSION_MAX_WAIT_SECONDS,
+    calls_per_run=settings.LLM_CALLS_PER_RUN_ESTIMATE
+)
@@ -1,19 +1,221 @@
+import atexit
+import json
 import logging
-from datetime import datetime
 import os
+import queue
+import random
+from datetime import datetime, timezone
+from logging.handlers import QueueHandler, QueueListener, TimedRotatingFileHandler
+from typing import Dict, List, Optional
+from ..config.settings import settings
+from .run_context import get_current_node, get_run_context
 
-def setup_logger():
-    # Create logs directory if it doesn't exist
-    os.makedirs('logs', exist_ok=True)
-    
-    logging.basicConfig(
-        level=logging.INFO,
-        format='%(asctime)s - %(name)s - %(levelname)s - %(message)s',
-        handlers=[
-            logging.FileHandler(f'logs/app_{datetime.now().strftime("%Y%m%d")}.log'),
-            logging.StreamHandler()
+# Name of the application logger; modules log through it or a child from get_logger()
+LOGGER_NAME = "hacklahoma"
+
+# Attributes every LogRecord has; anything else was passed through ``extra``
+_RECORD_ATTRIBUTES = set(vars(logging.makeLogRecord({}))) | {"message", "asctime", "run_id", "node"}
+
+class ContextFilter(logging.Filter):
+    """Stamp records with the run id and graph node of the task that logged them."""
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        record.run_id = get_run_context().run_id
+        record.node = get_current_node()
+        return True
+
+class SamplingFilter(logging.Filter):
+    """
+    Keep only a fraction of the records below WARNING from selected loggers.
+
+    ``rates`` maps a logger name to the fraction of its records to keep; it
+    applies to that logger's children too. Warnings and errors always pass.
+    """
+
+    def __init__(self, rates: Dict[str, float]):
+        super().__init__()
+        self.rates = rates
+        self._resolved: Dict[str, Optional[float]] = {}
+        self.dropped = 0
+
+    def _rate(self, name: str) -> Optional[float]:
+        if name not in self._resolved:
+            candidate = name
+            rate = None
+            while candidate:
+                if candidate in self.rates:
+                    rate = self.rates[candidate]
+                    break
+                candidate = candidate.rpartition(".")[0]
+            self._resolved[name] = rate
+        return self._resolved[name]
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        if record.levelno >= logging.WARNING:
+            return True
+        rate = self._rate(record.name)
+        if rate is None or random.random() < rate:
+            return True
+        self.dropped += 1
+        return False
+
+class JsonFormatter(logging.Formatter):
+    def format(self, record: logging.LogRecord) -> str:
+        entry = {
+            "timestamp": datetime.fromtimestamp(record.created, timezone.utc).isoformat(),
+            "level": record.levelname,
+            "logger": record.name,
+            "message": record.getMessage(),
+            "run_id": getattr(record, "run_id", None),
+            "node": getattr(record, "node", None)
+        }
+        entry.update({key: value for key, value in vars(record).items() if key not in _RECORD_ATTRIBUTES})
+        if record.exc_info:
+            entry["exception"] = self.formatException(record.exc_info)
+        return json.dumps(entry, default=str)
+
+class NonBlockingQueueHandler(QueueHandler):
+    """
+    Hands records to the writer thread without formatting them or waiting.
+
+    Formatting (including the message's %-arguments) happens on the writer
+    thread. When the queue is full the record is dropped and counted
+    rather than blocking the event loop.
+    """
+
+    def __init__(self, log_queue: queue.Queue):
+        super().__init__(log_queue)
+        self.dropped = 0
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        # The queue never leaves this process, so the record needs no pickling-safe copy
+        return record
+
+    def enqueue(self, record: logging.LogRecord) -> None:
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            self.dropped += 1
+
+class SizedTimedRotatingFileHandler(TimedRotatingFileHandler):
+    """Rotates at each ``when`` boundary and whenever the file would exceed ``max_bytes``."""
+
+    def __init__(self, filename: str, when: str, backup_count: int, max_bytes: int):
+        super().__init__(filename, when=when, backupCount=backup_count, encoding="utf-8", delay=True)
+        self.max_bytes = max_bytes
+        # The line shouldRollover measured, reused by emit so each record is formatted once
+        self._formatted: Optional[tuple[logging.LogRecord, str]] = None
+
+    def format(self, record: logging.LogRecord) -> str:
+        if self._formatted is not None and self._formatted[0] is record:
+            line = self._formatted[1]
+        else:
+            line = super().format(record)
+        self._formatted = None
+        return line
+
+    def shouldRollover(self, record: logging.LogRecord) -> bool:
+        if super().shouldRollover(record):
+            return True
+        if self.max_bytes <= 0:
+            return False
+        if self.stream is None:
+            self.stream = self._open()
+        line = self.format(record)
+        self._formatted = (record, line)
+        return self.stream.tell() + len(line) + 1 > self.max_bytes
+
+    def rotation_filename(self, default_name: str) -> str:
+        # Several size rollovers can fall in one time period. Number them past the
+        # highest chunk on disk, so a pruned gap is never refilled by a newer chunk
+        directory, base = os.path.split(default_name)
+        indices = [
+            int(name[len(base) + 1:]) for name in os.listdir(directory or ".")
+            if name.startswith(base + ".") and name[len(base) + 1:].isdigit()
         ]
+        if not indices and not os.path.exists(default_name):
+            return default_name
+        return f"{default_name}.{max(indices, default=0) + 1}"
+
+    def getFilesToDelete(self) -> List[str]:
+        # Rotated names do not sort by age once chunks are numbered, so keep the newest by mtime
+        directory, base = os.path.split(self.baseFilename)
+        rotated = [
+            os.path.join(directory, name) for name in os.listdir(directory)
+            if name.startswith(base + ".") and self.extMatch.search(name[len(base) + 1:])
+        ]
+        if len(rotated) <= self.backupCount:
+            return []
+
+        def age(path: str) -> tuple:
+            suffix = path.rsplit(".", 1)[-1]
+            return os.stat(path).st_mtime_ns, int(suffix) if suffix.isdigit() else 0
+
+        rotated.sort(key=age)
+        return rotated[:len(rotated) - self.backupCount]
+
+class LoggingPipeline:
+    """Application loggers feed a bounded queue; one background thread formats and writes."""
+    listener: Optional[QueueListener] = None
+    queue_handler: Optional[NonBlockingQueueHandler] = None
+    sampler: Optional[SamplingFilter] = None
+
+def setup_logger() -> logging.Logger:
+    # Create logs directory if it doesn't exist
+    os.makedirs(settings.LOG_DIR, exist_ok=True)
+    logger = logging.getLogger(LOGGER_NAME)
+    if LoggingPipeline.listener is not None:
+        return logger
+
+    formatter = JsonFormatter() if settings.LOG_FORMAT == "json" else logging.Formatter(
+        "%(asctime)s - %(name)s - %(levelname)s - [%(run_id)s %(node)s] %(message)s"
+    )
+    file_handler = SizedTimedRotatingFileHandler(
+        os.path.join(settings.LOG_DIR, "app.log"),
+        when=settings.LOG_ROTATION_WHEN,
+        backup_count=settings.LOG_BACKUP_COUNT,
+        max_bytes=settings.LOG_MAX_BYTES
     )
-    return logging.getLogger(__name__)
+    stream_handler = logging.StreamHandler()
+    for handler in (file_handler, stream_handler):
+        handler.setFormatter(formatter)
+
+    log_queue: queue.Queue = queue.Queue(maxsize=settings.LOG_QUEUE_SIZE)
+    queue_handler = NonBlockingQueueHandler(log_queue)
+    sampler = SamplingFilter(settings.LOG_SAMPLING)
+    # Filters run on the caller's thread, where the run context is visible and sampling saves the most
+    queue_handler.addFilter(sampler)
+    queue_handler.addFilter(ContextFilter())
+
+    root = logging.getLogger()
+    root.setLevel(settings.LOG_LEVEL)
+    root.addHandler(queue_handler)
+
+    listener = QueueListener(log_queue, file_handler, stream_handler, respect_handler_level=True)
+    listener.start()
+    atexit.register(shutdown_logging)
+
+    LoggingPipeline.listener = listener
+    LoggingPipeline.queue_handler = queue_handler
+    LoggingPipeline.sampler = sampler
+    return logger
+
+def get_logger(name: str) -> logging.Logger:
+    """Child of the application logger, so it can be sampled or levelled on its own."""
+    return logging.getLogger(f"{LOGGER_NAME}.{name}")
+
+def shutdown_logging() -> None:
+    """Write out everything still queued and stop the writer thread."""
+    if LoggingPipeline.listener is not None:
+        LoggingPipeline.listener.stop()
+        LoggingPipeline.listener = None
+        logging.getLogger().removeHandler(LoggingPipeline.queue_handler)
+
+def logging_stats() -> Dict[str, int]:
+    return {
+        "queued": LoggingPipeline.queue_handler.queue.qsize() if LoggingPipeline.queue_handler else 0,
+        "dropped_queue_full": LoggingPipeline.queue_handler.dropped if LoggingPipeline.queue_handler else 0,
+        "dropped_sampled": LoggingPipeline.sampler.dropped if LoggingPipeline.sampler else 0
+    }
 
-logger = setup_logger() 
\ No newline at end of file
+logger = setup_logger()
@@ -0,0 +1,211 @@
+import bisect
+import math
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Any, Dict, Iterator, List, Optional, Sequence, Tuple
+from ..config.settings import settings
+
+LATENCY_BUCKETS = (0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0, 120.0)
+TOKEN_BUCKETS = (100, 250, 500, 1000, 2000, 4000, 8000, 16000)
+
+def _format_labels(names: Sequence[str], values: Tuple[str, ...], extra: str = "") -> str:
+    pairs = [f'{name}="{value}"' for name, value in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+def _format_value(value: float) -> str:
+    if value == math.inf:
+        return "+Inf"
+    return repr(float(value)) if not float(value).is_integer() else str(int(value))
+
+class Counter:
+    def __init__(self, name: str, help_text: str, label_names: Sequence[str] = ()):
+        self.name = name
+        self.help_text = help_text
+        self.label_names = tuple(label_names)
+        self._values: Dict[Tuple[str, ...], float] = {}
+
+    def inc(self, amount: float = 1.0, **labels: Any) -> None:
+        key = tuple(str(labels[name]) for name in self.label_names)
+        self._values[key] = self._values.get(key, 0.0) + amount
+
+    def render(self) -> List[str]:
+        lines = [f"# HELP {self.name} {self.help_text}", f"# TYPE {self.name} counter"]
+        for key, value in sorted(self._values.items()):
+            lines.append(f"{self.name}{_format_labels(self.label_names, key)} {_format_value(value)}")
+        return lines
+
+class Histogram:
+    """
+    Fixed-bucket histogram; ``observe`` is a bisect and a few additions so it
+    is cheap enough to call on every node invocation.
+    """
+
+    def __init__(self, name: str, help_text: str, buckets: Sequence[float], label_names: Sequence[str] = ()):
+        self.name = name
+        self.help_text = help_text
+        self.buckets = tuple(sorted(buckets))
+        self.label_names = tuple(label_names)
+        # Per label set: [bucket counts..., +Inf count], sum
+        self._series: Dict[Tuple[str, ...], List[Any]] = {}
+
+    def observe(self, value: float, **labels: Any) -> None:
+        key = tuple(str(labels[name]) for name in self.label_names)
+        series = self._series.get(key)
+        if series is None:
+            series = self._series[key] = [[0] * (len(self.buckets) + 1), 0.0]
+        series[0][bisect.bisect_left(self.buckets, value)] += 1
+        series[1] += value
+
+    def quantile(self, q: float, **labels: Any) -> Optional[float]:
+        """Upper bound of the bucket holding the q-quantile, as Prometheus' histogram_quantile would estimate."""
+        series = self._series.get(tuple(str(labels[name]) for name in self.label_names))
+        if series is None:
+            return None
+        counts = series[0]
+        rank = q * sum(counts)
+        seen = 0
+        for bound, count in zip(self.buckets + (math.inf,), counts):
+            seen += count
+            if seen >= rank:
+                return bound
+        return math.inf
+
+    def render(self) -> List[str]:
+        lines = [f"# HELP {self.name} {self.help_text}", f"# TYPE {self.name} histogram"]
+        for key, (counts, total) in sorted(self._series.items()):
+            cumulative = 0
+            for bound, count in zip(self.buckets + (math.inf,), counts):
+                cumulative += count
+                labels = _format_labels(self.label_names, key, f'le="{_format_value(bound)}"')
+                lines.append(f"{self.name}_bucket{labels} {cumulative}")
+            labels = _format_labels(self.label_names, key)
+            lines.append(f"{self.name}_sum{labels} {_format_value(total)}")
+            lines.append(f"{self.name}_count{labels} {cumulative}")
+        return lines
+
+class MetricsRegistry:
+    def __init__(self):
+        self._metrics: List[Any] = []
+
+    def counter(self, name: str, help_text: str, label_names: Sequence[str] = ()) -> Counter:
+        metric = Counter(name, help_text, label_names)
+        self._metrics.append(metric)
+        return metric
+
+    def histogram(self, name: str, help_text: str, buckets: Sequence[float], label_names: Sequence[str] = ()) -> Histogram:
+        metric = Histogram(name, help_text, buckets, label_names)
+        self._metrics.append(metric)
+        return metric
+
+    def render(self) -> str:
+        lines: List[str] = []
+        for metric in self._metrics:
+            lines.extend(metric.render())
+        return "\n".join(lines) + "\n"
+
+def render_gauges(prefix: str, values: Dict[str, float]) -> str:
+    """Render a flat dict of current values (e.g. scheduler stats) as Prometheus gauges."""
+    lines: List[str] = []
+    for name, value in sorted(values.items()):
+        lines.append(f"# TYPE {prefix}_{name} gauge")
+        lines.append(f"{prefix}_{name} {_format_value(value)}")
+    return "\n".join(lines) + "\n" if lines else ""
+
+registry = MetricsRegistry()
+
+NODE_DURATION = registry.histogram(
+    "node_duration_seconds", "Wall time of one flow node invocation", LATENCY_BUCKETS, ["node"]
+)
+LLM_QUEUE_DURATION = registry.histogram(
+    "llm_queue_seconds", "Time an LLM call waited in the scheduler", LATENCY_BUCKETS, ["node"]
+)
+LLM_CALL_DURATION = registry.histogram(
+    "llm_call_seconds", "Time from admission to the end of an LLM completion", LATENCY_BUCKETS, ["node"]
+)
+PARSE_DURATION = registry.histogram(
+    "llm_parse_seconds", "Time spent parsing and validating a completion", LATENCY_BUCKETS, ["node"]
+)
+PROMPT_TOKENS = registry.histogram(
+    "llm_prompt_tokens", "Approximate prompt tokens per LLM call", TOKEN_BUCKETS, ["node"]
+)
+COMPLETION_TOKENS = registry.histogram(
+    "llm_completion_tokens", "Approximate completion tokens per LLM call", TOKEN_BUCKETS, ["node"]
+)
+LLM_CALLS = registry.counter(
+    "llm_calls_total", "LLM calls by node and whether the response cache answered them", ["node", "cache_hit"]
+)
+LLM_ESCALATIONS = registry.counter(
+    "llm_escalations_total", "LLM calls retried on the escalation model", ["node"]
+)
+LLM_COST = registry.counter(
+    "llm_cost_usd_total", "Estimated provider cost of LLM calls", ["node"]
+)
+
+# LLM call records of the flow node currently executing (set per node task)
+_node_calls: ContextVar[Optional[List[Dict[str, Any]]]] = ContextVar("node_calls", default=None)
+
+def record_llm_call(call: Dict[str, Any]) -> None:
+    calls = _node_calls.get()
+    if calls is not None:
+        calls.append(call)
+
+@contextmanager
+def collect_node_calls() -> Iterator[List[Dict[str, Any]]]:
+    """Collect the LLM call records made by the current node until the block exits."""
+    calls: List[Dict[str, Any]] = []
+    token = _node_calls.set(calls)
+    try:
+        yield calls
+    finally:
+        _node_calls.reset(token)
+
+def estimate_cost(model: str, tokens: int) -> float:
+    return tokens * settings.LLM_PRICE_PER_MILLION_TOKENS.get(model, 0.0) / 1_000_000
+
+def observe_node(node: str, iteration: int, seconds: float, calls: List[Dict[str, Any]]) -> Dict[str, Any]:
+    """
+    Record one node invocation in the histograms and return its summary for the run state.
+    """
+    NODE_DURATION.observe(seconds, node=node)
+    summary = {
+        "node": node,
+        "iteration": iteration,
+        "wall_seconds": round(seconds, 4),
+        "queue_seconds": 0.0,
+        "llm_seconds": 0.0,
+        "parse_seconds": 0.0,
+        "prompt_tokens": 0,
+        "completion_tokens": 0,
+        "cost_usd": 0.0,
+        "llm_calls": len(calls),
+        "cache_hits": 0,
+        "escalations": 0
+    }
+    for call in calls:
+        LLM_CALLS.inc(node=node, cache_hit=str(call["cache_hit"]).lower())
+        PROMPT_TOKENS.observe(call["prompt_tokens"], node=node)
+        COMPLETION_TOKENS.observe(call.get("completion_tokens", 0), node=node)
+        PARSE_DURATION.observe(call.get("parse_seconds", 0.0), node=node)
+        summary["parse_seconds"] += call.get("parse_seconds", 0.0)
+        summary["prompt_tokens"] += call["prompt_tokens"]
+        summary["completion_tokens"] += call.get("completion_tokens", 0)
+        if call.get("escalated"):
+            LLM_ESCALATIONS.inc(node=node)
+            summary["escalations"] += 1
+        if call["cache_hit"]:
+            summary["cache_hits"] += 1
+            continue
+        LLM_QUEUE_DURATION.observe(call.get("queue_seconds", 0.0), node=node)
+        LLM_CALL_DURATION.observe(call.get("llm_seconds", 0.0), node=node)
+        cost = estimate_cost(call.get("model", ""), call["prompt_tokens"] + call.get("completion_tokens", 0))
+        LLM_COST.inc(cost, node=node)
+        summary["queue_seconds"] += call.get("queue_seconds", 0.0)
+        summary["llm_seconds"] += call.get("llm_seconds", 0.0)
+        summary["cost_usd"] += cost
+
+    for key in ("queue_seconds", "llm_seconds", "parse_seconds"):
+        summary[key] = round(summary[key], 4)
+    summary["cost_usd"] = round(summary["cost_usd"], 6)
+    return summary
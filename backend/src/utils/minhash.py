@@ -0,0 +1,114 @@
+import hashlib
+import random
+import re
+from array import array
+from typing import Dict, FrozenSet, Iterable, List, Optional, Tuple
+
+# Mersenne prime 2^61 - 1; every hash value stays below it, so it fits an unsigned 64-bit slot
+_PRIME = (1 << 61) - 1
+
+_WORD_RE = re.compile(r"[a-z0-9]+")
+
+# Words that do not change what is being integrated
+_STOPWORDS = frozenset({
+    "a", "an", "and", "the", "to", "with", "from", "of", "for", "in", "on", "into",
+    "please", "i", "want", "need", "would", "like", "can", "you", "me", "my", "that", "so", "it"
+})
+
+def normalize_text(text: str) -> List[str]:
+    return [word for word in _WORD_RE.findall(text.lower()) if word not in _STOPWORDS]
+
+def shingles(text: str) -> FrozenSet[str]:
+    """Word unigrams and bigrams of the normalized text."""
+    words = normalize_text(text)
+    return frozenset(words + [f"{first} {second}" for first, second in zip(words, words[1:])])
+
+def _hash64(value: str) -> int:
+    return int.from_bytes(hashlib.blake2b(value.encode("utf-8"), digest_size=8).digest(), "little") % _PRIME
+
+class MinHasher:
+    def __init__(self, num_perm: int = 64, seed: int = 1):
+        rng = random.Random(seed)
+        self.num_perm = num_perm
+        self._perms = [(rng.randrange(1, _PRIME), rng.randrange(0, _PRIME)) for _ in range(num_perm)]
+
+    def signature(self, items: Iterable[str]) -> array:
+        hashes = [_hash64(item) for item in items]
+        if not hashes:
+            return array("Q", [_PRIME] * self.num_perm)
+        return array("Q", [min((a * value + b) % _PRIME for value in hashes) for a, b in self._perms])
+
+def estimate_jaccard(first: array, second: array) -> float:
+    return sum(1 for x, y in zip(first, second) if x == y) / len(first)
+
+class MinHashLSH:
+    """
+    Banded locality-sensitive index over MinHash signatures.
+
+    With ``bands`` bands of ``num_perm / bands`` rows, two inputs become
+    candidates when any band matches exactly. That happens with high
+    probability above a Jaccard similarity of about
+    ``(1 / bands) ** (bands / num_perm)``. Candidates are then ranked by
+    estimated similarity, so a lookup only touches a handful of entries
+    however large the index grows.
+    """
+
+    def __init__(self, num_perm: int = 64, bands: int = 8):
+        if num_perm % bands:
+            raise ValueError("num_perm must be divisible by bands")
+        self.num_perm = num_perm
+        self.bands = bands
+        self.rows = num_perm // bands
+        self._keys: List[Optional[str]] = []
+        self._signatures: List[Optional[array]] = []
+        self._positions: Dict[str, int] = {}
+        self._buckets: List[Dict[int, List[int]]] = [{} for _ in range(bands)]
+
+    def __len__(self) -> int:
+        return len(self._positions)
+
+    def __contains__(self, key: str) -> bool:
+        return key in self._positions
+
+    def _band_keys(self, signature: array) -> List[int]:
+        return [
+            hash(signature[band * self.rows:(band + 1) * self.rows].tobytes())
+            for band in range(self.bands)
+        ]
+
+    def add(self, key: str, signature: array) -> None:
+        if key in self._positions:
+            return
+        position = len(self._keys)
+        self._keys.append(key)
+        self._signatures.append(signature)
+        self._positions[key] = position
+        for band, band_key in enumerate(self._band_keys(signature)):
+            self._buckets[band].setdefault(band_key, []).append(position)
+
+    def remove(self, key: str) -> None:
+        position = self._positions.pop(key, None)
+        if position is None:
+            return
+        for band, band_key in enumerate(self._band_keys(self._signatures[position])):
+            bucket = self._buckets[band].get(band_key)
+            if bucket is not None:
+                bucket.remove(position)
+                if not bucket:
+                    del self._buckets[band][band_key]
+        self._keys[position] = None
+        self._signatures[position] = None
+
+    def query(self, signature: array, threshold: float = 0.0, limit: int = 1) -> List[Tuple[str, float]]:
+        """Return up to ``limit`` ``(key, estimated_similarity)`` pairs at or above ``threshold``, best first."""
+        candidates = set()
+        for band, band_key in enumerate(self._band_keys(signature)):
+            candidates.update(self._buckets[band].get(band_key, ()))
+
+        scored = []
+        for position in candidates:
+            similarity = estimate_jaccard(signature, self._signatures[position])
+            if similarity >= threshold:
+                scored.append((self._keys[position], similarity))
+        scored.sort(key=lambda item: item[1], reverse=True)
+        return scored[:limit]
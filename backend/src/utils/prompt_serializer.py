@@ -0,0 +1,114 @@
+import copy
+import json
+import re
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Optional
+
+# Rough BPE approximation: at least one token per word or punctuation mark,
+# and about four characters per token for long identifiers and code
+_TOKEN_RE = re.compile(r"\w+|[^\w\s]")
+
+# Strings shorter than this are not worth cutting further
+_MIN_SHORTEN_LENGTH = 200
+
+def count_tokens(text: str) -> int:
+    return max(len(_TOKEN_RE.findall(text)), -(-len(text) // 4))
+
+def to_prompt_text(value: Any) -> str:
+    """Compact canonical JSON for structured values; strings pass through unchanged."""
+    if isinstance(value, str):
+        return value
+    return json.dumps(value, sort_keys=True, separators=(",", ":"), ensure_ascii=False, default=str)
+
+@dataclass
+class SerializedInputs:
+    fields: Dict[str, str]
+    tokens: int
+    budget: int
+    elided: List[str] = field(default_factory=list)
+
+    def stats(self) -> Dict[str, Any]:
+        return {"input_tokens": self.tokens, "budget": self.budget, "elided": list(self.elided)}
+
+def _summarize(value: Any) -> Any:
+    if isinstance(value, str):
+        return f"<elided {len(value)} chars>"
+    if isinstance(value, dict):
+        # Keep the keys (e.g. file names) so the model still sees the structure
+        return {
+            key: f"<elided {len(item.splitlines())} lines>" if isinstance(item, str) else _summarize(item)
+            for key, item in value.items()
+        }
+    if isinstance(value, list):
+        return [f"<elided {len(value)} items>"]
+    return value
+
+def _elide_path(data: Dict[str, Any], path: str) -> bool:
+    *parents, leaf = path.split(".")
+    node: Any = data
+    for key in parents:
+        if not isinstance(node, dict) or key not in node:
+            return False
+        node = node[key]
+    if not isinstance(node, dict) or leaf not in node:
+        return False
+    summary = _summarize(node[leaf])
+    if summary == node[leaf]:
+        return False
+    node[leaf] = summary
+    return True
+
+def _largest_string(node: Any, path: str = "") -> Optional[tuple]:
+    best = None
+    children = node.items() if isinstance(node, dict) else enumerate(node) if isinstance(node, list) else ()
+    for key, child in children:
+        child_path = f"{path}.{key}" if path else str(key)
+        if isinstance(child, str):
+            candidate = (len(child), node, key, child_path)
+        else:
+            candidate = _largest_string(child, child_path)
+        if candidate is not None and (best is None or candidate[0] > best[0]):
+            best = candidate
+    return best
+
+def serialize_inputs(inputs: Dict[str, Any], budget: int, elision_order: List[str]) -> SerializedInputs:
+    """
+    Render prompt inputs as compact JSON and keep them within a token budget.
+
+    Fields listed in ``elision_order`` (dotted paths such as
+    ``"code_output.setup_instructions"``) are summarized first, in order. If
+    the inputs are still over budget, the longest remaining strings are cut
+    in half until they fit. The caller's data is never modified.
+    """
+    fields = {name: to_prompt_text(value) for name, value in inputs.items()}
+    tokens = sum(count_tokens(text) for text in fields.values())
+    if tokens <= budget:
+        return SerializedInputs(fields=fields, tokens=tokens, budget=budget)
+
+    data = copy.deepcopy(inputs)
+    elided: List[str] = []
+
+    def render() -> int:
+        nonlocal fields
+        fields = {name: to_prompt_text(value) for name, value in data.items()}
+        return sum(count_tokens(text) for text in fields.values())
+
+    for path in elision_order:
+        if tokens <= budget:
+            break
+        if _elide_path(data, path):
+            elided.append(path)
+            tokens = render()
+
+    while tokens > budget:
+        largest = _largest_string(data)
+        if largest is None or largest[0] < _MIN_SHORTEN_LENGTH:
+            break
+        length, parent, key, path = largest
+        keep = length // 2
+        parent[key] = f"{parent[key][:keep]}...<elided {length - keep} chars>"
+        if path not in elided:
+            elided.append(path)
+        tokens = render()
+
+    return SerializedInputs(fields=fields, tokens=tokens, budget=budget, elided=elided)
@@ -0,0 +1,151 @@
+"""
+Encode large API responses: field projection, JSON or MessagePack, and compression.
+
+FastAPI's default path re-validates a returned model against its
+``response_model``, walks it with ``jsonable_encoder`` and then calls
+``json.dumps``. For flow results carrying hundreds of KB of generated
+source that is several times slower than dumping the model once and
+encoding it with orjson, which is what ``encoded_response`` does.
+"""
+import asyncio
+import gzip
+import orjson
+from fastapi import Request, Response
+from pydantic import BaseModel
+from typing import Any, Dict, List, Optional
+from ..config.settings import settings
+
+try:
+    import msgpack
+except ImportError:  # pragma: no cover - optional, see requirements-optional.txt
+    msgpack = None
+
+try:
+    import brotli
+except ImportError:  # pragma: no cover - optional, see requirements-optional.txt
+    brotli = None
+
+JSON = "application/json"
+MSGPACK = "application/msgpack"
+_MSGPACK_TYPES = (MSGPACK, "application/x-msgpack", "application/vnd.msgpack")
+
+IDENTITY = "identity"
+GZIP = "gzip"
+BROTLI = "br"
+
+# Bodies at least this large are compressed on a worker thread instead of the event loop
+_OFFLOAD_BYTES = 64 * 1024
+
+Include = Dict[str, Any]
+
+def parse_fields(fields: Optional[str], model: type[BaseModel]) -> Optional[Include]:
+    """
+    Turn ``fields=final_status,evaluation,code_output.files`` into a pydantic ``include``.
+
+    Top-level names must be fields of ``model``; ``field.key`` keeps only
+    that key of a dict field. Returns None (everything) when ``fields`` is empty.
+
+    Raises:
+        ValueError: If a top-level name is not a field of ``model``
+    """
+    if not fields:
+        return None
+    include: Include = {}
+    unknown: List[str] = []
+    for path in filter(None, (part.strip() for part in fields.split(","))):
+        head, _, key = path.partition(".")
+        if head not in model.model_fields:
+            unknown.append(head)
+        elif not key:
+            include[head] = True
+        elif include.get(head) is not True:
+            include.setdefault(head, {})[key] = True
+    if unknown:
+        raise ValueError(f"Unknown fields: {', '.join(sorted(set(unknown)))}")
+    return include or None
+
+def _quality(params: List[str]) -> float:
+    for param in params:
+        name, _, value = param.strip().partition("=")
+        if name.strip() == "q":
+            try:
+                return float(value)
+            except ValueError:
+                return 0.0
+    return 1.0
+
+def _preferences(header: Optional[str]) -> Dict[str, float]:
+    """``Accept``-style header as ``{value: q}``; values with ``q=0`` are kept so they can refuse."""
+    preferences: Dict[str, float] = {}
+    for item in (header or "").split(","):
+        value, *params = item.split(";")
+        value = value.strip().lower()
+        if value:
+            preferences[value] = _quality(params)
+    return preferences
+
+def negotiate_media_type(accept: Optional[str]) -> str:
+    """MessagePack when the client prefers it (and it is installed), otherwise JSON."""
+    if msgpack is None:
+        return JSON
+    preferences = _preferences(accept)
+    msgpack_q = max((preferences.get(media_type, 0.0) for media_type in _MSGPACK_TYPES), default=0.0)
+    json_q = max(preferences.get(JSON, 0.0), preferences.get("application/*", 0.0), preferences.get("*/*", 0.0))
+    return MSGPACK if msgpack_q > 0 and msgpack_q >= json_q else JSON
+
+def negotiate_encoding(accept_encoding: Optional[str]) -> str:
+    """Pick br or gzip by the client's q-values, preferring br on a tie; identity if neither is acceptable."""
+    preferences = _preferences(accept_encoding)
+    wildcard = preferences.get("*", 0.0)
+    candidates = [GZIP] if brotli is None else [BROTLI, GZIP]
+    best, best_q = IDENTITY, 0.0
+    for encoding in candidates:
+        q = preferences.get(encoding, wildcard)
+        if q > best_q:
+            best, best_q = encoding, q
+    return best
+
+def encode(payload: Any, media_type: str) -> bytes:
+    if media_type == MSGPACK:
+        return msgpack.packb(payload, default=str)
+    return orjson.dumps(payload, default=str, option=orjson.OPT_NON_STR_KEYS)
+
+def compress(body: bytes, encoding: str) -> bytes:
+    if encoding == BROTLI:
+        return brotli.compress(body, quality=settings.RESPONSE_BROTLI_QUALITY)
+    if encoding == GZIP:
+        return gzip.compress(body, compresslevel=settings.RESPONSE_GZIP_LEVEL)
+    return body
+
+async def encoded_response(
+    request: Request,
+    model: BaseModel,
+    include: Optional[Include] = None
+) -> Response:
+    """
+    Serialize ``model`` (only the ``include``d fields) for this client.
+
+    The body is MessagePack or JSON according to ``Accept`` and is
+    compressed with br or gzip according to ``Accept-Encoding`` once it
+    reaches ``RESPONSE_COMPRESSION_MIN_BYTES``.
+    """
+    media_type = negotiate_media_type(request.headers.get("accept"))
+    if media_type == MSGPACK:
+        # MessagePack has no datetime type; dump JSON-ready values so both media types agree
+        payload = model.model_dump(mode="json", include=include)
+    else:
+        # orjson encodes datetimes and the like itself, faster than pydantic's JSON mode
+        payload = model.model_dump(include=include)
+    body = encode(payload, media_type)
+    headers = {"Vary": "Accept, Accept-Encoding"}
+
+    encoding = IDENTITY
+    if settings.RESPONSE_COMPRESSION_ENABLED and len(body) >= settings.RESPONSE_COMPRESSION_MIN_BYTES:
+        encoding = negotiate_encoding(request.headers.get("accept-encoding"))
+    if encoding != IDENTITY:
+        if len(body) >= _OFFLOAD_BYTES:
+            body = await asyncio.to_thread(compress, body, encoding)
+        else:
+            body = compress(body, encoding)
+        headers["Content-Encoding"] = encoding
+    return Response(content=body, media_type=media_type, headers=headers)
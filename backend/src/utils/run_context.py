@@ -0,0 +1,43 @@
+import asyncio
+from contextlib import contextmanager
+from contextvars import ContextVar, Token
+from dataclasses import dataclass
+from typing import Any, Dict, Iterator, List, Optional
+
+@dataclass
+class RunContext:
+    """Per-request options that must reach the nodes without being threaded through GraphState."""
+    run_id: Optional[str] = None
+    bypass_cache: bool = False
+    # When set, nodes push ("token", data) and ("field", data) events here as output streams in
+    token_sink: Optional[asyncio.Queue] = None
+    # When set, every node LLM call appends a record of its prompt size and budget here
+    llm_calls: Optional[List[Dict[str, Any]]] = None
+    # Scheduler priority of this run's LLM calls; lower is served first (0 interactive, 1 batch)
+    priority: int = 0
+
+_DEFAULT_CONTEXT = RunContext()
+_current_run: ContextVar[RunContext] = ContextVar("current_run", default=_DEFAULT_CONTEXT)
+
+def get_run_context() -> RunContext:
+    return _current_run.get()
+
+def set_run_context(context: RunContext) -> Token:
+    return _current_run.set(context)
+
+def reset_run_context(token: Token) -> None:
+    _current_run.reset(token)
+
+# Graph node running in the current task; parallel branches each see their own
+_current_node: ContextVar[Optional[str]] = ContextVar("current_node", default=None)
+
+def get_current_node() -> Optional[str]:
+    return _current_node.get()
+
+@contextmanager
+def node_scope(name: str) -> Iterator[None]:
+    token = _current_node.set(name)
+    try:
+        yield
+    finally:
+        _current_node.reset(token)
@@ -0,0 +1,241 @@
+import asyncio
+import json
+import os
+import signal
+import sys
+import tempfile
+import time
+import xml.etree.ElementTree as ElementTree
+from dataclasses import asdict, dataclass, field
+from pathlib import Path, PurePosixPath
+from typing import Any, Dict, List, Optional
+from ..config.settings import settings
+from .logging import logger
+
+try:
+    import resource
+except ImportError:  # pragma: no cover - not available on Windows
+    resource = None
+
+# Captured subprocess output kept in the result, per step
+MAX_OUTPUT_CHARS = 4000
+
+_IMPORT_CHECK = """
+import importlib, json, sys
+failures = {}
+for name in sys.argv[1:]:
+    try:
+        importlib.import_module(name)
+    except BaseException as e:
+        failures[name] = f"{type(e).__name__}: {e}"
+print(json.dumps(failures))
+"""
+
+# Applies the limits inside the child, then replaces it with the real command;
+# limits survive exec, and nothing runs in the parent between fork and exec
+_LIMITS_BOOTSTRAP = """
+import os, resource, sys
+cpu_seconds, memory = int(sys.argv[1]), int(sys.argv[2])
+resource.setrlimit(resource.RLIMIT_CPU, (cpu_seconds, cpu_seconds))
+resource.setrlimit(resource.RLIMIT_AS, (memory, memory))
+os.execv(sys.executable, [sys.executable, *sys.argv[3:]])
+"""
+
+@dataclass
+class SandboxResult:
+    compiled: bool = True
+    syntax_errors: Dict[str, str] = field(default_factory=dict)
+    import_errors: Dict[str, str] = field(default_factory=dict)
+    tests_run: int = 0
+    tests_failed: int = 0
+    tests_errored: int = 0
+    timed_out: bool = False
+    # None when the tests could not be run at all (no tests, no pytest)
+    passed: Optional[bool] = None
+    output: str = ""
+    duration_seconds: float = 0.0
+
+    def to_dict(self) -> Dict[str, Any]:
+        return asdict(self)
+
+class SandboxError(ValueError):
+    """Raised when generated files cannot be laid out safely (e.g. absolute or ``..`` paths)."""
+
+def _safe_path(root: Path, name: str) -> Path:
+    relative = PurePosixPath(name.replace("\\", "/"))
+    if relative.is_absolute() or ".." in relative.parts or not relative.parts:
+        raise SandboxError(f"Refusing to write generated file outside the sandbox: {name}")
+    return root.joinpath(*relative.parts)
+
+def _module_name(name: str) -> Optional[str]:
+    path = PurePosixPath(name.replace("\\", "/"))
+    if path.suffix != ".py":
+        return None
+    parts = list(path.with_suffix("").parts)
+    if parts[-1] == "__init__":
+        parts = parts[:-1]
+    return ".".join(parts) or None
+
+class SandboxExecutor:
+    """
+    Runs generated code and tests in throwaway directories and subprocesses.
+
+    Every file is compiled in-process first; nothing is executed when that
+    fails. Otherwise the implementation modules are imported, and the tests
+    are run with pytest, in child processes limited by ``cpu_seconds``,
+    ``memory_mb`` and a wall-clock ``timeout_seconds``. At most
+    ``max_workers`` sandboxes run at once.
+    """
+
+    def __init__(
+        self,
+        max_workers: int,
+        timeout_seconds: float,
+        cpu_seconds: int,
+        memory_mb: int,
+        python: Optional[str] = None
+    ):
+        self.max_workers = max_workers
+        self.timeout_seconds = timeout_seconds
+        self.cpu_seconds = cpu_seconds
+        self.memory_mb = memory_mb
+        self.python = python or sys.executable
+        self._slots: Optional[asyncio.Semaphore] = None
+
+    def _limited(self, args: List[str]) -> List[str]:
+        # preexec_fn is unsafe in a threaded parent, so the child sets its own limits
+        if resource is None:
+            return args
+        memory = self.memory_mb * 1024 * 1024
+        return ["-c", _LIMITS_BOOTSTRAP, str(self.cpu_seconds), str(memory), *args]
+
+    async def _run_process(self, args: List[str], cwd: Path, result: SandboxResult) -> tuple[int, str]:
+        env = {
+            "PATH": os.environ.get("PATH", ""),
+            "HOME": str(cwd),
+            "PYTHONDONTWRITEBYTECODE": "1",
+            # Third-party pytest plugins installed alongside the service are not needed here
+            "PYTEST_DISABLE_PLUGIN_AUTOLOAD": "1"
+        }
+        process = await asyncio.create_subprocess_exec(
+            self.python, *self._limited(args),
+            cwd=str(cwd),
+            env=env,
+            stdin=asyncio.subprocess.DEVNULL,
+            stdout=asyncio.subprocess.PIPE,
+            stderr=asyncio.subprocess.STDOUT,
+            start_new_session=True
+        )
+        try:
+            stdout, _ = await asyncio.wait_for(process.communicate(), timeout=self.timeout_seconds)
+        except (asyncio.TimeoutError, asyncio.CancelledError) as e:
+            # Kill the whole session so grandchildren spawned by generated code die too
+            try:
+                os.killpg(process.pid, signal.SIGKILL)
+            except ProcessLookupError:
+                pass
+            await process.wait()
+            if isinstance(e, asyncio.CancelledError):
+                raise
+            result.timed_out = True
+            return -1, f"Timed out after {self.timeout_seconds}s"
+        return process.returncode, stdout.decode("utf-8", errors="replace")[-MAX_OUTPUT_CHARS:]
+
+    async def run(self, implementation: Dict[str, str], tests: Dict[str, str]) -> SandboxResult:
+        """
+        Check and test one generated integration.
+
+        Raises:
+            SandboxError: If a generated file name would escape the sandbox
+        """
+        started = time.perf_counter()
+        result = SandboxResult()
+        files = {**implementation, **tests}
+        for name in files:
+            _safe_path(Path("."), name)
+
+        for name, source in files.items():
+            if not name.endswith(".py"):
+                continue
+            try:
+                compile(source, name, "exec")
+            except SyntaxError as e:
+                result.syntax_errors[name] = f"line {e.lineno}: {e.msg}"
+        if result.syntax_errors:
+            # Nothing can run; the caller can skip evaluating this iteration
+            result.compiled = False
+            result.passed = False
+            result.duration_seconds = round(time.perf_counter() - started, 4)
+            return result
+
+        if self._slots is None:
+            self._slots = asyncio.Semaphore(self.max_workers)
+        async with self._slots:
+            with tempfile.TemporaryDirectory(prefix="sandbox-") as directory:
+                root = Path(directory)
+                for name, source in files.items():
+                    path = _safe_path(root, name)
+                    path.parent.mkdir(parents=True, exist_ok=True)
+                    path.write_text(source, encoding="utf-8")
+                await self._check_imports(root, implementation, result)
+                if tests and not result.timed_out:
+                    await self._run_tests(root, tests, result)
+
+        result.duration_seconds = round(time.perf_counter() - started, 4)
+        return result
+
+    async def _check_imports(self, root: Path, implementation: Dict[str, str], result: SandboxResult) -> None:
+        modules = [module for module in map(_module_name, implementation) if module]
+        if not modules:
+            return
+        code, output = await self._run_process(["-c", _IMPORT_CHECK, *modules], root, result)
+        if result.timed_out:
+            result.passed = False
+            result.output = output
+            return
+        try:
+            result.import_errors = json.loads(output.strip().splitlines()[-1])
+        except (ValueError, IndexError):
+            result.import_errors = {"<import check>": output or f"exited with {code}"}
+        if result.import_errors:
+            result.passed = False
+
+    async def _run_tests(self, root: Path, tests: Dict[str, str], result: SandboxResult) -> None:
+        report = root / ".sandbox-report.xml"
+        test_files = [name for name in tests if name.endswith(".py")]
+        code, output = await self._run_process(
+            ["-m", "pytest", "-q", "-p", "no:cacheprovider", f"--junitxml={report}", *test_files],
+            root,
+            result
+        )
+        result.output = output
+        if result.timed_out:
+            result.passed = False
+            return
+        if not report.exists():
+            if "No module named pytest" in output:
+                logger.warning("Sandbox interpreter has no pytest; generated tests were not run")
+                return
+            result.passed = False
+            return
+
+        suite = ElementTree.parse(report).getroot()
+        if suite.tag == "testsuites":
+            suite = suite.find("testsuite")
+        result.tests_run = int(suite.get("tests", 0))
+        result.tests_failed = int(suite.get("failures", 0))
+        result.tests_errored = int(suite.get("errors", 0))
+        if result.passed is None:
+            result.passed = (
+                result.tests_run > 0
+                and result.tests_failed == 0
+                and result.tests_errored == 0
+            )
+
+sandbox = SandboxExecutor(
+    max_workers=settings.SANDBOX_WORKERS,
+    timeout_seconds=settings.SANDBOX_TIMEOUT_SECONDS,
+    cpu_seconds=settings.SANDBOX_CPU_SECONDS,
+    memory_mb=settings.SANDBOX_MEMORY_MB,
+    python=settings.SANDBOX_PYTHON
+)
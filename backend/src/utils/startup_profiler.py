@@ -0,0 +1,91 @@
+"""
+Report how long each module takes to import, and how long startup phases take.
+
+The import report runs the target module in a fresh interpreter with
+CPython's ``-X importtime`` and ranks modules by cumulative import time,
+then sums self time per top-level package.
+
+Usage (from backend/):
+    python -m src.utils.startup_profiler --module src.routes --top 25
+"""
+import argparse
+import os
+import re
+import subprocess
+import sys
+import time
+from collections import defaultdict
+from dataclasses import dataclass
+from typing import Dict, List
+
+_IMPORTTIME_LINE = re.compile(r"^import time:\s+(\d+) \|\s+(\d+) \|(\s*)(\S+)")
+
+@dataclass
+class ImportTiming:
+    module: str
+    self_us: int
+    cumulative_us: int
+    depth: int
+
+def parse_importtime(output: str) -> List[ImportTiming]:
+    timings = []
+    for line in output.splitlines():
+        match = _IMPORTTIME_LINE.match(line)
+        if match:
+            self_us, cumulative_us, indent, module = match.groups()
+            # One leading space, then two per nesting level
+            timings.append(ImportTiming(module, int(self_us), int(cumulative_us), (len(indent) - 1) // 2))
+    return timings
+
+def profile_imports(module: str, python: str = sys.executable) -> List[ImportTiming]:
+    completed = subprocess.run(
+        [python, "-X", "importtime", "-c", f"import {module}"],
+        capture_output=True,
+        text=True,
+        env=os.environ.copy()
+    )
+    if completed.returncode != 0:
+        raise RuntimeError(f"Importing {module} failed:\n{completed.stderr[-2000:]}")
+    return parse_importtime(completed.stderr)
+
+def by_package(timings: List[ImportTiming]) -> Dict[str, int]:
+    totals: Dict[str, int] = defaultdict(int)
+    for timing in timings:
+        totals[timing.module.split(".")[0]] += timing.self_us
+    return dict(sorted(totals.items(), key=lambda item: item[1], reverse=True))
+
+class StartupTimer:
+    """Seconds from process start (roughly, from this module's import) to each named startup phase."""
+
+    def __init__(self):
+        self.started = time.perf_counter()
+        self.phases: Dict[str, float] = {}
+
+    def mark(self, phase: str) -> float:
+        self.phases[phase] = round(time.perf_counter() - self.started, 4)
+        return self.phases[phase]
+
+    def stats(self) -> Dict[str, float]:
+        return {f"{phase}_seconds": seconds for phase, seconds in self.phases.items()}
+
+startup_timer = StartupTimer()
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--module", default="src.routes")
+    parser.add_argument("--top", type=int, default=25)
+    args = parser.parse_args()
+
+    timings = profile_imports(args.module)
+    target = next((timing for timing in timings if timing.module == args.module), None)
+    if target is not None:
+        print(f"import {args.module}: {target.cumulative_us / 1000:.1f} ms")
+    print("\nSlowest modules by cumulative import time:")
+    for timing in sorted(timings, key=lambda timing: timing.cumulative_us, reverse=True)[:args.top]:
+        print(f"  {timing.cumulative_us / 1000:8.1f} ms  (self {timing.self_us / 1000:6.1f} ms)  {timing.module}")
+    print("\nSelf time by top-level package:")
+    for package, self_us in list(by_package(timings).items())[:args.top]:
+        print(f"  {self_us / 1000:8.1f} ms  {package}")
+
+if __name__ == "__main__":
+    main()
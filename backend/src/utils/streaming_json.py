@@ -0,0 +1,188 @@
+import json
+import time
+from typing import Any, Dict, List, Optional, Sequence, Tuple, Type, get_args
+from pydantic import BaseModel, TypeAdapter, ValidationError
+
+# Prose or a code fence before the opening brace is tolerated up to this many characters
+MAX_PREAMBLE_CHARS = 500
+
+class SchemaDriftError(ValueError):
+    """Raised as soon as a streamed completion can no longer match the expected schema."""
+
+class _Frame:
+    """Parse position inside one JSON object whose members are being tracked."""
+
+    def __init__(self, field: Optional[str] = None):
+        # None for the top-level object, else the top-level field whose entries are streamed
+        self.field = field
+        self.expect = "key"
+        self.key_start: Optional[int] = None
+        self.key: Optional[str] = None
+        self.value_start: Optional[int] = None
+
+    def reset(self) -> None:
+        self.expect = "key"
+        self.key_start = None
+        self.key = None
+        self.value_start = None
+
+_ADAPTERS: Dict[Any, TypeAdapter] = {}
+
+def _adapter(annotation: Any) -> TypeAdapter:
+    if annotation not in _ADAPTERS:
+        _ADAPTERS[annotation] = TypeAdapter(annotation)
+    return _ADAPTERS[annotation]
+
+class StreamingObjectParser:
+    """
+    Incremental parser for one JSON object streamed in arbitrary chunks.
+
+    Each top-level field is decoded and validated against the pydantic schema
+    as soon as its value closes. Fields named in ``stream_items`` must be
+    objects; their entries (e.g. each file of ``implementation``) are
+    validated and reported one by one. A value that fails validation raises
+    ``SchemaDriftError`` so the caller can stop the generation early.
+    """
+
+    def __init__(self, schema: Type[BaseModel], stream_items: Sequence[str] = ()):
+        self.schema = schema
+        self.stream_items = set(stream_items)
+        self.fields: Dict[str, Any] = {}
+        self.done = False
+        # Total time spent inside feed(), for instrumentation
+        self.parse_seconds = 0.0
+        self._buffer = ""
+        self._pos = 0
+        self._started = False
+        self._preamble = 0
+        self._depth = 0
+        self._in_string = False
+        self._escape = False
+        self._frames: Dict[int, _Frame] = {}
+
+    def feed(self, chunk: str) -> List[Tuple]:
+        """
+        Consume the next chunk and return events for every value it completed.
+
+        Events are ``("field", name, value)`` and ``("item", field, key, value)``.
+        """
+        events: List[Tuple] = []
+        if self.done:
+            return events
+        started = time.perf_counter()
+        try:
+            self._consume(chunk, events)
+        finally:
+            self.parse_seconds += time.perf_counter() - started
+        return events
+
+    def _consume(self, chunk: str, events: List[Tuple]) -> None:
+        self._buffer += chunk
+        buffer = self._buffer
+
+        while self._pos < len(buffer) and not self.done:
+            index = self._pos
+            char = buffer[index]
+            self._pos += 1
+
+            if self._in_string:
+                if self._escape:
+                    self._escape = False
+                elif char == "\\":
+                    self._escape = True
+                elif char == '"':
+                    self._in_string = False
+                    self._string_closed(index)
+                continue
+
+            if not self._started:
+                if char == "{":
+                    self._started = True
+                    self._depth = 1
+                    self._frames[1] = _Frame()
+                elif not char.isspace():
+                    self._preamble += 1
+                    if self._preamble > MAX_PREAMBLE_CHARS:
+                        raise SchemaDriftError("Completion does not start with a JSON object")
+                continue
+
+            frame = self._frames.get(self._depth)
+
+            if char == '"':
+                self._in_string = True
+                if frame is not None:
+                    if frame.expect == "key":
+                        frame.key_start = index
+                    elif frame.expect == "value" and frame.value_start is None:
+                        frame.value_start = index
+            elif char in "{[":
+                if frame is not None and frame.expect == "value" and frame.value_start is None:
+                    frame.value_start = index
+                    if frame.field is None and char == "{" and frame.key in self.stream_items:
+                        self._frames[self._depth + 1] = _Frame(field=frame.key)
+                self._depth += 1
+            elif char in "}]":
+                if frame is not None and char == "}":
+                    if frame.expect == "value" and frame.value_start is not None:
+                        events.append(self._complete(frame, index))
+                    del self._frames[self._depth]
+                self._depth -= 1
+                if self._depth == 0:
+                    self.done = True
+            elif frame is None:
+                continue
+            elif char == ":":
+                if frame.expect == "colon":
+                    frame.expect = "value"
+            elif char == ",":
+                if frame.expect == "value" and frame.value_start is not None:
+                    events.append(self._complete(frame, index))
+            elif not char.isspace() and frame.expect == "value" and frame.value_start is None:
+                frame.value_start = index
+
+    def _string_closed(self, index: int) -> None:
+        frame = self._frames.get(self._depth)
+        if frame is not None and frame.expect == "key" and frame.key_start is not None:
+            frame.key = json.loads(self._buffer[frame.key_start:index + 1])
+            frame.expect = "colon"
+
+    def _complete(self, frame: _Frame, end: int) -> Tuple:
+        text = self._buffer[frame.value_start:end].strip()
+        key = frame.key
+        frame.reset()
+        try:
+            value = json.loads(text)
+        except json.JSONDecodeError as e:
+            raise SchemaDriftError(f"Invalid JSON value for '{key}': {str(e)}")
+
+        if frame.field is None:
+            return ("field", key, self._validate_field(key, value))
+        return ("item", frame.field, key, self._validate_item(frame.field, key, value))
+
+    def _validate_field(self, name: str, value: Any) -> Any:
+        field_info = self.schema.model_fields.get(name)
+        if field_info is None:
+            # Extra keys are ignored by the schema, so they are not drift on their own
+            return value
+        try:
+            value = _adapter(field_info.annotation).validate_python(value)
+        except ValidationError as e:
+            raise SchemaDriftError(f"Field '{name}' does not match {self.schema.__name__}: {str(e)}")
+        self.fields[name] = value
+        return value
+
+    def _validate_item(self, field: str, key: str, value: Any) -> Any:
+        field_info = self.schema.model_fields.get(field)
+        item_args = get_args(field_info.annotation) if field_info is not None else ()
+        if len(item_args) != 2:
+            return value
+        try:
+            return _adapter(item_args[1]).validate_python(value)
+        except ValidationError as e:
+            raise SchemaDriftError(f"Entry '{key}' of '{field}' does not match {self.schema.__name__}: {str(e)}")
+
+    def result(self) -> BaseModel:
+        """Validate the fully parsed object; raises if the stream ended early."""
+        if not self.done:
+            raise ValueError("Completion ended before the JSON object was closed")
+        return self.schema(**self.fields)
@@ -0,0 +1,89 @@
+import asyncio
+import pytest
+from fastapi import APIRouter, FastAPI
+from unittest.mock import patch
+from ..src.graphs.flows.artifact_store import ArtifactStore
+from ..src.graphs.flows.plan_index import PlanIndex
+from ..src.routes.api_v1 import IntegrationResponse
+from ..src.utils.fake_llm import FakeChatModel
+from ..src.utils.llm_cache import LLMResponseCache
+from ..src.utils.llm_client import llm_client
+from ..src.utils.llm_scheduler import LLMScheduler
+
+@pytest.fixture(autouse=True)
+def fake_chat_model():
+    """Answer every LLM call from the offline fake model so no test reaches the real provider."""
+    model = FakeChatModel()
+    llm_client.use_fake_model(model)
+    yield model
+    llm_client.use_fake_model(None)
+
+@pytest.fixture(autouse=True)
+def empty_llm_cache():
+    """Start every test with no cached completions, so answers never replay across tests."""
+    cache = LLMResponseCache()
+    with patch("src.graphs.nodes.base_node.llm_cache", cache):
+        yield cache
+
+@pytest.fixture(autouse=True)
+def unthrottled_scheduler():
+    """Give every test its own scheduler so provider rate limits never leak between tests."""
+    scheduler = LLMScheduler(
+        requests_per_minute=10 ** 6,
+        tokens_per_minute=10 ** 9,
+        max_concurrency=64,
+        max_queue_depth=1000,
+        max_wait_seconds=60.0
+    )
+    with patch("src.graphs.nodes.base_node.llm_scheduler", scheduler):
+        yield scheduler
+
+@pytest.fixture(autouse=True)
+def empty_plan_index():
+    """Start every test with no completed runs to reuse plans from."""
+    index = PlanIndex()
+    with patch("src.graphs.flows.api_integration_flow.plan_index", index):
+        yield index
+
+@pytest.fixture(autouse=True)
+def isolated_artifact_store(tmp_path):
+    """Store every test's generated files in its own directory."""
+    store = ArtifactStore(root=str(tmp_path / "artifacts"))
+    with patch("src.graphs.flows.api_integration_flow.artifact_store", store):
+        yield store
+
+@pytest.fixture
+def make_app():
+    """Build an app serving only the given routers."""
+    def build(*routers: APIRouter) -> FastAPI:
+        app = FastAPI()
+        for router in routers:
+            app.include_router(router)
+        return app
+    return build
+
+@pytest.fixture
+def make_response():
+    """Build a successful flow result for ``user_input``, with enough generated code to be compressed."""
+    def build(user_input: str) -> IntegrationResponse:
+        return IntegrationResponse(
+            plan={"input": user_input},
+            supervisor_output={},
+            code_output={"implementation": "print('hello')\n" * 2000, "files": {"app.py": "print('hello')"}},
+            test_output={},
+            evaluation={"score": 0.9},
+            supervisor_feedback=None,
+            iteration_count=1,
+            final_status="success"
+        )
+    return build
+
+@pytest.fixture
+def fake_run_plan(make_response):
+    """Stand-in for ``api_v1._run_plan``; the input "broken" fails and "slow" takes a little longer."""
+    async def run_plan(request, cache_bypass, priority=0):
+        if request.user_input == "broken":
+            raise RuntimeError("flow failed")
+        await asyncio.sleep(0.05 if request.user_input == "slow" else 0)
+        return make_response(request.user_input)
+    return run_plan
@@ -12,7 +12,7 @@ def test_health_check():
 @pytest.mark.asyncio
 async def test_integration_plan_endpoint():
     response = client.post(
-        "/api/integration/plan",
+        "/api/v1/integration/plan",
         json={"user_input": "Connect Weather API with SMS API"}
     )
     
@@ -0,0 +1,123 @@
+import hashlib
+import os
+import pytest
+from fastapi import FastAPI
+from gridfs.errors import FileExists
+from httpx import ASGITransport, AsyncClient
+from unittest.mock import AsyncMock, MagicMock, patch
+from ..src.graphs.flows.artifact_store import ArtifactStore
+from ..src.routes import artifacts
+
+def stored_blobs(root) -> list[str]:
+    return sorted(name for _, _, names in os.walk(root) for name in names)
+
+@pytest.mark.asyncio
+async def test_identical_files_are_stored_once(tmp_path):
+    store = ArtifactStore(root=str(tmp_path))
+    source = "def send(message):\n    return message\n"
+
+    first = await store.put(source)
+    second = await store.put(source)
+
+    digest = hashlib.sha256(source.encode()).hexdigest()
+    assert first == second == {"sha256": digest, "size": len(source)}
+    assert stored_blobs(tmp_path) == [digest]
+    assert store.stats()["stored"] == 1
+    assert store.stats()["deduplicated"] == 1
+
+@pytest.mark.asyncio
+async def test_content_stored_by_another_run_is_not_written_again(tmp_path):
+    await ArtifactStore(root=str(tmp_path)).put("print('hi')\n")
+
+    # A fresh store (another worker, or after a restart) finds the blob already there
+    store = ArtifactStore(root=str(tmp_path))
+    await store.put("print('hi')\n")
+
+    assert store.stats()["stored"] == 0
+    assert store.stats()["deduplicated"] == 1
+
+@pytest.mark.asyncio
+async def test_files_round_trip_through_references(tmp_path):
+    store = ArtifactStore(root=str(tmp_path))
+    files = {"client.py": "import httpx\n", "utils.py": "TIMEOUT = 5\n"}
+
+    refs = await store.store_files(files)
+    assert all(set(ref) == {"sha256", "size"} for ref in refs.values())
+    # Already stored references pass through untouched
+    assert await store.store_files(refs) == refs
+
+    reader = ArtifactStore(root=str(tmp_path))
+    assert await reader.load_files(refs) == files
+    assert reader.stats()["cache_misses"] == 2
+    assert await reader.load_files({"inline.py": "x = 1\n"}) == {"inline.py": "x = 1\n"}
+
+    with pytest.raises(LookupError, match="missing.py"):
+        await reader.load_files({"missing.py": {"sha256": "0" * 64, "size": 1}})
+
+@pytest.mark.asyncio
+async def test_cache_is_bounded_by_bytes(tmp_path):
+    store = ArtifactStore(root=str(tmp_path), cache_max_bytes=10)
+
+    first = await store.put("aaaaaa")
+    await store.put("bbbbbb")
+
+    assert store.stats()["cached_bytes"] == 6
+    assert await store.get(first["sha256"]) == "aaaaaa"
+    assert store.stats()["cache_misses"] == 1
+
+@pytest.mark.asyncio
+async def test_failed_gridfs_write_falls_back_to_disk(tmp_path):
+    store = ArtifactStore(root=str(tmp_path))
+
+    with patch("src.graphs.flows.artifact_store.Database.client", MagicMock()), \
+         patch.object(store.gridfs, "exists", AsyncMock(return_value=False)), \
+         patch.object(store.gridfs, "put", AsyncMock(side_effect=ConnectionError("down"))), \
+         patch.object(store.gridfs, "get", AsyncMock(side_effect=ConnectionError("down"))):
+        ref = await store.put("x = 1\n")
+        reader = ArtifactStore(root=str(tmp_path))
+        content = await reader.get(ref["sha256"])
+
+    assert store.stats()["gridfs_fallbacks"] == 1
+    assert stored_blobs(tmp_path) == [ref["sha256"]]
+    assert content == "x = 1\n"
+
+@pytest.mark.asyncio
+async def test_content_another_worker_stored_in_gridfs_counts_as_deduplicated(tmp_path):
+    store = ArtifactStore(root=str(tmp_path))
+    bucket = MagicMock()
+    bucket.upload_from_stream_with_id = AsyncMock(side_effect=FileExists("exists"))
+
+    with patch("src.graphs.flows.artifact_store.Database.client", MagicMock()), \
+         patch.object(store.gridfs, "exists", AsyncMock(return_value=False)), \
+         patch.object(store.gridfs, "_bucket", return_value=bucket):
+        await store.put("x = 1\n")
+
+    assert store.stats()["stored"] == 0
+    assert store.stats()["deduplicated"] == 1
+    assert store.stats()["gridfs_fallbacks"] == 0
+    assert stored_blobs(tmp_path) == []
+
+@pytest.mark.asyncio
+async def test_artifact_endpoint_serves_cacheable_content(tmp_path):
+    store = ArtifactStore(root=str(tmp_path))
+    ref = await store.put("print('hi')\n")
+    app = FastAPI()
+    app.include_router(artifacts.router)
+
+    with patch.object(artifacts, "artifact_store", store):
+        async with AsyncClient(transport=ASGITransport(app=app), base_url="http://test") as client:
+            response = await client.get(f"/api/v1/artifacts/{ref['sha256']}")
+            not_modified = await client.get(
+                f"/api/v1/artifacts/{ref['sha256']}",
+                headers={"If-None-Match": response.headers["etag"]}
+            )
+            missing = await client.get(f"/api/v1/artifacts/{'0' * 64}")
+            invalid = await client.get("/api/v1/artifacts/not-a-digest")
+
+    assert response.status_code == 200
+    assert response.text == "print('hi')\n"
+    assert response.headers["etag"] == f'"{ref["sha256"]}"'
+    assert "immutable" in response.headers["cache-control"]
+    assert not_modified.status_code == 304
+    assert missing.status_code == 404
+    assert invalid.status_code == 422
@@ -0,0 +1,57 @@
+import asyncio
+import json
+import pytest
+from httpx import ASGITransport, AsyncClient
+from unittest.mock import patch
+from ..src.routes import api_v1
+from ..src.utils.llm_scheduler import LLMScheduler
+
+@pytest.mark.asyncio
+async def test_batch_streams_results_in_completion_order(make_app, fake_run_plan):
+    app = make_app(api_v1.router)
+    items = [{"user_input": "slow"}, {"user_input": "broken"}, {"user_input": "fast"}]
+
+    with patch.object(api_v1, "_run_plan", side_effect=fake_run_plan):
+        async with AsyncClient(transport=ASGITransport(app=app), base_url="http://test") as client:
+            response = await client.post("/api/v1/integration/batch", json=items)
+
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("application/x-ndjson")
+    lines = [json.loads(line) for line in response.text.splitlines()]
+    assert [line["index"] for line in lines][-1] == 0
+    by_index = {line["index"]: line for line in lines}
+    assert by_index[1] == {"index": 1, "status": "error", "error": "flow failed"}
+    assert by_index[2]["result"]["plan"] == {"input": "fast"}
+    assert by_index[0]["status"] == "ok"
+
+@pytest.mark.asyncio
+async def test_empty_batch_is_rejected(make_app):
+    app = make_app(api_v1.router)
+
+    async with AsyncClient(transport=ASGITransport(app=app), base_url="http://test") as client:
+        response = await client.post("/api/v1/integration/batch", json=[])
+
+    assert response.status_code == 422
+
+@pytest.mark.asyncio
+async def test_identical_concurrent_requests_are_admitted_once(make_app, fake_run_plan):
+    scheduler = LLMScheduler(
+        requests_per_minute=60,
+        tokens_per_minute=10 ** 6,
+        max_concurrency=4,
+        max_queue_depth=100,
+        max_wait_seconds=30.0
+    )
+
+    with patch.object(api_v1, "llm_scheduler", scheduler), \
+         patch.object(scheduler, "start_run", wraps=scheduler.start_run) as start_run, \
+         patch.object(api_v1, "_run_plan", side_effect=fake_run_plan):
+        async with AsyncClient(transport=ASGITransport(app=make_app(api_v1.router)), base_url="http://test") as client:
+            responses = await asyncio.gather(*(
+                client.post("/api/v1/integration/plan", json={"user_input": "slow"}) for _ in range(5)
+            ))
+
+    assert [response.status_code for response in responses] == [200] * 5
+    assert start_run.call_count == 1
+    assert scheduler.stats()["active_runs_interactive"] == 0
+
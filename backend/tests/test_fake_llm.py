@@ -0,0 +1,90 @@
+import pytest
+from unittest.mock import patch
+from ..src.config.settings import settings
+from ..src.graphs.flows.api_integration_flow import create_planning_flow, create_initial_state
+from ..src.graphs.nodes.planner_node import PlannerNode, PlannerOutput
+from ..src.graphs.nodes.supervisor_node import SupervisorNode, SupervisorOutput, SupervisorFeedback
+from ..src.graphs.nodes.coder_node import CoderNode, CodeOutput
+from ..src.graphs.nodes.tester_node import TesterNode, TestOutput
+from ..src.graphs.nodes.evaluator_node import EvaluatorNode, EvaluationOutput
+from ..src.utils.fake_llm import FakeChatModel, FakeLLMError
+from ..src.utils.llm_client import llm_client
+from ..src.utils.streaming_json import SchemaDriftError
+
+@pytest.fixture
+def use_fake():
+    def install(**options) -> FakeChatModel:
+        model = FakeChatModel(**options)
+        llm_client.use_fake_model(model)
+        return model
+
+    with patch.object(settings, "LLM_CACHE_ENABLED", False), \
+         patch.object(settings, "CHECKPOINTS_ENABLED", False):
+        yield install
+    llm_client.use_fake_model(None)
+
+@pytest.mark.asyncio
+async def test_every_node_gets_schema_valid_output(use_fake):
+    use_fake(seed=7)
+
+    plan = await PlannerNode().process("Connect Weather API with SMS API")
+    supervisor = SupervisorNode()
+    tasks = await supervisor.process(plan.dict())
+    code = await CoderNode().process(tasks.coding_task)
+    tests = await TesterNode().process(tasks.testing_task)
+    evaluation = await EvaluatorNode().process(code.dict(), tests.dict(), plan.dict())
+    feedback = await supervisor.review_evaluation(evaluation.dict(), plan.dict())
+
+    assert isinstance(plan, PlannerOutput)
+    assert isinstance(tasks, SupervisorOutput)
+    assert isinstance(code, CodeOutput) and code.implementation
+    assert isinstance(tests, TestOutput) and tests.test_implementation
+    assert isinstance(evaluation, EvaluationOutput) and evaluation.is_acceptable
+    assert isinstance(feedback, SupervisorFeedback)
+
+@pytest.mark.asyncio
+async def test_answers_are_deterministic_for_a_seed():
+    prompt = "You are an expert programmer implementing an API integration."
+
+    first = await FakeChatModel(seed=3).ainvoke(prompt)
+    second = await FakeChatModel(seed=3).ainvoke(prompt)
+    other_seed = await FakeChatModel(seed=4).ainvoke(prompt)
+
+    assert first.content == second.content
+    assert first.content != other_seed.content
+
+@pytest.mark.asyncio
+async def test_injected_failures_surface_from_the_node(use_fake):
+    model = use_fake(failure_rate=1.0)
+
+    with pytest.raises(FakeLLMError):
+        await PlannerNode().process("Connect Weather API with SMS API")
+    assert model.calls == 1
+
+def test_fault_injection_is_configured_from_settings():
+    with patch.object(settings, "FAKE_LLM_FAILURE_RATE", 0.25), \
+         patch.object(settings, "FAKE_LLM_TRUNCATION_RATE", 0.5):
+        model = FakeChatModel.from_settings()
+
+    assert model.failure_rate == 0.25
+    assert model.truncation_rate == 0.5
+
+@pytest.mark.asyncio
+async def test_truncated_completion_is_rejected_and_not_cached(empty_llm_cache):
+    llm_client.use_fake_model(FakeChatModel(truncation_rate=1.0))
+
+    with patch.object(settings, "LLM_CACHE_ENABLED", True):
+        with pytest.raises(SchemaDriftError):
+            await CoderNode().process({"task": "Implement API client"})
+    assert empty_llm_cache.stats()["memory_entries"] == 0
+
+@pytest.mark.asyncio
+async def test_full_flow_runs_offline_including_revisions(use_fake):
+    use_fake(acceptance_rate=0.0)
+
+    flow = await create_planning_flow()
+    final_state = await flow.ainvoke(create_initial_state("Connect Weather API with SMS API"))
+
+    assert final_state["final_status"] == "max_iterations_reached"
+    assert final_state["iteration_count"] == settings.MAX_ITERATIONS + 1
+    assert final_state["code_output"]["implementation"]
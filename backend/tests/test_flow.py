@@ -1,6 +1,8 @@
+import asyncio
 import pytest
-from ..src.graphs.flows.api_integration_flow import create_planning_flow, GraphState
+from ..src.graphs.flows.api_integration_flow import create_planning_flow, create_initial_state, GraphState
 from unittest.mock import patch, AsyncMock
+from ..src.config.settings import settings
 
 @pytest.fixture
 def mock_responses():
@@ -50,4 +52,326 @@ async def test_flow_execution(mock_responses):
         assert "plan" in final_state
         assert "supervisor_output" in final_state
         assert "evaluation" in final_state
-        assert final_state["iteration_count"] >= 0 
\ No newline at end of file
+        assert final_state["iteration_count"] >= 0 
+@pytest.mark.asyncio
+async def test_flow_registry_compiles_once():
+    from ..src.graphs.flows import flow_registry
+
+    from ..src.graphs.flows import api_integration_flow
+
+    flow_registry.reset_flow_registry()
+    with patch.object(api_integration_flow, "create_nodes", return_value={}), \
+         patch.object(api_integration_flow, "create_planning_flow", AsyncMock(return_value=object())) as build:
+        first = await flow_registry.get_flow()
+        second = await flow_registry.get_flow()
+
+    assert first is second
+    assert build.await_count == 1
+    assert flow_registry.FlowRegistry.startup_seconds is not None
+    flow_registry.reset_flow_registry()
+
+@pytest.mark.asyncio
+async def test_coder_and_tester_run_in_parallel_before_single_evaluation(mock_responses):
+    import asyncio
+    import time
+
+    async def slow_coder(task):
+        await asyncio.sleep(0.2)
+        return {"implementation": {"main.py": "print('hi')"}, "dependencies": [], "setup_instructions": []}
+
+    async def slow_tester(task):
+        await asyncio.sleep(0.2)
+        return {"test_cases": {}, "test_implementation": {}, "coverage_requirements": []}
+
+    with patch('src.graphs.nodes.planner_node.PlannerNode.process', mock_responses["planner"]), \
+         patch('src.graphs.nodes.supervisor_node.SupervisorNode.process', mock_responses["supervisor"]), \
+         patch('src.graphs.nodes.coder_node.CoderNode.process', AsyncMock(side_effect=slow_coder)), \
+         patch('src.graphs.nodes.tester_node.TesterNode.process', AsyncMock(side_effect=slow_tester)), \
+         patch('src.graphs.nodes.evaluator_node.EvaluatorNode.process', mock_responses["evaluator"]):
+
+        flow = await create_planning_flow()
+        started = time.perf_counter()
+        final_state = await flow.ainvoke(create_initial_state("Connect Weather API with SMS API"))
+        elapsed = time.perf_counter() - started
+
+    assert mock_responses["evaluator"].await_count == 1
+    assert elapsed < 0.35
+    assert set(final_state["branch_timings"]) == {"coder", "tester"}
+    assert final_state["final_status"] == "success"
+
+@pytest.mark.asyncio
+async def test_revision_reruns_only_affected_branch(mock_responses, isolated_artifact_store):
+    evaluator = AsyncMock(side_effect=[
+        {"is_acceptable": False, "issues_found": [{"component": "implementation"}]},
+        {"is_acceptable": True}
+    ])
+    coder = AsyncMock(return_value={"implementation": {"client.py": "v1", "utils.py": "v1"}})
+    revise = AsyncMock(return_value={"implementation": {"client.py": "v1", "utils.py": "v2"}})
+    tester = AsyncMock(return_value={"test_cases": {}, "test_implementation": {"test_client.py": "t1"}})
+    review = AsyncMock(return_value={
+        "requires_changes": True,
+        "feedback": {"utils.py": "handle timeouts"},
+        "next_steps": ["fix utils"],
+        "affected_components": ["coder"]
+    })
+
+    with patch('src.graphs.nodes.planner_node.PlannerNode.process', mock_responses["planner"]), \
+         patch('src.graphs.nodes.supervisor_node.SupervisorNode.process', mock_responses["supervisor"]), \
+         patch('src.graphs.nodes.supervisor_node.SupervisorNode.review_evaluation', review), \
+         patch('src.graphs.nodes.coder_node.CoderNode.process', coder), \
+         patch('src.graphs.nodes.coder_node.CoderNode.revise', revise), \
+         patch('src.graphs.nodes.tester_node.TesterNode.process', tester), \
+         patch('src.graphs.nodes.evaluator_node.EvaluatorNode.process', evaluator):
+
+        flow = await create_planning_flow()
+        final_state = await flow.ainvoke(create_initial_state("Connect Weather API with SMS API"))
+
+    assert coder.await_count == 1
+    assert revise.await_count == 1
+    assert tester.await_count == 1
+    assert evaluator.await_count == 2
+    # The coder revises the sources, while the state only carries references to them
+    assert revise.await_args.args[1]["implementation"] == {"client.py": "v1", "utils.py": "v1"}
+    implementation = final_state["code_output"]["implementation"]
+    assert implementation["client.py"] == {"sha256": implementation["client.py"]["sha256"], "size": 2}
+    assert await isolated_artifact_store.load_files(implementation) == {"client.py": "v1", "utils.py": "v2"}
+    tests = await isolated_artifact_store.load_files(final_state["test_output"]["test_implementation"])
+    assert tests == {"test_client.py": "t1"}
+
+def test_resume_point_restarts_after_last_good_checkpoint():
+    from ..src.graphs.flows.api_integration_flow import resume_point
+
+    checkpoints = [
+        {"step": 0, "node": "__input__", "update": {"user_input": "Connect Weather API with SMS API"}},
+        {"step": 1, "node": "planner", "update": {"plan": {"apis": {}}}},
+        {"step": 2, "node": "supervisor", "update": {
+            "supervisor_output": {"coding_task": {}, "testing_task": {}},
+            "revision_targets": ["coder", "tester"]
+        }},
+        {"step": 3, "node": "tester", "update": {
+            "test_output": {"test_implementation": {}},
+            "branch_timings": {"tester": 1.5}
+        }},
+    ]
+
+    state, next_step = resume_point(checkpoints)
+
+    assert next_step == 4
+    assert state["resume_from"] == "branches"
+    assert state["revision_targets"] == ["coder"]
+    assert state["plan"] == {"apis": {}}
+    assert state["branch_timings"] == {"tester": 1.5}
+
+    checkpoints.append({"step": 4, "node": "coder", "update": {"code_output": {"implementation": {}}}})
+    state, _ = resume_point(checkpoints)
+    assert state["resume_from"] == "evaluator"
+
+@pytest.mark.asyncio
+async def test_node_metrics_attribute_llm_calls_to_their_node(mock_responses):
+    from ..src.utils.metrics import record_llm_call, NODE_DURATION
+
+    def llm_call(prompt_tokens: int, cache_hit: bool = False) -> dict:
+        return {
+            "node": "stub", "model": "mixtral-8x7b-32768", "prompt_tokens": prompt_tokens,
+            "completion_tokens": 100, "cache_hit": cache_hit, "queue_seconds": 0.01,
+            "llm_seconds": 0.1, "parse_seconds": 0.001
+        }
+
+    async def coder(task):
+        record_llm_call(llm_call(1000))
+        await asyncio.sleep(0.01)
+        return {"implementation": {}, "dependencies": [], "setup_instructions": []}
+
+    async def tester(task):
+        await asyncio.sleep(0.01)
+        record_llm_call(llm_call(500, cache_hit=True))
+        return {"test_cases": {}, "test_implementation": {}, "coverage_requirements": []}
+
+    with patch('src.graphs.nodes.planner_node.PlannerNode.process', mock_responses["planner"]), \
+         patch('src.graphs.nodes.supervisor_node.SupervisorNode.process', mock_responses["supervisor"]), \
+         patch('src.graphs.nodes.coder_node.CoderNode.process', AsyncMock(side_effect=coder)), \
+         patch('src.graphs.nodes.tester_node.TesterNode.process', AsyncMock(side_effect=tester)), \
+         patch('src.graphs.nodes.evaluator_node.EvaluatorNode.process', mock_responses["evaluator"]):
+
+        flow = await create_planning_flow()
+        final_state = await flow.ainvoke(create_initial_state("Connect Weather API with SMS API"))
+
+    by_node = {record["node"]: record for record in final_state["node_metrics"]}
+    assert set(by_node) == {"planner", "supervisor", "coder", "tester", "evaluator", "check_completion"}
+    assert by_node["coder"]["prompt_tokens"] == 1000
+    assert by_node["coder"]["cost_usd"] > 0
+    assert by_node["tester"]["cache_hits"] == 1
+    assert by_node["tester"]["cost_usd"] == 0
+    assert all(record["iteration"] == 1 for record in final_state["node_metrics"])
+    assert NODE_DURATION.quantile(0.95, node="coder") is not None
+
+@pytest.mark.asyncio
+async def test_uncompilable_code_skips_llm_evaluation(mock_responses):
+    coder = AsyncMock(return_value={"implementation": {"client.py": "def send(:\n"}, "dependencies": [], "setup_instructions": []})
+    tester = AsyncMock(return_value={"test_cases": {}, "test_implementation": {}, "coverage_requirements": []})
+
+    with patch('src.graphs.nodes.planner_node.PlannerNode.process', mock_responses["planner"]), \
+         patch('src.graphs.nodes.supervisor_node.SupervisorNode.process', mock_responses["supervisor"]), \
+         patch('src.graphs.nodes.supervisor_node.SupervisorNode.review_evaluation', AsyncMock(return_value={
+             "requires_changes": True, "feedback": {}, "next_steps": [], "affected_components": ["coder"]
+         })), \
+         patch('src.graphs.nodes.coder_node.CoderNode.process', coder), \
+         patch('src.graphs.nodes.coder_node.CoderNode.revise', coder), \
+         patch('src.graphs.nodes.tester_node.TesterNode.process', tester), \
+         patch('src.graphs.nodes.evaluator_node.EvaluatorNode.process', mock_responses["evaluator"]), \
+         patch.object(settings, "SANDBOX_ENABLED", True):
+
+        flow = await create_planning_flow()
+        final_state = await flow.ainvoke(create_initial_state("Connect Weather API with SMS API"))
+
+    assert mock_responses["evaluator"].await_count == 0
+    assert final_state["execution"]["compiled"] is False
+    assert final_state["evaluation"]["is_acceptable"] is False
+    assert final_state["evaluation"]["issues_found"][0]["component"] == "implementation"
+    assert final_state["final_status"] == "max_iterations_reached"
+
+@pytest.mark.asyncio
+async def test_similar_input_reuses_plan_of_successful_run(mock_responses):
+    coder = AsyncMock(return_value={"implementation": {}, "dependencies": [], "setup_instructions": []})
+    tester = AsyncMock(return_value={"test_cases": {}, "test_implementation": {}, "coverage_requirements": []})
+
+    with patch('src.graphs.nodes.planner_node.PlannerNode.process', mock_responses["planner"]), \
+         patch('src.graphs.nodes.supervisor_node.SupervisorNode.process', mock_responses["supervisor"]), \
+         patch('src.graphs.nodes.coder_node.CoderNode.process', coder), \
+         patch('src.graphs.nodes.tester_node.TesterNode.process', tester), \
+         patch('src.graphs.nodes.evaluator_node.EvaluatorNode.process', mock_responses["evaluator"]):
+
+        flow = await create_planning_flow()
+        first = await flow.ainvoke(create_initial_state("Connect Weather API with SMS API"))
+        second = await flow.ainvoke(create_initial_state("connect the weather API to the SMS API"))
+
+    assert first["final_status"] == "success" and first["reused_from"] == {}
+    assert mock_responses["planner"].await_count == 1
+    assert mock_responses["supervisor"].await_count == 1
+    assert second["plan"] == first["plan"]
+    assert second["supervisor_output"] == first["supervisor_output"]
+    assert second["reused_from"]["similarity"] >= 0.8
+
+@pytest.mark.asyncio
+async def test_streamed_run_records_state_merged_by_reducers(mock_responses):
+    from fastapi import FastAPI
+    from httpx import ASGITransport, AsyncClient
+    from unittest.mock import MagicMock
+    from ..src.routes import api_v1
+
+    coder = AsyncMock(return_value={"implementation": {}, "dependencies": [], "setup_instructions": []})
+    tester = AsyncMock(return_value={"test_cases": {}, "test_implementation": {}, "coverage_requirements": []})
+    finish_run = MagicMock()
+    app = FastAPI()
+    app.include_router(api_v1.router)
+
+    with patch('src.graphs.nodes.planner_node.PlannerNode.process', mock_responses["planner"]), \
+         patch('src.graphs.nodes.supervisor_node.SupervisorNode.process', mock_responses["supervisor"]), \
+         patch('src.graphs.nodes.coder_node.CoderNode.process', coder), \
+         patch('src.graphs.nodes.tester_node.TesterNode.process', tester), \
+         patch('src.graphs.nodes.evaluator_node.EvaluatorNode.process', mock_responses["evaluator"]):
+        flow = await create_planning_flow()
+        with patch.object(api_v1, "get_flow", AsyncMock(return_value=flow)), \
+             patch.object(api_v1, "finish_run", finish_run):
+            async with AsyncClient(transport=ASGITransport(app=app), base_url="http://test") as client:
+                response = await client.post(
+                    "/api/v1/integration/plan/stream",
+                    json={"user_input": "Connect Weather API with SMS API"}
+                )
+
+    assert "event: done" in response.text
+    final_state = finish_run.call_args.args[0]
+    assert final_state["final_status"] == "success"
+    # Both parallel branches' timings and every node's metrics survive the merge
+    assert set(final_state["branch_timings"]) == {"coder", "tester"}
+    assert len(final_state["node_metrics"]) == 6
+
+@pytest.mark.asyncio
+async def test_skipped_branch_writes_no_checkpoint(mock_responses):
+    from ..src.utils.run_context import RunContext, set_run_context, reset_run_context
+
+    evaluator = AsyncMock(side_effect=[
+        {"is_acceptable": False, "issues_found": [{"component": "implementation"}]},
+        {"is_acceptable": True}
+    ])
+    code = {"implementation": {}, "dependencies": [], "setup_instructions": []}
+    review = AsyncMock(return_value={
+        "requires_changes": True, "feedback": {}, "next_steps": [], "affected_components": ["coder"]
+    })
+    save = AsyncMock()
+    context_token = set_run_context(RunContext(run_id="run-1"))
+    try:
+        with patch('src.graphs.nodes.planner_node.PlannerNode.process', mock_responses["planner"]), \
+             patch('src.graphs.nodes.supervisor_node.SupervisorNode.process', mock_responses["supervisor"]), \
+             patch('src.graphs.nodes.supervisor_node.SupervisorNode.review_evaluation', review), \
+             patch('src.graphs.nodes.coder_node.CoderNode.process', AsyncMock(return_value=code)), \
+             patch('src.graphs.nodes.coder_node.CoderNode.revise', AsyncMock(return_value=code)), \
+             patch('src.graphs.nodes.tester_node.TesterNode.process', AsyncMock(return_value={"test_implementation": {}})), \
+             patch('src.graphs.nodes.evaluator_node.EvaluatorNode.process', evaluator), \
+             patch('src.graphs.flows.api_integration_flow.checkpointer.save', save):
+            flow = await create_planning_flow()
+            await flow.ainvoke(create_initial_state("Connect Weather API with SMS API"))
+    finally:
+        reset_run_context(context_token)
+
+    nodes = [call.args[1] for call in save.await_args_list]
+    assert nodes.count("tester") == 1
+    assert nodes.count("coder") == 2
+
+@pytest.mark.asyncio
+async def test_concurrent_resumes_of_one_run_share_a_single_resume():
+    from fastapi import FastAPI
+    from httpx import ASGITransport, AsyncClient
+    from ..src.routes import api_v1
+
+    async def resume(run_id):
+        await asyncio.sleep(0.05)
+        return {
+            "plan": {}, "supervisor_output": {}, "code_output": {}, "test_output": {}, "evaluation": {},
+            "iteration_count": 1, "final_status": "success"
+        }
+
+    resume_flow = AsyncMock(side_effect=resume)
+    app = FastAPI()
+    app.include_router(api_v1.router)
+    with patch.object(api_v1, "resume_integration_flow", resume_flow):
+        async with AsyncClient(transport=ASGITransport(app=app), base_url="http://test") as client:
+            first, second = await asyncio.gather(
+                client.post("/api/v1/integration/runs/run-1/resume"),
+                client.post("/api/v1/integration/runs/run-1/resume")
+            )
+
+    assert first.status_code == second.status_code == 200
+    assert resume_flow.await_count == 1
+
+@pytest.mark.asyncio
+async def test_failed_planner_skips_the_remaining_llm_calls(mock_responses):
+    coder = AsyncMock()
+    tester = AsyncMock()
+
+    with patch('src.graphs.nodes.planner_node.PlannerNode.process', AsyncMock(side_effect=RuntimeError("rate limited"))), \
+         patch('src.graphs.nodes.supervisor_node.SupervisorNode.process', mock_responses["supervisor"]), \
+         patch('src.graphs.nodes.coder_node.CoderNode.process', coder), \
+         patch('src.graphs.nodes.tester_node.TesterNode.process', tester), \
+         patch('src.graphs.nodes.evaluator_node.EvaluatorNode.process', mock_responses["evaluator"]):
+
+        flow = await create_planning_flow()
+        final_state = await flow.ainvoke(create_initial_state("Connect Weather API with SMS API"))
+
+    assert final_state["final_status"] == "failed"
+    assert final_state["error"] == "rate limited"
+    for node in (mock_responses["supervisor"], coder, tester, mock_responses["evaluator"]):
+        node.assert_not_awaited()
+
+@pytest.mark.asyncio
+async def test_supervisor_failure_fails_the_run(mock_responses):
+    with patch('src.graphs.nodes.planner_node.PlannerNode.process', mock_responses["planner"]), \
+         patch('src.graphs.nodes.supervisor_node.SupervisorNode.process', AsyncMock(side_effect=ValueError("bad tasks"))), \
+         patch('src.graphs.nodes.evaluator_node.EvaluatorNode.process', mock_responses["evaluator"]):
+
+        flow = await create_planning_flow()
+        final_state = await flow.ainvoke(create_initial_state("Connect Weather API with SMS API"))
+
+    assert final_state["final_status"] == "failed"
+    assert final_state["error"] == "bad tasks"
+    mock_responses["evaluator"].assert_not_awaited()
@@ -0,0 +1,79 @@
+import asyncio
+import pytest
+from httpx import ASGITransport, AsyncClient
+from unittest.mock import AsyncMock, patch
+from ..src.routes import health
+from ..src.utils.health_prober import HealthProber, HEALTHY, UNHEALTHY
+
+async def slow_probe():
+    await asyncio.sleep(1)
+
+async def failing_probe():
+    raise ConnectionError("refused")
+
+@pytest.mark.asyncio
+async def test_prober_records_status_latency_and_timeouts():
+    database = AsyncMock()
+    prober = HealthProber(
+        {"database": database, "llm_provider": slow_probe, "cache": failing_probe},
+        interval_seconds=0.01,
+        timeout_seconds=0.05
+    )
+    assert prober.is_stale()
+
+    prober.start()
+    try:
+        # Starting does not wait for the first round of probes
+        assert prober.last_run is None
+        await asyncio.sleep(0.1)
+        assert prober.results["database"].status == HEALTHY
+        assert prober.results["database"].latency_ms is not None
+        assert prober.results["llm_provider"].error.startswith("Timed out")
+        assert prober.results["cache"].error == "ConnectionError: refused"
+        assert prober.results["cache"].status == UNHEALTHY
+
+        await asyncio.sleep(0.2)
+        assert database.await_count > 1
+        assert not prober.is_stale()
+    finally:
+        await prober.stop()
+
+@pytest.mark.asyncio
+async def test_health_is_served_from_the_snapshot_without_probing(make_app):
+    database = AsyncMock()
+    prober = HealthProber({"database": database, "llm_provider": AsyncMock()}, 60, 1)
+    await prober.run_once()
+
+    with patch.object(health, "health_prober", prober):
+        async with AsyncClient(transport=ASGITransport(app=make_app(health.router)), base_url="http://test") as client:
+            responses = [await client.get("/health") for _ in range(20)]
+
+    assert database.await_count == 1
+    body = responses[-1].json()
+    assert body["status"] == "healthy"
+    assert body["details"] == {"api": "healthy", "database": "healthy", "llm_provider": "healthy"}
+    assert "latency_ms" in body["checks"]["database"]
+
+@pytest.mark.asyncio
+async def test_readiness_reports_pool_saturation_and_database_failure(make_app):
+    prober = HealthProber({"database": AsyncMock()}, 60, 1)
+    await prober.run_once()
+    saturated = {"in_use": 19, "queued": 0}
+
+    with patch.object(health, "health_prober", prober), \
+         patch.object(health.FlowRegistry, "flow", object()), \
+         patch("src.routes.health.settings.LLM_POOL_MAX_CONNECTIONS", 20):
+        async with AsyncClient(transport=ASGITransport(app=make_app(health.router)), base_url="http://test") as client:
+            with patch.object(health.llm_client, "metrics", return_value={"in_use": 2, "queued": 0}):
+                ready = await client.get("/ready")
+            with patch.object(health.llm_client, "metrics", return_value=saturated):
+                busy = await client.get("/ready")
+            prober.probes["database"] = failing_probe
+            await prober.run_once()
+            down = await client.get("/ready")
+
+    assert ready.status_code == 200 and ready.json()["ready"] is True
+    assert busy.status_code == 503
+    assert busy.json()["reasons"] == ["LLM connection pool saturated"]
+    assert busy.json()["pool"]["utilization"] == 0.95
+    assert down.json()["reasons"] == ["database unavailable"]
@@ -0,0 +1,100 @@
+import json
+import pytest
+from datetime import datetime
+from bson import ObjectId
+from fastapi import FastAPI
+from httpx import ASGITransport, AsyncClient
+from unittest.mock import AsyncMock, MagicMock, patch
+from pymongo.errors import BulkWriteError
+from ..src.routes import example
+
+class FakeCursor:
+    def __init__(self, documents):
+        self.documents = documents
+        self.closed = False
+
+    def __aiter__(self):
+        return self._iterate()
+
+    async def _iterate(self):
+        for document in self.documents:
+            yield document
+
+    async def close(self):
+        self.closed = True
+
+def make_documents(count: int):
+    return [
+        {"_id": ObjectId(), "name": f"item {index}", "description": "d",
+         "created_at": datetime(2025, 2, 1), "updated_at": datetime(2025, 2, 1)}
+        for index in range(count)
+    ]
+
+@pytest.fixture
+def items():
+    collection = MagicMock()
+    client = MagicMock()
+    client.__getitem__.return_value.items = collection
+    with patch.object(example.Database, "client", client):
+        yield collection
+
+@pytest.fixture
+def app():
+    app = FastAPI()
+    app.include_router(example.router)
+    return app
+
+@pytest.mark.asyncio
+async def test_create_returns_inserted_item_without_reading_it_back(items, app):
+    inserted_id = ObjectId()
+    items.insert_one = AsyncMock(return_value=MagicMock(inserted_id=inserted_id))
+    items.find_one = AsyncMock()
+
+    async with AsyncClient(transport=ASGITransport(app=app), base_url="http://test") as client:
+        response = await client.post("/items/", json={"name": "a", "description": "b"})
+
+    assert response.json()["_id"] == str(inserted_id)
+    assert "_id" not in items.insert_one.await_args.args[0]
+    items.find_one.assert_not_awaited()
+
+@pytest.mark.asyncio
+async def test_bulk_insert_is_unordered_and_reports_failed_items(items, app):
+    async def insert_many(documents, ordered):
+        for document in documents:
+            document["_id"] = ObjectId()
+        raise BulkWriteError({"writeErrors": [{"index": 1, "errmsg": "duplicate key"}]})
+    items.insert_many = AsyncMock(side_effect=insert_many)
+
+    body = [{"name": f"item {index}", "description": "d"} for index in range(3)]
+    async with AsyncClient(transport=ASGITransport(app=app), base_url="http://test") as client:
+        response = await client.post("/items/bulk", json=body)
+
+    assert items.insert_many.await_args.kwargs["ordered"] is False
+    result = response.json()
+    assert result["inserted_count"] == 2
+    assert result["errors"] == [{"index": 1, "error": "duplicate key"}]
+
+@pytest.mark.asyncio
+async def test_items_page_by_id_with_projection_and_stream_as_ndjson(items, app):
+    documents = make_documents(3)
+    items.find.return_value.sort.return_value.limit.return_value.to_list = AsyncMock(return_value=documents)
+    cursor = FakeCursor(documents)
+    items.find.return_value.sort.return_value.batch_size.return_value = cursor
+
+    after = str(ObjectId())
+    async with AsyncClient(transport=ASGITransport(app=app), base_url="http://test") as client:
+        page = await client.get("/items/", params={"limit": 2, "after": after})
+        query, projection = items.find.call_args.args
+        stream = await client.get("/items/stream")
+        invalid = await client.get("/items/", params={"after": "nope"})
+
+    assert query == {"_id": {"$gt": ObjectId(after)}}
+    assert projection == example.ITEM_PROJECTION
+    assert [item["name"] for item in page.json()["items"]] == ["item 0", "item 1"]
+    assert page.json()["next_cursor"] == str(documents[1]["_id"])
+
+    lines = [json.loads(line) for line in stream.text.splitlines()]
+    assert [line["_id"] for line in lines] == [str(document["_id"]) for document in documents]
+    assert lines[0]["created_at"] == "2025-02-01T00:00:00"
+    assert cursor.closed
+    assert invalid.status_code == 422
@@ -0,0 +1,78 @@
+import asyncio
+import pytest
+from unittest.mock import AsyncMock, MagicMock, patch
+from ..src.config.settings import settings
+from ..src.graphs.flows import job_runner as job_runner_module
+from ..src.graphs.flows.job_runner import JobRunner
+from ..src.models.job import JobStatus
+
+def jobs_collection(documents):
+    collection = MagicMock()
+    collection.find.return_value.to_list = AsyncMock(return_value=documents)
+    collection.replace_one = AsyncMock()
+    return collection
+
+async def until(condition, timeout: float = 2.0) -> None:
+    deadline = asyncio.get_running_loop().time() + timeout
+    while not condition():
+        assert asyncio.get_running_loop().time() < deadline
+        await asyncio.sleep(0.01)
+
+@pytest.mark.asyncio
+async def test_failed_flow_marks_job_failed():
+    runner = JobRunner(concurrency=1, max_queue_depth=10)
+    final_state = {"final_status": "failed", "error": "coder exploded"}
+    with patch.object(job_runner_module, "run_integration_flow", AsyncMock(return_value=final_state)):
+        try:
+            job = await runner.submit("Connect Weather API with SMS API")
+            await until(lambda: job.finished_at is not None)
+        finally:
+            await runner.stop()
+
+    assert job.status == JobStatus.FAILED
+    assert job.error == "coder exploded"
+    assert job.result == final_state
+
+@pytest.mark.asyncio
+async def test_start_requeues_queued_jobs_and_fails_interrupted_ones():
+    documents = [
+        {"_id": "queued-job", "user_input": "a", "status": JobStatus.QUEUED, "runner_id": settings.JOB_RUNNER_ID},
+        {"_id": "running-job", "user_input": "b", "status": JobStatus.RUNNING, "runner_id": settings.JOB_RUNNER_ID}
+    ]
+    collection = jobs_collection(documents)
+    runner = JobRunner(concurrency=1, max_queue_depth=10)
+    flow = AsyncMock(return_value={"final_status": "success"})
+
+    with patch.object(JobRunner, "_collection", return_value=collection), \
+         patch.object(job_runner_module, "run_integration_flow", flow):
+        try:
+            await runner.start()
+            await until(lambda: flow.await_count == 1 and not runner.stats()["active"])
+        finally:
+            await runner.stop()
+
+    query = collection.find.call_args.args[0]
+    assert query["runner_id"] == settings.JOB_RUNNER_ID
+    flow.assert_awaited_once_with("a")
+    saved = {call.args[0]["_id"]: call.args[1] for call in collection.replace_one.await_args_list}
+    assert saved["queued-job"]["status"] == JobStatus.COMPLETED
+    assert saved["running-job"]["status"] == JobStatus.FAILED
+    assert saved["running-job"]["error"] == "Interrupted by a restart"
+
+@pytest.mark.asyncio
+async def test_finished_job_can_be_polled_without_a_database():
+    runner = JobRunner(concurrency=1, max_queue_depth=10)
+    final_state = {"final_status": "success", "plan": {"steps": ["one"]}}
+    with patch.object(job_runner_module, "run_integration_flow", AsyncMock(return_value=final_state)):
+        try:
+            job = await runner.submit("Connect Weather API with SMS API")
+            await until(lambda: not runner.stats()["active"])
+        finally:
+            await runner.stop()
+
+    polled = await runner.get(job.job_id)
+    assert polled is not None
+    assert polled.status == JobStatus.COMPLETED
+    assert polled.result == final_state
+    assert runner.stats()["finished_cached"] == 1
+    assert await runner.get("unknown-job") is None
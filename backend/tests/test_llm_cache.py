@@ -0,0 +1,46 @@
+import pytest
+from unittest.mock import patch
+from ..src.utils.llm_cache import LRUCache, LLMResponseCache
+
+def test_lru_evicts_least_recently_used():
+    cache = LRUCache(max_size=2, ttl_seconds=60)
+    cache.set("a", "1")
+    cache.set("b", "2")
+    assert cache.get("a") == "1"
+
+    cache.set("c", "3")
+    assert cache.get("b") is None
+    assert cache.get("a") == "1"
+    assert cache.get("c") == "3"
+
+def test_lru_expires_entries_after_ttl():
+    cache = LRUCache(max_size=2, ttl_seconds=10)
+    with patch("time.monotonic", return_value=100.0):
+        cache.set("a", "1")
+    with patch("time.monotonic", return_value=109.0):
+        assert cache.get("a") == "1"
+    with patch("time.monotonic", return_value=111.0):
+        assert cache.get("a") is None
+    assert len(cache) == 0
+
+def test_cache_key_covers_node_model_and_temperature():
+    base = LLMResponseCache.make_key("CoderNode", "prompt", "mixtral-8x7b-32768", 0.2)
+    assert base == LLMResponseCache.make_key("CoderNode", "prompt", "mixtral-8x7b-32768", 0.2)
+    assert base != LLMResponseCache.make_key("TesterNode", "prompt", "mixtral-8x7b-32768", 0.2)
+    assert base != LLMResponseCache.make_key("CoderNode", "prompt!", "mixtral-8x7b-32768", 0.2)
+    assert base != LLMResponseCache.make_key("CoderNode", "prompt", "llama2-70b-4096", 0.2)
+    assert base != LLMResponseCache.make_key("CoderNode", "prompt", "mixtral-8x7b-32768", 0.7)
+
+@pytest.mark.asyncio
+async def test_memory_tier_counts_hits_and_misses():
+    cache = LLMResponseCache()
+    key = cache.make_key("PlannerNode", "connect apis", "mixtral-8x7b-32768", 0.7)
+
+    assert await cache.get(key) is None
+    await cache.set(key, '{"apis": {}}', "PlannerNode")
+    assert await cache.get(key) == '{"apis": {}}'
+
+    stats = cache.stats()
+    assert stats["misses"] == 1
+    assert stats["memory_hits"] == 1
+    assert stats["mongo_hits"] == 0
@@ -0,0 +1,44 @@
+import asyncio
+import httpx
+import pytest
+from ..src.utils.llm_client import PooledTransport
+from ..benchmarks.stub_provider import StubProvider
+
+CHAT_PATH = "/openai/v1/chat/completions"
+
+def make_transport(max_per_host: int = 2) -> PooledTransport:
+    return PooledTransport(
+        max_connections=4,
+        max_keepalive=4,
+        keepalive_expiry=30.0,
+        max_per_host=max_per_host,
+        http2=False
+    )
+
+@pytest.mark.asyncio
+async def test_sequential_calls_reuse_one_connection():
+    transport = make_transport()
+    async with StubProvider() as provider:
+        async with httpx.AsyncClient(transport=transport, base_url=provider.url) as client:
+            for _ in range(5):
+                response = await client.post(CHAT_PATH, json={"model": "stub"})
+                assert response.status_code == 200
+            metrics = transport.metrics()
+
+        assert provider.connections_accepted == 1
+    assert metrics["requests_total"] == 5
+    assert metrics["in_use"] == 0
+    assert metrics["queued"] == 0
+
+@pytest.mark.asyncio
+async def test_per_host_limit_bounds_concurrency():
+    transport = make_transport(max_per_host=2)
+    async with StubProvider(latency=0.05) as provider:
+        async with httpx.AsyncClient(transport=transport, base_url=provider.url) as client:
+            responses = await asyncio.gather(
+                *(client.post(CHAT_PATH, json={"model": "stub"}) for _ in range(6))
+            )
+
+        assert all(response.status_code == 200 for response in responses)
+        assert provider.connections_accepted <= 2
+    assert transport.metrics()["peak_in_use"] == 2
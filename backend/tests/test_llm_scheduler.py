@@ -0,0 +1,165 @@
+import asyncio
+import pytest
+from ..src.utils.llm_scheduler import LLMScheduler, TokenBucket, PRIORITY_BATCH, PRIORITY_INTERACTIVE
+
+def make_scheduler(**overrides) -> LLMScheduler:
+    options = dict(
+        requests_per_minute=6000,
+        tokens_per_minute=1_000_000,
+        max_concurrency=1,
+        max_queue_depth=10,
+        max_wait_seconds=30.0
+    )
+    options.update(overrides)
+    return LLMScheduler(**options)
+
+def test_token_bucket_reports_refill_delay():
+    bucket = TokenBucket(per_minute=60)
+    bucket.take(60)
+
+    assert bucket.delay(1, bucket._updated) == pytest.approx(1.0)
+    assert bucket.delay(1, bucket._updated + 1.0) == 0.0
+
+@pytest.mark.asyncio
+async def test_interactive_calls_are_served_before_batch():
+    scheduler = make_scheduler()
+    order = []
+    release = asyncio.Event()
+
+    async def call(name: str, priority: int, hold: bool = False):
+        async with scheduler.slot("model", 10, priority):
+            order.append(name)
+            if hold:
+                await release.wait()
+
+    first = asyncio.create_task(call("first", PRIORITY_BATCH, hold=True))
+    await asyncio.sleep(0)
+    waiting = [
+        asyncio.create_task(call("batch", PRIORITY_BATCH)),
+        asyncio.create_task(call("interactive", PRIORITY_INTERACTIVE))
+    ]
+    await asyncio.sleep(0)
+    assert scheduler.stats()["queue_depth_batch"] == 1
+    assert scheduler.stats()["queue_depth_interactive"] == 1
+
+    release.set()
+    await asyncio.gather(first, *waiting)
+
+    assert order == ["first", "interactive", "batch"]
+    assert scheduler.in_flight == 0
+
+@pytest.mark.asyncio
+async def test_priority_holds_across_models_sharing_the_concurrency_cap():
+    scheduler = make_scheduler()
+    order = []
+    release = asyncio.Event()
+
+    async def call(name: str, model: str, priority: int, hold: bool = False):
+        async with scheduler.slot(model, 10, priority):
+            order.append(name)
+            if hold:
+                await release.wait()
+
+    first = asyncio.create_task(call("first", "small-model", PRIORITY_BATCH, hold=True))
+    await asyncio.sleep(0)
+    # The batch call waits on the model that was seen first
+    waiting = [
+        asyncio.create_task(call("batch", "small-model", PRIORITY_BATCH)),
+        asyncio.create_task(call("interactive", "large-model", PRIORITY_INTERACTIVE))
+    ]
+    await asyncio.sleep(0)
+
+    release.set()
+    await asyncio.gather(first, *waiting)
+
+    assert order == ["first", "interactive", "batch"]
+    assert scheduler.in_flight == 0
+
+@pytest.mark.asyncio
+async def test_request_rate_limit_delays_calls():
+    # One request per 50ms once the initial burst of 2 is spent
+    scheduler = make_scheduler(requests_per_minute=2, max_concurrency=10)
+    scheduler._model("model").requests.rate = 20.0
+
+    loop = asyncio.get_running_loop()
+    start = loop.time()
+    for _ in range(3):
+        async with scheduler.slot("model", 10):
+            pass
+
+    assert loop.time() - start >= 0.04
+    assert scheduler.stats()["wait_seconds_max"] > 0
+
+@pytest.mark.asyncio
+async def test_cancelled_waiter_does_not_leak_a_slot():
+    scheduler = make_scheduler()
+    release = asyncio.Event()
+
+    async def hold():
+        async with scheduler.slot("model", 10):
+            await release.wait()
+
+    holder = asyncio.create_task(hold())
+    await asyncio.sleep(0)
+    waiter = asyncio.create_task(hold())
+    await asyncio.sleep(0)
+    waiter.cancel()
+    release.set()
+    await holder
+
+    assert scheduler.in_flight == 0
+    assert scheduler.queue_depth() == 0
+
+@pytest.mark.asyncio
+async def test_admission_rejects_when_queue_is_too_deep():
+    scheduler = make_scheduler(max_queue_depth=1)
+    release = asyncio.Event()
+
+    async def hold():
+        async with scheduler.slot("model", 10):
+            await release.wait()
+
+    tasks = [asyncio.create_task(hold()) for _ in range(2)]
+    await asyncio.sleep(0)
+
+    delay = scheduler.admission_delay()
+    assert delay is not None and delay >= 1.0
+    assert scheduler.retry_after(delay) == "1"
+    assert scheduler.stats()["rejected"] == 1
+
+    release.set()
+    await asyncio.gather(*tasks)
+    assert scheduler.admission_delay() is None
+
+def test_admitted_runs_count_before_they_queue_calls():
+    scheduler = make_scheduler(requests_per_minute=60, max_wait_seconds=10.0, calls_per_run=5)
+
+    # A burst admitted together is bounded even though none of its calls are queued yet
+    first = scheduler.start_run()
+    assert scheduler.admission_delay() is None
+    second = scheduler.start_run()
+    assert scheduler.admission_delay() is not None
+    assert scheduler.stats()["active_runs_interactive"] == 2
+
+    second.release()
+    second.release()
+    assert scheduler.stats()["active_runs_interactive"] == 1
+    assert scheduler.admission_delay() is None
+    first.release()
+
+@pytest.mark.asyncio
+async def test_waiting_run_is_admitted_when_another_finishes():
+    scheduler = make_scheduler(requests_per_minute=60, max_wait_seconds=4.0, calls_per_run=5)
+    running = scheduler.start_run(PRIORITY_BATCH)
+
+    waiter = asyncio.create_task(scheduler.wait_for_run(PRIORITY_BATCH, timeout=5.0))
+    await asyncio.sleep(0)
+    assert not waiter.done()
+
+    running.release()
+    admitted = await asyncio.wait_for(waiter, timeout=1.0)
+    assert scheduler.stats()["active_runs_batch"] == 1
+
+    with pytest.raises(asyncio.TimeoutError):
+        await scheduler.wait_for_run(PRIORITY_BATCH, timeout=0.05)
+    admitted.release()
@@ -0,0 +1,91 @@
+import json
+import logging
+import queue
+from unittest.mock import patch
+from ..src.utils.logging import (
+    ContextFilter, JsonFormatter, NonBlockingQueueHandler, SamplingFilter, SizedTimedRotatingFileHandler
+)
+from ..src.utils.run_context import RunContext, node_scope, reset_run_context, set_run_context
+
+def make_record(name: str = "hacklahoma.api", level: int = logging.INFO, msg: str = "run %s", args=("x",)) -> logging.LogRecord:
+    return logging.LogRecord(name, level, __file__, 1, msg, args, None)
+
+def test_json_records_carry_run_id_node_and_extra_fields():
+    token = set_run_context(RunContext(run_id="run-1"))
+    try:
+        with node_scope("coder"):
+            record = make_record()
+            record.prompt_tokens = 120
+            ContextFilter().filter(record)
+    finally:
+        reset_run_context(token)
+
+    entry = json.loads(JsonFormatter().format(record))
+    assert entry["message"] == "run x"
+    assert entry["run_id"] == "run-1"
+    assert entry["node"] == "coder"
+    assert entry["prompt_tokens"] == 120
+    assert entry["level"] == "INFO"
+
+def test_sampling_applies_to_child_loggers_below_warning_only():
+    sampler = SamplingFilter({"hacklahoma.api": 0.0, "httpx": 1.0})
+    assert not sampler.filter(make_record("hacklahoma.api.batch"))
+    assert sampler.filter(make_record("hacklahoma.api", logging.WARNING))
+    assert sampler.filter(make_record("hacklahoma.nodes"))
+    assert sampler.filter(make_record("httpx"))
+    assert sampler.dropped == 1
+
+def test_queue_handler_defers_formatting_and_drops_when_full():
+    handler = NonBlockingQueueHandler(queue.Queue(maxsize=1))
+    first, second = make_record(), make_record()
+    handler.handle(first)
+    handler.handle(second)
+
+    queued = handler.queue.get_nowait()
+    assert queued is first and queued.args == ("x",)
+    assert handler.dropped == 1
+
+def test_file_handler_rotates_on_size_without_overwriting(tmp_path):
+    handler = SizedTimedRotatingFileHandler(str(tmp_path / "app.log"), when="midnight", backup_count=50, max_bytes=400)
+    handler.setFormatter(JsonFormatter())
+    try:
+        for index in range(12):
+            handler.handle(make_record(msg="message number %d", args=(index,)))
+    finally:
+        handler.close()
+
+    files = sorted(path.name for path in tmp_path.iterdir())
+    assert len(files) > 2
+    lines = [line for path in tmp_path.iterdir() for line in path.read_text().splitlines()]
+    assert len(lines) == 12
+    assert all(path.stat().st_size <= 400 for path in tmp_path.iterdir())
+
+def test_pruning_keeps_the_newest_chunks(tmp_path):
+    handler = SizedTimedRotatingFileHandler(str(tmp_path / "app.log"), when="midnight", backup_count=3, max_bytes=200)
+    handler.setFormatter(JsonFormatter())
+    try:
+        for index in range(30):
+            handler.handle(make_record(msg="message number %d", args=(index,)))
+    finally:
+        handler.close()
+
+    rotated = [path for path in tmp_path.iterdir() if path.name != "app.log"]
+    assert len(rotated) == 3
+    kept = sorted(
+        json.loads(line)["message"] for path in tmp_path.iterdir() for line in path.read_text().splitlines()
+    )
+    newest = [f"message number {index}" for index in range(30 - len(kept), 30)]
+    assert kept == sorted(newest)
+
+def test_file_handler_formats_each_record_once(tmp_path):
+    formatter = JsonFormatter()
+    handler = SizedTimedRotatingFileHandler(str(tmp_path / "app.log"), when="midnight", backup_count=5, max_bytes=400)
+    handler.setFormatter(formatter)
+    try:
+        with patch.object(formatter, "format", wraps=formatter.format) as format_record:
+            for index in range(12):
+                handler.handle(make_record(msg="message number %d", args=(index,)))
+    finally:
+        handler.close()
+
+    assert format_record.call_count == 12
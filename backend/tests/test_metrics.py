@@ -0,0 +1,33 @@
+from ..src.utils.metrics import Histogram, MetricsRegistry, render_gauges
+
+def test_histogram_renders_cumulative_prometheus_buckets():
+    registry = MetricsRegistry()
+    histogram = registry.histogram("node_duration_seconds", "Node wall time", [0.1, 1.0], ["node"])
+    counter = registry.counter("llm_calls_total", "LLM calls", ["node"])
+
+    for value in (0.05, 0.5, 5.0):
+        histogram.observe(value, node="coder")
+    counter.inc(node="coder")
+
+    lines = registry.render().splitlines()
+
+    assert "# TYPE node_duration_seconds histogram" in lines
+    assert 'node_duration_seconds_bucket{node="coder",le="0.1"} 1' in lines
+    assert 'node_duration_seconds_bucket{node="coder",le="1"} 2' in lines
+    assert 'node_duration_seconds_bucket{node="coder",le="+Inf"} 3' in lines
+    assert 'node_duration_seconds_sum{node="coder"} 5.55' in lines
+    assert 'node_duration_seconds_count{node="coder"} 3' in lines
+    assert 'llm_calls_total{node="coder"} 1' in lines
+
+def test_quantile_reports_bucket_upper_bound():
+    histogram = Histogram("h", "help", [0.1, 1.0, 10.0], ["node"])
+    for _ in range(19):
+        histogram.observe(0.05, node="evaluator")
+    histogram.observe(8.0, node="evaluator")
+
+    assert histogram.quantile(0.5, node="evaluator") == 0.1
+    assert histogram.quantile(0.99, node="evaluator") == 10.0
+    assert histogram.quantile(0.5, node="coder") is None
+
+def test_gauges_render_current_values():
+    assert render_gauges("llm_scheduler", {"in_flight": 2}) == "# TYPE llm_scheduler_in_flight gauge\nllm_scheduler_in_flight 2\n"
@@ -0,0 +1,79 @@
+import time
+import pytest
+from unittest.mock import AsyncMock, MagicMock, patch
+from ..src.graphs.flows.plan_index import PlanIndex
+from ..src.utils.minhash import MinHasher, MinHashLSH, shingles
+
+PLAN = {"apis": {"source": {"name": "Weather API"}}, "integration_plan": {"steps": ["Step 1"]}}
+TASKS = {"coding_task": {"task": "Implement"}, "testing_task": {"task": "Test"}}
+
+def test_shingles_ignore_case_punctuation_and_filler_words():
+    assert shingles("Connect the Weather API with SMS API!") == shingles("connect weather api, sms api")
+    assert shingles("Connect Weather API with SMS API") != shingles("Connect Weather API with Slack API")
+
+def test_lsh_finds_near_duplicates_among_many_entries_quickly():
+    hasher = MinHasher(64)
+    lsh = MinHashLSH(64, 8)
+    for index in range(5000):
+        lsh.add(f"run-{index}", hasher.signature(shingles(f"sync service{index} records into store{index * 7}")))
+    lsh.add("weather", hasher.signature(shingles("Connect Weather API with SMS API")))
+
+    signature = hasher.signature(shingles("connect the weather api to the sms api"))
+    started = time.perf_counter()
+    for _ in range(100):
+        matches = lsh.query(signature, threshold=0.8)
+    assert (time.perf_counter() - started) / 100 < 0.001
+    assert matches == [("weather", 1.0)]
+
+    lsh.remove("weather")
+    assert lsh.query(signature, threshold=0.8) == []
+    assert len(lsh) == 5000
+
+@pytest.mark.asyncio
+async def test_plan_index_reuses_similar_runs_only():
+    index = PlanIndex()
+    await index.add("run-1", "Connect Weather API with SMS API", PLAN, TASKS)
+
+    match = await index.lookup("connect the weather API to the SMS API")
+    assert match.run_id == "run-1"
+    assert match.plan == PLAN and match.supervisor_output == TASKS
+    assert await index.lookup("Connect Stripe API with Slack API") is None
+
+    # An indistinguishable input is not indexed twice
+    await index.add("run-2", "Connect weather API and SMS API", PLAN, TASKS)
+    assert len(index.lsh) == 1
+
+@pytest.mark.asyncio
+async def test_inputs_without_shingles_are_neither_indexed_nor_matched():
+    index = PlanIndex()
+    await index.add("run-1", "the and of", PLAN, TASKS)
+    assert len(index.lsh) == 0
+
+    await index.add("run-2", "Connect Weather API with SMS API", PLAN, TASKS)
+    assert await index.lookup("!!!") is None
+    assert await index.lookup("") is None
+
+@pytest.mark.asyncio
+async def test_plan_index_fetches_evicted_plans_from_mongo_and_forgets_deleted_runs():
+    collection = MagicMock()
+    collection.replace_one = AsyncMock()
+    collection.find_one = AsyncMock(side_effect=[{"_id": "run-1", "plan": PLAN, "supervisor_output": TASKS}, None])
+    index = PlanIndex()
+
+    with patch.object(PlanIndex, "_collection", return_value=collection):
+        await index.add("run-1", "Connect Weather API with SMS API", PLAN, TASKS)
+        for task in list(index._pending_writes):
+            await task
+        document = collection.replace_one.await_args.args[1]
+        assert len(document["signature"]) == 64
+
+        index.payloads.clear()
+        assert (await index.lookup("Connect Weather API with SMS API")).plan == PLAN
+
+        index.payloads.clear()
+        collection.find_one.side_effect = [ConnectionError("primary stepped down"), None]
+        # A failed read skips reuse but keeps the entry; only a missing document drops it
+        assert await index.lookup("Connect Weather API with SMS API") is None
+        assert "run-1" in index.lsh
+        assert await index.lookup("Connect Weather API with SMS API") is None
+        assert "run-1" not in index.lsh
@@ -0,0 +1,39 @@
+from ..src.utils.prompt_serializer import count_tokens, serialize_inputs, to_prompt_text
+
+def test_structured_inputs_use_compact_canonical_json():
+    assert to_prompt_text({"b": [1, 2], "a": "x"}) == '{"a":"x","b":[1,2]}'
+    assert to_prompt_text("Connect Weather API with SMS API") == "Connect Weather API with SMS API"
+
+def test_inputs_within_budget_are_untouched():
+    inputs = {"coding_task": {"task": "Implement API client"}}
+    result = serialize_inputs(inputs, budget=100, elision_order=["coding_task.task"])
+
+    assert result.elided == []
+    assert result.fields["coding_task"] == '{"task":"Implement API client"}'
+    assert result.tokens == count_tokens(result.fields["coding_task"])
+
+def test_low_priority_fields_are_elided_first():
+    code_output = {
+        "implementation": {"main.py": "def run():\n    return 1\n"},
+        "setup_instructions": ["step " + str(i) for i in range(200)]
+    }
+    test_output = {"test_implementation": {"test_main.py": "assert run() == 1\n" * 50}}
+
+    result = serialize_inputs(
+        {"code_output": code_output, "test_output": test_output},
+        budget=150,
+        elision_order=["code_output.setup_instructions", "test_output.test_implementation"]
+    )
+
+    assert result.elided[0] == "code_output.setup_instructions"
+    assert "def run()" in result.fields["code_output"]
+    assert result.tokens <= 150
+    # The caller's state is not modified
+    assert len(code_output["setup_instructions"]) == 200
+
+def test_long_strings_are_shortened_when_elision_order_is_exhausted():
+    result = serialize_inputs({"plan": {"notes": "word " * 2000}}, budget=300, elision_order=[])
+
+    assert result.tokens <= 300
+    assert result.elided == ["plan.notes"]
+    assert "<elided" in result.fields["plan"]
@@ -0,0 +1,128 @@
+import gzip
+import orjson
+import pytest
+from datetime import datetime
+from httpx import ASGITransport, AsyncClient
+from pydantic import BaseModel
+from starlette.requests import Request
+from types import SimpleNamespace
+from unittest.mock import patch
+from ..src.routes import api_v1
+from ..src.utils import response_encoding
+from ..src.utils.response_encoding import (
+    BROTLI, GZIP, IDENTITY, JSON, MSGPACK, encoded_response, negotiate_encoding, negotiate_media_type, parse_fields
+)
+
+def test_parse_fields_builds_include():
+    include = parse_fields("final_status, evaluation,code_output.files", api_v1.IntegrationResponse)
+    assert include == {"final_status": True, "evaluation": True, "code_output": {"files": True}}
+    assert parse_fields("code_output,code_output.files", api_v1.IntegrationResponse) == {"code_output": True}
+    assert parse_fields("", api_v1.IntegrationResponse) is None
+
+def test_parse_fields_rejects_unknown_fields():
+    with pytest.raises(ValueError, match="Unknown fields: bogus"):
+        parse_fields("final_status,bogus", api_v1.IntegrationResponse)
+
+def test_encoding_negotiation_follows_q_values():
+    with patch.object(response_encoding, "brotli", object()):
+        assert negotiate_encoding("gzip, deflate, br") == BROTLI
+        assert negotiate_encoding("gzip;q=1.0, br;q=0.5") == GZIP
+        assert negotiate_encoding("*;q=0.3, br;q=0") == GZIP
+    with patch.object(response_encoding, "brotli", None):
+        assert negotiate_encoding("br") == IDENTITY
+        assert negotiate_encoding("br, gzip") == GZIP
+    assert negotiate_encoding(None) == IDENTITY
+    assert negotiate_encoding("gzip;q=0") == IDENTITY
+
+def test_media_type_negotiation():
+    with patch.object(response_encoding, "msgpack", object()):
+        assert negotiate_media_type("application/msgpack") == MSGPACK
+        assert negotiate_media_type("application/json, application/msgpack;q=0.5") == JSON
+        assert negotiate_media_type("*/*") == JSON
+    with patch.object(response_encoding, "msgpack", None):
+        assert negotiate_media_type("application/msgpack") == JSON
+
+@pytest.mark.asyncio
+async def test_plan_returns_only_requested_fields(make_app, fake_run_plan):
+    with patch.object(api_v1, "_run_plan", side_effect=fake_run_plan):
+        async with AsyncClient(transport=ASGITransport(app=make_app(api_v1.router)), base_url="http://test") as client:
+            response = await client.post(
+                "/api/v1/integration/plan",
+                params={"fields": "final_status,evaluation"},
+                json={"user_input": "weather to sms"}
+            )
+
+    assert response.status_code == 200
+    assert response.json() == {"final_status": "success", "evaluation": {"score": 0.9}}
+    assert "content-encoding" not in response.headers
+
+@pytest.mark.asyncio
+async def test_plan_rejects_unknown_fields_before_running(make_app, fake_run_plan):
+    with patch.object(api_v1, "_run_plan", side_effect=fake_run_plan) as run_plan:
+        async with AsyncClient(transport=ASGITransport(app=make_app(api_v1.router)), base_url="http://test") as client:
+            response = await client.post(
+                "/api/v1/integration/plan",
+                params={"fields": "nope"},
+                json={"user_input": "weather to sms"}
+            )
+
+    assert response.status_code == 422
+    run_plan.assert_not_called()
+
+@pytest.mark.asyncio
+async def test_large_plan_is_gzipped_when_accepted(make_app, fake_run_plan):
+    with patch.object(api_v1, "_run_plan", side_effect=fake_run_plan):
+        async with AsyncClient(transport=ASGITransport(app=make_app(api_v1.router)), base_url="http://test") as client:
+            async with client.stream(
+                "POST",
+                "/api/v1/integration/plan",
+                json={"user_input": "weather to sms"},
+                headers={"Accept-Encoding": "gzip"}
+            ) as response:
+                raw = b"".join([chunk async for chunk in response.aiter_raw()])
+
+    assert response.status_code == 200
+    assert response.headers["content-encoding"] == "gzip"
+    assert "Accept-Encoding" in response.headers["vary"]
+    body = gzip.decompress(raw)
+    assert len(raw) < len(body) / 10
+    assert body.startswith(b'{"plan":{"input":"weather to sms"}')
+
+@pytest.mark.asyncio
+async def test_plan_is_encoded_as_msgpack_when_preferred(make_app, fake_run_plan):
+    msgpack = pytest.importorskip("msgpack")
+    with patch.object(api_v1, "_run_plan", side_effect=fake_run_plan):
+        async with AsyncClient(transport=ASGITransport(app=make_app(api_v1.router)), base_url="http://test") as client:
+            response = await client.post(
+                "/api/v1/integration/plan",
+                params={"fields": "final_status,code_output.files"},
+                json={"user_input": "weather to sms"},
+                headers={"Accept": "application/msgpack"}
+            )
+
+    assert response.headers["content-type"] == MSGPACK
+    assert msgpack.unpackb(response.content) == {
+        "code_output": {"files": {"app.py": "print('hello')"}},
+        "final_status": "success"
+    }
+
+@pytest.mark.asyncio
+async def test_msgpack_and_json_bodies_carry_the_same_values():
+    class Run(BaseModel):
+        run_id: str
+        finished_at: datetime
+
+    def request(accept: str) -> Request:
+        return Request({"type": "http", "headers": [(b"accept", accept.encode())]})
+
+    run = Run(run_id="run-1", finished_at=datetime(2026, 10, 18, 9, 30, 5, 120000))
+    packed = []
+    fake_msgpack = SimpleNamespace(packb=lambda payload, default: packed.append(payload) or b"")
+
+    with patch.object(response_encoding, "msgpack", fake_msgpack):
+        await encoded_response(request(MSGPACK), run)
+    json_response = await encoded_response(request(JSON), run)
+
+    assert packed == [orjson.loads(json_response.body)]
+    assert packed[0]["finished_at"] == "2026-10-18T09:30:05.120000"
+
@@ -0,0 +1,91 @@
+import asyncio
+import pytest
+from datetime import datetime
+from fastapi import FastAPI
+from httpx import ASGITransport, AsyncClient
+from unittest.mock import AsyncMock, MagicMock, patch
+from ..src.graphs.flows.run_store import RunStore, decode_cursor, encode_cursor
+from ..src.routes import runs
+
+def mock_collection(documents=None):
+    collection = MagicMock()
+    collection.bulk_write = AsyncMock()
+    cursor = collection.find.return_value.sort.return_value.limit.return_value
+    cursor.to_list = AsyncMock(return_value=documents or [])
+    return collection
+
+async def _until(condition) -> None:
+    while not condition():
+        await asyncio.sleep(0.001)
+
+@pytest.mark.asyncio
+async def test_finished_runs_are_written_in_batches_off_the_request_path():
+    store = RunStore()
+    collection = mock_collection()
+
+    with patch.object(RunStore, "_collection", return_value=collection), \
+         patch("src.graphs.flows.run_store.settings.RUN_STORE_BATCH_SIZE", 2), \
+         patch("src.graphs.flows.run_store.settings.RUN_STORE_FLUSH_SECONDS", 60):
+        for index in range(3):
+            store.start_run(f"run-{index}", "Connect Weather API with SMS API")
+        try:
+            store.finish_run("run-0", {"final_status": "success", "iteration_count": 1, "plan": {"steps": []}})
+            store.finish_run("run-1", None)
+            assert collection.bulk_write.await_count == 0
+
+            # The full batch wakes the flusher; the remainder waits for the interval or shutdown
+            await asyncio.wait_for(_until(lambda: collection.bulk_write.await_count == 1), timeout=1)
+            store.finish_run("run-2", {"final_status": "failed"})
+        finally:
+            await store.stop()
+
+    first_batch = collection.bulk_write.await_args_list[0].args[0]
+    assert [operation._filter["_id"] for operation in first_batch] == ["run-0", "run-1"]
+    success, aborted = (operation._doc for operation in first_batch)
+    assert success["$set"]["status"] == "success"
+    assert success["$set"]["outputs"]["plan"] == {"steps": []}
+    assert "created_at" in success["$setOnInsert"]
+    assert aborted["$set"]["status"] == "aborted"
+    assert store.stats() == {"buffered": 0, "written": 3, "dropped": 0}
+
+@pytest.mark.asyncio
+async def test_list_runs_uses_keyset_cursor_and_summary_projection():
+    created = [datetime(2025, 2, 1, 12, 0, second) for second in (3, 2, 1)]
+    documents = [
+        {"_id": f"run-{index}", "user_input": "x", "status": "success", "iteration_count": 1,
+         "created_at": created_at, "finished_at": created_at, "duration_seconds": 1.0}
+        for index, created_at in enumerate(created)
+    ]
+    collection = mock_collection(documents)
+    store = RunStore()
+
+    with patch.object(RunStore, "_collection", return_value=collection):
+        page, next_cursor = await store.list_runs(2, status="success")
+        assert [document["_id"] for document in page] == ["run-0", "run-1"]
+        assert decode_cursor(next_cursor) == (created[1], "run-1")
+
+        await store.list_runs(2, cursor=next_cursor, user_input="  X ")
+
+    query, projection = collection.find.call_args.args
+    assert query["$or"] == [
+        {"created_at": {"$lt": created[1]}},
+        {"created_at": created[1], "_id": {"$lt": "run-1"}}
+    ]
+    assert "input_hash" in query
+    assert "outputs" not in projection and "node_metrics" not in projection
+
+@pytest.mark.asyncio
+async def test_history_routes_reject_bad_cursors_and_unknown_runs():
+    app = FastAPI()
+    app.include_router(runs.router)
+
+    with patch.object(RunStore, "_collection", return_value=mock_collection()):
+        async with AsyncClient(transport=ASGITransport(app=app), base_url="http://test") as client:
+            bad_cursor = await client.get("/api/v1/integration/runs", params={"cursor": "not-a-cursor"})
+            empty = await client.get("/api/v1/integration/runs", params={"cursor": encode_cursor(datetime(2025, 1, 1), "a")})
+    assert bad_cursor.status_code == 422
+    assert empty.json() == {"runs": [], "next_cursor": None}
+
+    async with AsyncClient(transport=ASGITransport(app=app), base_url="http://test") as client:
+        missing = await client.get("/api/v1/integration/runs/unknown")
+    assert missing.status_code == 404
@@ -0,0 +1,74 @@
+import pytest
+from ..src.utils.sandbox import SandboxExecutor, SandboxError
+
+CLIENT = "def add(a, b):\n    return a + b\n"
+
+def make_executor(**overrides) -> SandboxExecutor:
+    options = dict(max_workers=2, timeout_seconds=20.0, cpu_seconds=10, memory_mb=512)
+    options.update(overrides)
+    return SandboxExecutor(**options)
+
+@pytest.mark.asyncio
+async def test_passing_tests_are_reported():
+    tests = {"test_client.py": "from client import add\n\ndef test_add():\n    assert add(1, 2) == 3\n"}
+
+    result = await make_executor().run({"client.py": CLIENT}, tests)
+
+    assert result.compiled and not result.import_errors
+    assert (result.tests_run, result.tests_failed) == (1, 0)
+    assert result.passed is True
+
+@pytest.mark.asyncio
+async def test_failing_tests_are_reported():
+    tests = {"test_client.py": (
+        "from client import add\n\n"
+        "def test_add():\n    assert add(1, 2) == 3\n\n"
+        "def test_wrong():\n    assert add(1, 2) == 4\n"
+    )}
+
+    result = await make_executor().run({"client.py": CLIENT}, tests)
+
+    assert (result.tests_run, result.tests_failed) == (2, 1)
+    assert result.passed is False
+
+@pytest.mark.asyncio
+async def test_syntax_errors_stop_before_anything_runs():
+    result = await make_executor().run({"client.py": "def add(a, b)\n    return a + b\n"}, {})
+
+    assert result.compiled is False
+    assert "client.py" in result.syntax_errors
+    assert result.tests_run == 0
+
+@pytest.mark.asyncio
+async def test_import_errors_fail_the_run():
+    result = await make_executor().run({"client.py": "import module_that_does_not_exist\n"}, {})
+
+    assert result.compiled is True
+    assert "ModuleNotFoundError" in result.import_errors["client"]
+    assert result.passed is False
+
+@pytest.mark.asyncio
+async def test_runaway_code_is_killed_at_the_wall_clock_limit():
+    result = await make_executor(timeout_seconds=1.0).run({"client.py": "import time\ntime.sleep(30)\n"}, {})
+
+    assert result.timed_out is True
+    assert result.passed is False
+    assert result.duration_seconds < 10
+
+@pytest.mark.asyncio
+async def test_paths_outside_the_sandbox_are_refused():
+    with pytest.raises(SandboxError):
+        await make_executor().run({"../escape.py": CLIENT}, {})
+
+@pytest.mark.asyncio
+async def test_limits_apply_inside_the_child():
+    tests = {"test_limits.py": (
+        "import resource\n\n"
+        "def test_limits():\n"
+        "    assert resource.getrlimit(resource.RLIMIT_CPU)[0] == 10\n"
+        "    assert resource.getrlimit(resource.RLIMIT_AS)[0] == 512 * 1024 * 1024\n"
+    )}
+
+    result = await make_executor().run({"client.py": CLIENT}, tests)
+
+    assert (result.tests_run, result.tests_failed) == (1, 0)
@@ -0,0 +1,56 @@
+import asyncio
+import json
+import os
+import subprocess
+import sys
+import pytest
+from pathlib import Path
+from unittest.mock import AsyncMock, patch
+from ..src.graphs.flows import api_integration_flow, flow_registry
+from ..src.utils.startup_profiler import by_package, parse_importtime
+
+BACKEND = Path(__file__).resolve().parents[1]
+
+def test_importing_routes_does_not_load_llm_or_graph_libraries():
+    script = (
+        "import json, sys, src.routes; "
+        "print(json.dumps([m for m in ('langgraph', 'langchain_core', 'langchain_groq') if m in sys.modules]))"
+    )
+    completed = subprocess.run(
+        [sys.executable, "-c", script],
+        cwd=BACKEND,
+        env={**os.environ, "GROQ_API_KEY": os.environ.get("GROQ_API_KEY", "test")},
+        capture_output=True,
+        text=True
+    )
+    assert completed.returncode == 0, completed.stderr
+    assert json.loads(completed.stdout.strip().splitlines()[-1]) == []
+
+def test_parse_importtime_reads_nesting_and_sums_packages():
+    output = "\n".join([
+        "import time: self [us] | cumulative | imported package",
+        "import time:       120 |        120 |     httpx._api",
+        "import time:       300 |        420 |   httpx",
+        "import time:        50 |        470 | src.routes"
+    ])
+    timings = parse_importtime(output)
+    assert [(timing.module, timing.depth) for timing in timings] == [("httpx._api", 2), ("httpx", 1), ("src.routes", 0)]
+    assert by_package(timings) == {"httpx": 420, "src": 50}
+
+@pytest.mark.asyncio
+async def test_requests_wait_for_background_warm_up_instead_of_building_again():
+    flow_registry.reset_flow_registry()
+    built = object()
+
+    async def slow_build(nodes):
+        await asyncio.sleep(0.05)
+        return built
+
+    with patch.object(api_integration_flow, "create_nodes", return_value={}), \
+         patch.object(api_integration_flow, "create_planning_flow", AsyncMock(side_effect=slow_build)) as build:
+        flow_registry.start_warm_up()
+        assert flow_registry.FlowRegistry.flow is None
+        assert await flow_registry.get_flow() is built
+
+    assert build.await_count == 1
+    flow_registry.reset_flow_registry()
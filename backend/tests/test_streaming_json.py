@@ -0,0 +1,42 @@
+import json
+import pytest
+from ..src.graphs.nodes.coder_node import CodeOutput
+from ..src.utils.streaming_json import StreamingObjectParser, SchemaDriftError
+
+def feed_in_chunks(parser: StreamingObjectParser, text: str, size: int = 7) -> list:
+    events = []
+    for start in range(0, len(text), size):
+        events.extend(parser.feed(text[start:start + size]))
+    return events
+
+def test_fields_and_files_are_reported_as_they_close():
+    payload = {
+        "implementation": {
+            "client.py": "payload = {\"q\": \"}\"}\n",
+            "sms.py": "def send(to):\n    return 'ok'\n"
+        },
+        "dependencies": ["httpx"],
+        "setup_instructions": ["pip install httpx"]
+    }
+    text = "```json\n" + json.dumps(payload, indent=2) + "\n```"
+    parser = StreamingObjectParser(CodeOutput, stream_items=["implementation"])
+
+    events = feed_in_chunks(parser, text)
+
+    assert events[0] == ("item", "implementation", "client.py", payload["implementation"]["client.py"])
+    assert events[1] == ("item", "implementation", "sms.py", payload["implementation"]["sms.py"])
+    assert [event[1] for event in events[2:]] == ["implementation", "dependencies", "setup_instructions"]
+    assert parser.done
+    assert parser.result() == CodeOutput(**payload)
+
+def test_invalid_field_raises_before_stream_ends():
+    parser = StreamingObjectParser(CodeOutput, stream_items=["implementation"])
+
+    with pytest.raises(SchemaDriftError):
+        feed_in_chunks(parser, '{"implementation": {}, "dependencies": {"httpx": 1}, "setup_')
+
+def test_prose_instead_of_json_is_drift():
+    parser = StreamingObjectParser(CodeOutput)
+
+    with pytest.raises(SchemaDriftError):
+        feed_in_chunks(parser, "Sure! Here is a long explanation of the approach. " * 20)